@@ -0,0 +1,127 @@
+from typing import NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.engine import OptionValuationColumns
+from serenity_types.refdata.derivatives import PayoffType
+
+
+def inverse_flags(payoff_types: Union[Sequence[PayoffType], np.ndarray]) -> np.ndarray:
+    """
+    Converts a sequence or array of PayoffType into a boolean array that is True for INVERSE contracts;
+    boolean arrays are passed through as-is.
+    """
+    flags = np.asarray(payoff_types)
+    if flags.dtype == np.bool_:
+        return flags
+    return flags == PayoffType.INVERSE
+
+
+def coin_margined_options(columns: OptionValuationColumns,
+                          payoff_types: Union[Sequence[PayoffType], np.ndarray]) -> OptionValuationColumns:
+    """
+    Re-expresses the valuations of INVERSE (coin-settled, Deribit-style) options in coin terms, leaving
+    LINEAR options as valued; one vectorized pass over a mixed book. With V the linear value in base
+    currency, an inverse option is worth V / S coins, and its greeks are those of the coin value:
+
+    - pv = V / S, in coin;
+    - delta = S d(V / S) / dS = delta - V / S, the premium-adjusted delta in qty of underlying;
+    - gamma = d(delta - V / S) / dS = gamma - delta / S + V / S^2;
+    - vega, rho and theta = linear greek / S, in coin.
+
+    The _ccy columns convert the coin greeks to base currency at spot, so that delta_ccy and gamma_ccy
+    include the exposure of the coin-denominated premium while vega_ccy, rho_ccy and theta_ccy are unchanged.
+    """
+    inverse = inverse_flags(payoff_types)
+    spot = columns.spot_price
+    position = columns.spot_notional / spot
+    pv = columns.pv / spot
+    delta = columns.delta - pv
+    gamma = columns.gamma - (columns.delta - pv) / spot
+
+    def select(coin: np.ndarray, linear: np.ndarray) -> np.ndarray:
+        return np.where(inverse, coin, linear)
+
+    return columns._replace(
+        pv=select(pv, columns.pv),
+        delta=select(delta, columns.delta),
+        delta_qty=select(delta * position, columns.delta_qty),
+        delta_ccy=select(delta * position * spot, columns.delta_ccy),
+        gamma=select(gamma, columns.gamma),
+        gamma_ccy=select(gamma * position * spot * spot, columns.gamma_ccy),
+        vega=select(columns.vega / spot, columns.vega),
+        rho=select(columns.rho / spot, columns.rho),
+        theta=select(columns.theta / spot, columns.theta)
+    )
+
+
+class FutureValuationColumns(NamedTuple):
+    """
+    Columnar valuation of a batch of futures or perpetuals, one array element per contract position.
+    """
+
+    pv: np.ndarray
+    """
+    Unrealized value per contract vs. the entry price: in base currency for LINEAR contracts, in coin
+    for INVERSE contracts.
+    """
+
+    forward_price: np.ndarray
+    """
+    Fair futures price, spot X exp(projection_rate X time_to_expiry).
+    """
+
+    delta: np.ndarray
+    """
+    Sensitivity of the contract value to spot, in qty of underlying per contract.
+    """
+
+    delta_qty: np.ndarray
+    """
+    Delta X qty, the delta exposure of the position expressed in qty of underlying.
+    """
+
+    delta_ccy: np.ndarray
+    """
+    Delta exposure of the position expressed in base currency.
+    """
+
+    gamma: np.ndarray
+    """
+    Sensitivity of delta to spot, per contract; zero for LINEAR contracts.
+    """
+
+    gamma_ccy: np.ndarray
+    """
+    Gamma X qty X spot^2, expressed in base currency.
+    """
+
+
+def value_futures(spot: np.ndarray, entry_price: np.ndarray, time_to_expiry: np.ndarray,
+                  projection_rate: np.ndarray, qty: np.ndarray, contract_size: np.ndarray,
+                  payoff_types: Union[Sequence[PayoffType], np.ndarray],
+                  contract_value_ccy: Optional[np.ndarray] = None) -> FutureValuationColumns:
+    """
+    Values a mixed book of LINEAR and INVERSE futures in one vectorized pass; perpetuals are valued with zero
+    time_to_expiry. Futures are marked to market, so values are not discounted. contract_size is in qty of
+    underlying, as DerivativeAsset.contract_size, and a LINEAR contract is worth contract_size X
+    (F - entry_price) in base currency. An INVERSE contract has a fixed face value in base currency, e.g. 10 USD
+    on Deribit, given by contract_value_ccy or, if not given, taken as contract_size X entry_price, the value of
+    its underlying qty at entry; it is worth contract_value_ccy X (1 / entry_price - 1 / F) in coin, with greeks
+    taken on the coin value as for coin_margined_options, e.g. delta = S d(value) / dS = contract_value_ccy / F
+    coins. contract_value_ccy is ignored for LINEAR contracts.
+    """
+    inverse = inverse_flags(payoff_types)
+    spot = np.asarray(spot, dtype=np.float64)
+    growth = np.exp(np.asarray(projection_rate) * time_to_expiry)
+    forward = spot * growth
+
+    face = contract_size * entry_price if contract_value_ccy is None else contract_value_ccy
+
+    linear_delta = contract_size * growth
+    inverse_delta = face / forward
+    pv = np.where(inverse, face * (1 / entry_price - 1 / forward), contract_size * (forward - entry_price))
+    delta = np.where(inverse, inverse_delta, linear_delta)
+    gamma = np.where(inverse, -inverse_delta / spot, 0.0)
+    return FutureValuationColumns(pv=pv, forward_price=forward, delta=delta, delta_qty=delta * qty,
+                                  delta_ccy=delta * qty * spot, gamma=gamma, gamma_ccy=gamma * qty * spot * spot)
@@ -0,0 +1,168 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.black_scholes import BlackScholesGreeks, black_scholes_greeks
+from serenity_types.utils.stats import norm_cdf, norm_pdf
+
+VOL_BUMP = 0.0001
+"""
+Absolute vol bump for the central-difference vega of American options.
+"""
+
+RATE_BUMP = 0.0001
+"""
+Absolute parallel rate bump for the central-difference rho of American options.
+"""
+
+TIME_BUMP = 0.0001
+"""
+Relative time to expiry bump for the central-difference theta of American options.
+"""
+
+WARM_ITERATIONS = 2
+"""
+Newton iterations for bumped critical prices warm-started from the unbumped solve; as the bumps are small
+and Newton converges quadratically, two iterations leave errors far below the finite-difference error.
+"""
+
+
+class EarlyExercise(NamedTuple):
+    """
+    Barone-Adesi-Whaley early exercise terms: in the continuation region the American value is the European
+    value plus coefficient X (spot / critical_price) ^ exponent, and beyond the critical price it is the
+    exercise value.
+    """
+
+    critical_price: np.ndarray
+    """
+    Spot price at and beyond which immediate exercise is optimal.
+    """
+
+    coefficient: np.ndarray
+    """
+    Scale of the early exercise premium at the critical price.
+    """
+
+    exponent: np.ndarray
+    """
+    Exponent of the early exercise premium in spot / critical_price.
+    """
+
+
+def _european(spot: np.ndarray, strike: np.ndarray, time_to_expiry: np.ndarray, vol: np.ndarray,
+              carry: np.ndarray, rate: np.ndarray, sign: np.ndarray):
+    std_dev = vol * np.sqrt(time_to_expiry)
+    carry_discount = np.exp((carry - rate) * time_to_expiry)
+    d1 = (np.log(spot / strike) + carry * time_to_expiry) / std_dev + 0.5 * std_dev
+    n_d1 = norm_cdf(sign * d1)
+    n_d2 = norm_cdf(sign * (d1 - std_dev))
+    pv = sign * (spot * carry_discount * n_d1 - strike * np.exp(-rate * time_to_expiry) * n_d2)
+    # also returns the unsigned delta exp((b - r) T) N(sign d1) and its derivative with respect to log spot
+    return pv, carry_discount * n_d1, carry_discount * norm_pdf(d1) / std_dev
+
+
+def _exponent(time_to_expiry: np.ndarray, variance: np.ndarray, carry: np.ndarray, rate: np.ndarray,
+              sign: np.ndarray, perpetual: bool = False) -> np.ndarray:
+    n = 2 * carry / variance
+    m = 2 * rate / variance
+    if not perpetual:
+        # M / (1 - exp(-rT)), with its limit 2 / (vol^2 T) as r -> 0
+        one_minus_df = -np.expm1(-rate * time_to_expiry)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m = np.where(np.abs(rate * time_to_expiry) > 1e-12, m / one_minus_df, 2 / (variance * time_to_expiry))
+    return 0.5 * (1 - n + sign * np.sqrt((n - 1) ** 2 + 4 * m))
+
+
+def _seed(strike: np.ndarray, time_to_expiry: np.ndarray, vol: np.ndarray, carry: np.ndarray, rate: np.ndarray,
+          sign: np.ndarray) -> np.ndarray:
+    # Barone-Adesi & Whaley's seed, interpolating between the strike and the perpetual critical price
+    perpetual = strike / (1 - 1 / _exponent(time_to_expiry, vol * vol, carry, rate, sign, perpetual=True))
+    std_dev = vol * np.sqrt(time_to_expiry)
+    h = -(carry * time_to_expiry + 2 * sign * std_dev) * strike / (perpetual - strike)
+    return np.where(sign > 0, strike + (perpetual - strike) * (1 - np.exp(h)),
+                    perpetual + (strike - perpetual) * np.exp(h))
+
+
+def early_exercise(strike: np.ndarray, time_to_expiry: np.ndarray, vol: np.ndarray, carry: np.ndarray,
+                   rate: np.ndarray, sign: np.ndarray, guess: Optional[np.ndarray] = None,
+                   tolerance: float = 1e-9, max_iterations: int = 50) -> EarlyExercise:
+    """
+    Solves for the critical price by Newton iteration on the value-matching condition
+    sign (S* - K) = european(S*) + sign (1 - exp((b - r) T) N(sign d1(S*))) S* / q, for calls (sign 1) and
+    puts (sign -1) at once; guess warm-starts the iteration, e.g. from an unbumped solve.
+    """
+    exponent = _exponent(time_to_expiry, vol * vol, carry, rate, sign)
+    critical_price = _seed(strike, time_to_expiry, vol, carry, rate, sign) if guess is None else guess
+    for _ in range(max_iterations):
+        pv, probability, density = _european(critical_price, strike, time_to_expiry, vol, carry, rate, sign)
+        residual = pv + sign * (1 - probability) * critical_price / exponent - sign * (critical_price - strike)
+        slope = sign * probability + sign * (1 - probability) / exponent - density / exponent - sign
+        step = residual / slope
+        critical_price = np.maximum(critical_price - step, 1e-3 * strike)
+        if np.all(np.abs(step) <= tolerance * strike):
+            break
+    _, probability, _ = _european(critical_price, strike, time_to_expiry, vol, carry, rate, sign)
+    coefficient = sign * (1 - probability) * critical_price / exponent
+    return EarlyExercise(critical_price=critical_price, coefficient=coefficient, exponent=exponent)
+
+
+def _american_pv(spot: np.ndarray, strike: np.ndarray, time_to_expiry: np.ndarray, vol: np.ndarray,
+                 carry: np.ndarray, rate: np.ndarray, sign: np.ndarray, guess: np.ndarray) -> np.ndarray:
+    terms = early_exercise(strike, time_to_expiry, vol, carry, rate, sign, guess, max_iterations=WARM_ITERATIONS)
+    pv, _, _ = _european(spot, strike, time_to_expiry, vol, carry, rate, sign)
+    continuation = sign * (spot - terms.critical_price) < 0
+    return np.where(continuation, pv + terms.coefficient * (spot / terms.critical_price) ** terms.exponent,
+                    sign * (spot - strike))
+
+
+def _american_adjusted(european: BlackScholesGreeks, spot: np.ndarray, strike: np.ndarray,
+                       time_to_expiry: np.ndarray, vol: np.ndarray, carry: np.ndarray, rate: np.ndarray,
+                       sign: np.ndarray) -> BlackScholesGreeks:
+    terms = early_exercise(strike, time_to_expiry, vol, carry, rate, sign)
+    continuation = sign * (spot - terms.critical_price) < 0
+    premium = terms.coefficient * (spot / terms.critical_price) ** terms.exponent
+    exponent = terms.exponent
+    pv = np.where(continuation, european.pv + premium, sign * (spot - strike))
+    delta = np.where(continuation, european.delta + exponent * premium / spot, sign)
+    gamma = np.where(continuation, european.gamma + exponent * (exponent - 1) * premium / (spot * spot), 0.0)
+
+    # vega, rho and theta by central differences, warm-starting the critical price from the unbumped solve
+    def bumped(bump_vol=0.0, bump_rate=0.0, bump_time=0.0):
+        return _american_pv(spot, strike, time_to_expiry + bump_time, vol + bump_vol, carry + bump_rate,
+                            rate + bump_rate, sign, terms.critical_price)
+
+    time_bump = TIME_BUMP * time_to_expiry
+    vega = (bumped(bump_vol=VOL_BUMP) - bumped(bump_vol=-VOL_BUMP)) / (2 * VOL_BUMP)
+    rho = (bumped(bump_rate=RATE_BUMP) - bumped(bump_rate=-RATE_BUMP)) / (2 * RATE_BUMP)
+    theta = -(bumped(bump_time=time_bump) - bumped(bump_time=-time_bump)) / (2 * time_bump)
+    return BlackScholesGreeks(pv=pv, forward=european.forward, delta=delta, gamma=gamma,
+                              vega=np.where(continuation, vega, 0.0), rho=np.where(continuation, rho, 0.0),
+                              theta=np.where(continuation, theta, 0.0))
+
+
+def american_greeks(spot: np.ndarray, strike: np.ndarray, time_to_expiry: np.ndarray, vol: np.ndarray,
+                    projection_rate: np.ndarray, discounting_rate: np.ndarray,
+                    is_call: np.ndarray) -> BlackScholesGreeks:
+    """
+    Price and greeks of American options by the Barone-Adesi-Whaley quadratic approximation, with the same
+    conventions as black_scholes_greeks; all inputs broadcast. Options for which early exercise is never
+    optimal (calls with projection_rate >= discounting_rate, puts with discounting_rate <= 0) take the
+    closed-form European values, and the critical price is only solved for the rest.
+    """
+    inputs = (spot, strike, time_to_expiry, vol, projection_rate, discounting_rate)
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in inputs), np.asarray(is_call))
+    shape = arrays[0].shape
+    spot, strike, time_to_expiry, vol, carry, rate, is_call = (a.ravel() for a in arrays)
+    greeks = black_scholes_greeks(spot, strike, time_to_expiry, vol, carry, rate, is_call)
+    greeks = BlackScholesGreeks(*(np.array(np.broadcast_to(g, spot.shape)) for g in greeks))
+
+    early = np.flatnonzero(np.where(is_call, carry < rate, rate > 0))
+    if len(early) > 0:
+        sign = np.where(is_call[early], 1.0, -1.0)
+        european = BlackScholesGreeks(*(g[early] for g in greeks))
+        adjusted = _american_adjusted(european, spot[early], strike[early], time_to_expiry[early], vol[early],
+                                      carry[early], rate[early], sign)
+        for column, values in zip(greeks, adjusted):
+            column[early] = values
+    return BlackScholesGreeks(*(g.reshape(shape) for g in greeks))
@@ -0,0 +1,105 @@
+from typing import NamedTuple, Sequence, Union
+
+import numpy as np
+
+from serenity_types.refdata.options import OptionType
+from serenity_types.utils.stats import norm_cdf, norm_pdf
+
+
+def call_flags(option_types: Union[Sequence[OptionType], np.ndarray]) -> np.ndarray:
+    """
+    Converts a sequence or array of OptionType into a boolean array that is True for calls; boolean arrays
+    are passed through as-is, so callers can convert once and re-use the flags.
+    """
+    flags = np.asarray(option_types)
+    if flags.dtype == np.bool_:
+        return flags
+    return flags == OptionType.CALL
+
+
+def black_price(forward: np.ndarray, strike: np.ndarray, time_to_expiry: np.ndarray, vol: np.ndarray,
+                discount_factor: np.ndarray, is_call: np.ndarray) -> np.ndarray:
+    """
+    Black (1976) price of European options on the forward, vectorized across all inputs.
+    """
+    sign = np.where(is_call, 1.0, -1.0)
+    std_dev = vol * np.sqrt(time_to_expiry)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = np.log(forward / strike) / std_dev + 0.5 * std_dev
+    d2 = d1 - std_dev
+    return discount_factor * sign * (forward * norm_cdf(sign * d1) - strike * norm_cdf(sign * d2))
+
+
+class BlackScholesGreeks(NamedTuple):
+    """
+    Unit (per unit of underlying) price and greeks from a vectorized Black-Scholes valuation.
+    """
+
+    pv: np.ndarray
+    """
+    Present value of the option.
+    """
+
+    forward: np.ndarray
+    """
+    Forward price, spot * exp(projection_rate * time_to_expiry).
+    """
+
+    delta: np.ndarray
+    """
+    First derivative of pv with respect to spot.
+    """
+
+    gamma: np.ndarray
+    """
+    Second derivative of pv with respect to spot.
+    """
+
+    vega: np.ndarray
+    """
+    First derivative of pv with respect to vol, per 1.0 (100%) of vol.
+    """
+
+    rho: np.ndarray
+    """
+    First derivative of pv with respect to a parallel shift of projection and discounting rates, per 1.0 of rate.
+    """
+
+    theta: np.ndarray
+    """
+    Negative first derivative of pv with respect to time to expiry, i.e. value decay per year.
+    """
+
+
+def black_scholes_greeks(spot: np.ndarray, strike: np.ndarray, time_to_expiry: np.ndarray, vol: np.ndarray,
+                         projection_rate: np.ndarray, discounting_rate: np.ndarray,
+                         is_call: np.ndarray) -> BlackScholesGreeks:
+    """
+    Black-Scholes price and greeks for European options, with the forward projected at projection_rate
+    (the cost of carry) and cashflows discounted at discounting_rate; all inputs broadcast.
+    """
+    sign = np.where(is_call, 1.0, -1.0)
+    sqrt_t = np.sqrt(time_to_expiry)
+    std_dev = vol * sqrt_t
+    carry = projection_rate - discounting_rate
+    spot_discount = np.exp(carry * time_to_expiry)
+    strike_discount = np.exp(-discounting_rate * time_to_expiry)
+    forward = spot * np.exp(projection_rate * time_to_expiry)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = np.log(forward / strike) / std_dev + 0.5 * std_dev
+    d2 = d1 - std_dev
+    n_d1 = norm_cdf(sign * d1)
+    n_d2 = norm_cdf(sign * d2)
+    pdf_d1 = norm_pdf(d1)
+
+    pv = sign * (spot * spot_discount * n_d1 - strike * strike_discount * n_d2)
+    delta = sign * spot_discount * n_d1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = spot_discount * pdf_d1 / (spot * std_dev)
+        time_decay = spot * spot_discount * pdf_d1 * vol / (2 * sqrt_t)
+    vega = spot * spot_discount * pdf_d1 * sqrt_t
+    rho = sign * strike * time_to_expiry * strike_discount * n_d2
+    theta = -time_decay - sign * carry * spot * spot_discount * n_d1 - sign * discounting_rate * strike * \
+        strike_discount * n_d2
+    return BlackScholesGreeks(pv=pv, forward=forward, delta=delta, gamma=gamma, vega=vega, rho=rho, theta=theta)
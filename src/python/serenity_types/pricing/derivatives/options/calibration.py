@@ -0,0 +1,201 @@
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.svi import (SVI_PARAMETER_NAMES, SVISurfaceEvaluator,
+                                                            svi_total_variance)
+from serenity_types.pricing.derivatives.options.volsurface import (InterpolatedVolatilitySurface,
+                                                                   RawVolatilitySurface, StrikeType,
+                                                                   VolatilitySurfaceDefinition, VolModel)
+
+
+class SVISliceFit(NamedTuple):
+    """
+    Inputs for fitting a single expiry slice; this is what gets shipped to the worker processes.
+    """
+
+    time_to_expiry: float
+    """
+    The slice expiry, expressed as a year fraction.
+    """
+
+    log_moneyness: np.ndarray
+    """
+    Log-moneyness of every input point in the slice.
+    """
+
+    total_variance: np.ndarray
+    """
+    Observed total implied variance (iv^2 * time_to_expiry) of every input point in the slice.
+    """
+
+    initial_params: Tuple[float, float, float, float, float]
+    """
+    Starting (a, b, rho, m, sigma) for the fit, either warm-started from a previous calibration or a default guess.
+    """
+
+
+def _to_raw_params(theta: np.ndarray) -> Tuple[float, float, float, float, float]:
+    # unconstrained search space: b and sigma are log-transformed and rho is tanh-transformed
+    return theta[0], np.exp(theta[1]), np.tanh(theta[2]), theta[3], np.exp(theta[4])
+
+
+def _from_raw_params(a: float, b: float, rho: float, m: float, sigma: float) -> np.ndarray:
+    return np.array([a, np.log(max(b, 1e-8)), np.arctanh(np.clip(rho, -0.999, 0.999)), m, np.log(max(sigma, 1e-8))])
+
+
+def _svi_jacobian(k: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    _, b, rho, m, sigma = _to_raw_params(theta)
+    shifted = k - m
+    root = np.sqrt(shifted * shifted + sigma * sigma)
+    return np.column_stack([
+        np.ones_like(k),
+        (rho * shifted + root) * b,
+        b * shifted * (1 - rho * rho),
+        -b * (rho + shifted / root),
+        b * sigma / root * sigma
+    ])
+
+
+def _svi_residuals(k: np.ndarray, w: np.ndarray, theta: np.ndarray) -> np.ndarray:
+    return svi_total_variance(k, *_to_raw_params(theta)) - w
+
+
+def fit_svi_slice(fit: SVISliceFit, max_iterations: int = 200, tolerance: float = 1e-12) -> Dict[str, float]:
+    """
+    Least-squares fit of raw SVI parameters to a single slice of total variances using Levenberg-Marquardt,
+    searching in a transformed space that keeps b and sigma positive and rho inside (-1, 1).
+    """
+    k, w = fit.log_moneyness, fit.total_variance
+    theta = _from_raw_params(*fit.initial_params)
+    residuals = _svi_residuals(k, w, theta)
+    cost = residuals @ residuals
+    damping = 1e-3
+    for _ in range(max_iterations):
+        jacobian = _svi_jacobian(k, theta)
+        hessian = jacobian.T @ jacobian
+        gradient = jacobian.T @ residuals
+        step = np.linalg.lstsq(hessian + damping * np.diag(np.diag(hessian) + 1e-12), -gradient, rcond=None)[0]
+        candidate = theta + step
+        candidate_residuals = _svi_residuals(k, w, candidate)
+        candidate_cost = candidate_residuals @ candidate_residuals
+        if not candidate_cost < cost:
+            damping *= 4.0
+            if damping > 1e12:
+                break
+            continue
+
+        converged = cost - candidate_cost <= tolerance * max(cost, 1e-30)
+        theta, residuals, cost = candidate, candidate_residuals, candidate_cost
+        damping = max(damping / 3.0, 1e-12)
+        if converged:
+            break
+    return dict(zip(SVI_PARAMETER_NAMES, (float(p) for p in _to_raw_params(theta))))
+
+
+def default_svi_guess(k: np.ndarray, w: np.ndarray) -> Tuple[float, float, float, float, float]:
+    atm = int(np.argmin(w))
+    b = 0.1
+    sigma = 0.1
+    return max(w[atm] - b * sigma, 1e-6), b, 0.0, float(k[atm]), sigma
+
+
+class SVICalibrator:
+    """
+    Local calibrator that fits an SVI slice per expiry from a RawVolatilitySurface and assembles the result into an
+    InterpolatedVolatilitySurface. The slice fits are independent, so they are mapped across the given Executor;
+    pass in a long-lived ProcessPoolExecutor to fit across cores and amortize worker start-up over hourly refits,
+    or leave it unset to fit in-process. When the previous version of the surface is provided each slice is
+    warm-started from the previous slice with the nearest expiry, if within warm_start_tolerance years.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, min_points: int = 5, mesh_strikes: int = 51,
+                 warm_start_tolerance: float = 1 / 365, max_iterations: int = 200, tolerance: float = 1e-12):
+        self.executor = executor
+        self.min_points = max(min_points, len(SVI_PARAMETER_NAMES))
+        self.mesh_strikes = mesh_strikes
+        self.warm_start_tolerance = warm_start_tolerance
+        self.fit_slice = partial(fit_svi_slice, max_iterations=max_iterations, tolerance=tolerance)
+
+    def calibrate(self, definition: VolatilitySurfaceDefinition, raw: RawVolatilitySurface,
+                  previous: Optional[InterpolatedVolatilitySurface] = None) -> InterpolatedVolatilitySurface:
+        return self.calibrate_many([(definition, raw, previous)])[0]
+
+    def calibrate_many(self, surfaces: List[Tuple[VolatilitySurfaceDefinition, RawVolatilitySurface,
+                                                  Optional[InterpolatedVolatilitySurface]]]) \
+            -> List[InterpolatedVolatilitySurface]:
+        """
+        Calibrates several surfaces, e.g. one per underlier, submitting all of their slices in a single batch
+        so the worker pool stays busy across surfaces.
+        """
+        unsupported = [definition.display_name for definition, _, _ in surfaces if definition.vol_model != VolModel.SVI]
+        if unsupported:
+            raise ValueError(f'Only SVI surfaces can be calibrated: {unsupported}')
+
+        slice_fits = [self._slice_fits(raw, previous) for _, raw, previous in surfaces]
+        all_fits = [fit for fits in slice_fits for fit in fits]
+        mapper = self.executor.map if self.executor is not None else map
+        all_params = iter(list(mapper(self.fit_slice, all_fits)))
+
+        results = []
+        for (definition, raw, _), fits in zip(surfaces, slice_fits):
+            calibration_params = {fit.time_to_expiry: next(all_params) for fit in fits}
+            results.append(self._build_surface(definition, raw, calibration_params, fits))
+        return results
+
+    def _slice_fits(self, raw: RawVolatilitySurface,
+                    previous: Optional[InterpolatedVolatilitySurface]) -> List[SVISliceFit]:
+        points = raw.vol_points
+        time_to_expiry = np.fromiter((p.time_to_expiry for p in points), dtype=np.float64, count=len(points))
+        strike = np.fromiter((p.strike_value for p in points), dtype=np.float64, count=len(points))
+        iv = np.fromiter((p.iv for p in points), dtype=np.float64, count=len(points))
+
+        log_moneyness = np.log(strike / raw.spot_price) if raw.strike_type == StrikeType.ABSOLUTE else strike
+        expiries, slice_idx, counts = np.unique(time_to_expiry, return_inverse=True, return_counts=True)
+        order = np.argsort(slice_idx, kind='stable')
+        splits = np.cumsum(counts)[:-1]
+        k_slices = np.split(log_moneyness[order], splits)
+        w_slices = np.split((iv * iv * time_to_expiry)[order], splits)
+
+        previous_params = previous.calibration_params if previous is not None else {}
+        previous_expiries = np.array(sorted(previous_params.keys()))
+        fits = []
+        for expiry, k, w in zip(expiries, k_slices, w_slices):
+            if len(k) < self.min_points or expiry <= 0:
+                continue
+            initial = self._warm_start(expiry, previous_params, previous_expiries) or default_svi_guess(k, w)
+            fits.append(SVISliceFit(float(expiry), k, w, initial))
+        return fits
+
+    def _warm_start(self, expiry: float, previous_params: Dict[float, Dict[str, float]],
+                    previous_expiries: np.ndarray) -> Optional[Tuple[float, float, float, float, float]]:
+        if len(previous_expiries) == 0:
+            return None
+        nearest = previous_expiries[np.argmin(np.abs(previous_expiries - expiry))]
+        if abs(nearest - expiry) > self.warm_start_tolerance:
+            return None
+        params = previous_params[nearest]
+        return tuple(params[name] for name in SVI_PARAMETER_NAMES)
+
+    def _build_surface(self, definition: VolatilitySurfaceDefinition, raw: RawVolatilitySurface,
+                       calibration_params: Dict[float, Dict[str, float]],
+                       fits: List[SVISliceFit]) -> InterpolatedVolatilitySurface:
+        if len(calibration_params) == 0:
+            raise ValueError(f'No expiry had at least {self.min_points} points to calibrate '
+                             f'{definition.display_name}')
+
+        log_moneyness = np.concatenate([fit.log_moneyness for fit in fits])
+        evaluator = SVISurfaceEvaluator(calibration_params)
+        strike_axis = np.linspace(log_moneyness.min(), log_moneyness.max(), self.mesh_strikes)
+        expiries, strikes = np.meshgrid(evaluator.time_to_expiries, strike_axis, indexing='ij')
+        vols = evaluator.implied_vol(strikes, expiries)
+        return InterpolatedVolatilitySurface(
+            definition=definition,
+            strikes=strikes.ravel().tolist(),
+            time_to_expiries=expiries.ravel().tolist(),
+            vols=vols.ravel().tolist(),
+            input_params={'strike_type': raw.strike_type.value, 'spot_price': raw.spot_price},
+            calibration_params=calibration_params
+        )
@@ -0,0 +1,142 @@
+from typing import Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.engine import OptionValuationColumns
+
+
+class Buckets(NamedTuple):
+    """
+    A bucketing of a continuous risk dimension: each value goes to the first bucket whose upper bound it does
+    not exceed, and the last bound is normally infinite so that every value lands in a bucket.
+    """
+
+    upper_bounds: Tuple[float, ...]
+    """
+    Inclusive upper bound of each bucket, ascending.
+    """
+
+    labels: Tuple[str, ...]
+    """
+    Display label of each bucket.
+    """
+
+    def assign(self, values: np.ndarray) -> np.ndarray:
+        return np.minimum(np.searchsorted(self.upper_bounds, values, side='left'), len(self.labels) - 1)
+
+
+EXPIRY_BUCKETS = Buckets(upper_bounds=(7 / 365, 30 / 365, 91 / 365, 182 / 365, 1.0, np.inf),
+                         labels=('1W', '1M', '3M', '6M', '1Y', '>1Y'))
+"""
+Default expiry buckets, by time to expiry in years.
+"""
+
+MONEYNESS_BUCKETS = Buckets(upper_bounds=tuple(np.log1p([-0.5, -0.2, -0.05, 0.05, 0.2, 0.5]).tolist()) + (np.inf,),
+                            labels=('<-50%', '-50%..-20%', '-20%..-5%', 'ATM', '5%..20%', '20%..50%', '>50%'))
+"""
+Default moneyness buckets, by log-moneyness log(strike / spot); the labels are the equivalent percentage
+moneyness strike / spot - 1, so e.g. a strike 20% above spot is at log-moneyness log(1.2).
+"""
+
+GREEK_MEASURES = ('delta_ccy', 'gamma_ccy', 'vega_ccy', 'rho_ccy', 'theta_ccy')
+"""
+The position-scaled greeks summed in a GreeksCube.
+"""
+
+
+def _group_sum(codes: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sort-based group-by: sums the rows of values sharing a code, returning the distinct codes in ascending
+    order and the sums.
+    """
+    if len(codes) == 0:
+        return codes, values[:0]
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    return sorted_codes[starts], np.add.reduceat(values[order], starts, axis=0)
+
+
+class GreeksCube:
+    """
+    Position-scaled greeks summed by underlier, expiry bucket and moneyness bucket, or any subset of these
+    dimensions. Only non-empty cells are stored, as integer coordinates into the labels of each dimension
+    plus one row of sums per cell. Roll-ups re-aggregate the cells of this cube, and drill-downs re-aggregate
+    the cells of the finest cube the cube was rolled up from, so neither goes back to the option rows.
+    """
+
+    DIMENSIONS = ('underlier', 'expiry_bucket', 'moneyness_bucket')
+
+    def __init__(self, dimensions: Sequence[str], labels: Dict[str, np.ndarray], coordinates: np.ndarray,
+                 values: np.ndarray, counts: np.ndarray, base: Optional['GreeksCube'] = None):
+        self.dimensions = tuple(dimensions)
+        self.labels = labels
+        self.coordinates = coordinates
+        self.values = values
+        self.counts = counts
+        self.base = base or self
+
+    @classmethod
+    def aggregate(cls, columns: OptionValuationColumns, underliers: Sequence[Hashable],
+                  time_to_expiry: np.ndarray, log_moneyness: np.ndarray,
+                  expiry_buckets: Buckets = EXPIRY_BUCKETS,
+                  moneyness_buckets: Buckets = MONEYNESS_BUCKETS) -> 'GreeksCube':
+        """
+        Builds the finest cube from a columnar batch of valuations in one grouped pass. Underliers are any
+        hashable refdata key per option, e.g. the underlier asset ID; log_moneyness is log(strike / spot).
+        """
+        underlier_labels, underlier_codes = np.unique(np.asarray(underliers, dtype=object).astype(str),
+                                                      return_inverse=True)
+        coordinates = np.column_stack([underlier_codes, expiry_buckets.assign(time_to_expiry),
+                                       moneyness_buckets.assign(log_moneyness)])
+        labels = {'underlier': underlier_labels, 'expiry_bucket': np.array(expiry_buckets.labels),
+                  'moneyness_bucket': np.array(moneyness_buckets.labels)}
+        values = np.column_stack([getattr(columns, measure) for measure in GREEK_MEASURES])
+        rows = cls(cls.DIMENSIONS, labels, coordinates, values, np.ones(len(values), dtype=np.int64))
+        return rows._grouped(cls.DIMENSIONS, np.ones(len(values), dtype=bool), base=None)
+
+    def rollup(self, *dimensions: str) -> 'GreeksCube':
+        """
+        Sums this cube's cells over every dimension not listed, e.g. rollup('underlier') for per-underlier
+        totals or rollup() for the grand total.
+        """
+        unknown = set(dimensions) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f'Cannot roll up to {sorted(unknown)}: cube has dimensions {self.dimensions}')
+        return self._grouped(dimensions, np.ones(len(self.values), dtype=bool), self.base)
+
+    def drill_down(self, dimension: str, **members: str) -> 'GreeksCube':
+        """
+        Splits this cube's cells by an extra dimension, optionally restricted to the cells matching the
+        given members, e.g. drill_down('moneyness_bucket', expiry_bucket='1M').
+        """
+        base = self.base
+        if dimension not in base.dimensions:
+            raise ValueError(f'Unknown dimension: {dimension}')
+        mask = np.ones(len(base.values), dtype=bool)
+        for member_dimension, member in members.items():
+            axis = base.dimensions.index(member_dimension)
+            matches = np.flatnonzero(base.labels[member_dimension] == str(member))
+            mask &= np.isin(base.coordinates[:, axis], matches)
+        dimensions = [d for d in base.dimensions if d in self.dimensions or d == dimension]
+        return base._grouped(dimensions, mask, base)
+
+    def cells(self) -> List[Tuple[Tuple[str, ...], Dict[str, float]]]:
+        """
+        The non-empty cells as (member labels, measure sums) pairs, in label order.
+        """
+        keys = zip(*(self.labels[d][self.coordinates[:, i]].tolist() for i, d in enumerate(self.dimensions)))
+        if not self.dimensions:
+            keys = [()] * len(self.values)
+        return [(tuple(key), dict(zip(GREEK_MEASURES, row))) for key, row in zip(keys, self.values.tolist())]
+
+    def _grouped(self, dimensions: Sequence[str], mask: np.ndarray, base: Optional['GreeksCube']) -> 'GreeksCube':
+        axes = [self.dimensions.index(d) for d in dimensions]
+        shape = tuple(len(self.labels[d]) for d in dimensions)
+        coordinates = self.coordinates[mask][:, axes]
+        codes = np.ravel_multi_index(coordinates.T, shape) if axes else np.zeros(len(coordinates), dtype=np.int64)
+        # counts ride along as an extra column so that one sort serves both
+        codes, sums = _group_sum(codes, np.column_stack([self.values[mask], self.counts[mask]]))
+        coordinates = np.column_stack(np.unravel_index(codes, shape)) if axes else np.zeros((len(codes), 0), int)
+        return GreeksCube(dimensions, {d: self.labels[d] for d in dimensions}, coordinates, sums[:, :-1],
+                          sums[:, -1].astype(np.int64), base)
@@ -0,0 +1,368 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.american import american_greeks
+from serenity_types.pricing.derivatives.options.black_scholes import BlackScholesGreeks, black_scholes_greeks
+from serenity_types.pricing.derivatives.options.overrides import (OverrideArrays, RequestOverrides,
+                                                                  resolve_overrides)
+from serenity_types.pricing.derivatives.options.svi import SVISurfaceEvaluator
+from serenity_types.pricing.derivatives.options.valuation import (OptionValuation, OptionValuationRequest,
+                                                                  OptionValuationResult, YieldCurveOverride)
+from serenity_types.pricing.derivatives.options.volgrid import VolSurfaceGridIndex
+from serenity_types.pricing.derivatives.options.volsurface import (DiscountingMethod,
+                                                                   InterpolatedVolatilitySurface, VolModel)
+from serenity_types.pricing.derivatives.rates.forwards import ForwardEngine
+from serenity_types.pricing.derivatives.rates.yield_curve import InterpolatedYieldCurve
+from serenity_types.refdata.options import OptionStyle, OptionType
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+"""
+Year fraction convention for time to expiry (ACT/365).
+"""
+
+MIN_TIME_TO_EXPIRY = 1 / SECONDS_PER_YEAR
+"""
+Options at or past expiry are valued one second before expiry so that greeks stay finite.
+"""
+
+VEGA_SCALE = 0.01
+"""
+vega_ccy is expressed per 1% move in vol.
+"""
+
+RHO_SCALE = 0.0001
+"""
+rho_ccy is expressed per 1bp move in rates.
+"""
+
+THETA_SCALE = 1 / 365
+"""
+theta_ccy is expressed per 1 day of time decay.
+"""
+
+
+class OptionMarketData(NamedTuple):
+    """
+    Market data resolved by the caller for a local valuation; by-value surfaces and curves passed in the
+    OptionValuationRequest itself take precedence.
+    """
+
+    spot_price: float
+    """
+    Spot price of the underlier, in base currency.
+    """
+
+    vol_surface: Optional[InterpolatedVolatilitySurface]
+    """
+    The volatility surface to look up IVs from.
+    """
+
+    projection_curve: Optional[InterpolatedYieldCurve]
+    """
+    The curve used to project forwards.
+    """
+
+    discounting_curve: Optional[InterpolatedYieldCurve] = None
+    """
+    The curve used for discounting; only required for DiscountingMethod.CURVE.
+    """
+
+
+class OptionValuationColumns(NamedTuple):
+    """
+    Columnar form of a batch of OptionValuationResults, one array element per option, in request order.
+    """
+
+    pv: np.ndarray
+    iv: np.ndarray
+    spot_notional: np.ndarray
+    spot_price: np.ndarray
+    forward_price: np.ndarray
+    projection_rate: np.ndarray
+    discounting_rate: np.ndarray
+    delta: np.ndarray
+    delta_qty: np.ndarray
+    delta_ccy: np.ndarray
+    gamma: np.ndarray
+    gamma_ccy: np.ndarray
+    vega: np.ndarray
+    vega_ccy: np.ndarray
+    rho: np.ndarray
+    rho_ccy: np.ndarray
+    theta: np.ndarray
+    theta_ccy: np.ndarray
+
+    def to_results(self, option_valuation_ids: List[str], vol_model: VolModel) -> List[OptionValuationResult]:
+        """
+        Converts the columns into OptionValuationResult objects; as the values are computed locally the
+        objects are constructed without re-running validation. Building the objects costs far more than the
+        valuation itself, so latency-sensitive callers should consume the columns directly.
+        """
+        rows = zip(*(column.tolist() for column in self))
+        return [OptionValuationResult.construct(option_valuation_id=option_valuation_id, vol_model=vol_model,
+                                                **dict(zip(self._fields, row)))
+                for option_valuation_id, row in zip(option_valuation_ids, rows)]
+
+
+class OptionValuationInputs(NamedTuple):
+    """
+    Columnar economics of the options in a request, extracted once up front.
+    """
+
+    qty: np.ndarray
+    strike: np.ndarray
+    expiry: np.ndarray
+    is_call: np.ndarray
+    contract_size: np.ndarray
+    is_american: np.ndarray
+
+
+class ResolvedOptionInputs(NamedTuple):
+    """
+    Option economics plus the market data resolved for each option, after all overrides are applied.
+    """
+
+    inputs: OptionValuationInputs
+    time_to_expiry: np.ndarray
+    spot: np.ndarray
+    vol: np.ndarray
+    projection_rate: np.ndarray
+    discounting_rate: np.ndarray
+    vol_surface: InterpolatedVolatilitySurface
+    vol_model: VolModel
+    vol_overrides: OverrideArrays
+
+
+def _timestamp(value: datetime) -> float:
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _check_economics(option: OptionValuation):
+    if option.strike is None or option.expiry is None or option.option_type is None:
+        raise ValueError(f'Option {option.option_valuation_id} needs explicit strike, expiry and option_type '
+                         f'for local valuation')
+    if option.option_style not in (None, OptionStyle.EUROPEAN, OptionStyle.AMERICAN):
+        raise ValueError(f'Option {option.option_valuation_id}: only EUROPEAN and AMERICAN options supported')
+
+
+def extract_inputs(options: List[OptionValuation]) -> OptionValuationInputs:
+    """
+    Extracts the option economics into columns in a single pass; expiries are typically shared by many
+    options, so their timestamps are computed once per distinct expiry.
+    """
+    timestamps = {}
+    rows = []
+    for option in options:
+        _check_economics(option)
+        expiry = timestamps.get(option.expiry)
+        if expiry is None:
+            expiry = timestamps[option.expiry] = _timestamp(option.expiry)
+        qty = 1 if option.qty is None else option.qty
+        contract_size = 1 if option.contract_size is None else option.contract_size
+        rows.append((qty, option.strike, expiry, option.option_type == OptionType.CALL, contract_size,
+                     option.option_style == OptionStyle.AMERICAN))
+
+    columns = np.array(rows, dtype=np.float64).reshape(len(rows), 6)
+    return OptionValuationInputs(qty=columns[:, 0], strike=columns[:, 1], expiry=columns[:, 2],
+                                 is_call=columns[:, 3] > 0, contract_size=columns[:, 4],
+                                 is_american=columns[:, 5] > 0)
+
+
+SurfaceEvaluator = Union[SVISurfaceEvaluator, VolSurfaceGridIndex]
+
+
+def surface_evaluator(surface: InterpolatedVolatilitySurface, vol_model: VolModel) -> SurfaceEvaluator:
+    """
+    The calibrated SVI slices when pricing with VolModel.SVI, or the fitted mesh otherwise.
+    """
+    svi_surface = surface.definition.vol_model == VolModel.SVI and len(surface.calibration_params) > 0
+    if vol_model == VolModel.SVI and svi_surface:
+        return SVISurfaceEvaluator.from_surface(surface)
+    return VolSurfaceGridIndex.from_surface(surface)
+
+
+def surface_vols(surface: InterpolatedVolatilitySurface, vol_model: VolModel, log_moneyness: np.ndarray,
+                 time_to_expiry: np.ndarray) -> np.ndarray:
+    """
+    Looks up vols from the calibrated SVI slices when pricing with VolModel.SVI, or from the fitted mesh otherwise.
+    """
+    return surface_evaluator(surface, vol_model).implied_vol(log_moneyness, time_to_expiry)
+
+
+class SurfaceEvaluatorCache:
+    """
+    Keeps the evaluator built for each vol surface, keyed by surface identity with least-recently-used
+    eviction beyond max_size surfaces, so that repeated valuations against an unchanged surface skip the
+    rebuild. Surfaces are treated as immutable: a re-marked surface is a new object and gets a new entry,
+    and each entry holds on to its surface so that the identity cannot be reused while it is cached.
+    """
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self._cache: 'OrderedDict[Tuple[int, VolModel], Tuple[InterpolatedVolatilitySurface, SurfaceEvaluator]]' \
+            = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def evaluator(self, surface: InterpolatedVolatilitySurface, vol_model: VolModel) -> SurfaceEvaluator:
+        key = (id(surface), vol_model)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] is surface:
+            self._cache.move_to_end(key)
+            return entry[1]
+        evaluator = surface_evaluator(surface, vol_model)
+        self._cache[key] = (surface, evaluator)
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return evaluator
+
+
+def option_greeks(resolved: 'ResolvedOptionInputs') -> BlackScholesGreeks:
+    """
+    Unit greeks for every option: closed-form Black-Scholes for European options, with the American options
+    (the last axis being options) re-priced by the Barone-Adesi-Whaley approximation.
+    """
+    inputs = resolved.inputs
+    args = (resolved.spot, inputs.strike, resolved.time_to_expiry, resolved.vol, resolved.projection_rate,
+            resolved.discounting_rate, inputs.is_call)
+    greeks = black_scholes_greeks(*args)
+    american = np.flatnonzero(inputs.is_american)
+    if len(american) == 0:
+        return greeks
+    shape = np.broadcast_shapes(*(np.shape(a) for a in args))
+    greeks = BlackScholesGreeks(*(np.array(np.broadcast_to(g, shape)) for g in greeks))
+    american_args = (np.broadcast_to(a, shape)[..., american] for a in args)
+    for column, values in zip(greeks, american_greeks(*american_args)):
+        column[..., american] = values
+    return greeks
+
+
+def scale_greeks(greeks, vol: np.ndarray, spot: np.ndarray, projection_rate: np.ndarray,
+                 discounting_rate: np.ndarray, position: np.ndarray) -> OptionValuationColumns:
+    """
+    Combines unit greeks with the position size (qty X contract_size) into the full set of result columns.
+    """
+    return OptionValuationColumns(
+        pv=greeks.pv,
+        iv=vol,
+        spot_notional=position * spot,
+        spot_price=spot,
+        forward_price=greeks.forward,
+        projection_rate=projection_rate,
+        discounting_rate=discounting_rate,
+        delta=greeks.delta,
+        delta_qty=greeks.delta * position,
+        delta_ccy=greeks.delta * position * spot,
+        gamma=greeks.gamma,
+        gamma_ccy=greeks.gamma * position * spot * spot,
+        vega=greeks.vega,
+        vega_ccy=greeks.vega * VEGA_SCALE * position,
+        rho=greeks.rho,
+        rho_ccy=greeks.rho * RHO_SCALE * position,
+        theta=greeks.theta,
+        theta_ccy=greeks.theta * THETA_SCALE * position
+    )
+
+
+class OptionValuationEngine:
+    """
+    In-process Black-Scholes engine for OptionValuationRequest, with American options priced by the
+    Barone-Adesi-Whaley approximation. Option economics and overrides are extracted into columns once, then
+    vols, rates, prices, greeks and the position-scaled greeks for every option are computed in a single
+    vectorized pass. Options must carry explicit strike, expiry and option_type, as the engine does not load
+    reference data. Rates are looked up once per distinct expiry through the ForwardEngine, which caches them
+    across requests, and the vol surface evaluators are likewise kept across requests by the
+    SurfaceEvaluatorCache.
+    """
+
+    def __init__(self, forward_engine: Optional[ForwardEngine] = None,
+                 evaluator_cache: Optional[SurfaceEvaluatorCache] = None):
+        self.forward_engine = forward_engine or ForwardEngine()
+        self.evaluator_cache = evaluator_cache or SurfaceEvaluatorCache()
+
+    def value(self, request: OptionValuationRequest, market_data: OptionMarketData,
+              valuation_time: Optional[datetime] = None) -> List[OptionValuationResult]:
+        columns = self.value_columns(request, market_data, valuation_time)
+        return columns.to_results([o.option_valuation_id for o in request.options], request.vol_model)
+
+    def value_columns(self, request: OptionValuationRequest, market_data: OptionMarketData,
+                      valuation_time: Optional[datetime] = None) -> OptionValuationColumns:
+        return self.price(self.resolve(request, market_data, valuation_time))
+
+    def resolve(self, request: OptionValuationRequest, market_data: OptionMarketData,
+                valuation_time: Optional[datetime] = None) -> ResolvedOptionInputs:
+        """
+        Resolves option economics, times to expiry, spots, vols and rates for every option, with all overrides
+        applied, ready for pricing.
+        """
+        options = request.options
+        inputs = extract_inputs(options)
+        overrides = resolve_overrides(request)
+        time_to_expiry = self.time_to_expiry(request, inputs, valuation_time)
+
+        spot = overrides.spot_price.apply(np.full(len(options), market_data.spot_price, dtype=np.float64))
+        projection_rate, discounting_rate = self.rates(request, market_data, time_to_expiry, overrides)
+
+        vol_surface = request.vol_surface or market_data.vol_surface
+        if vol_surface is None:
+            raise ValueError('A volatility surface is required for local valuation')
+        resolved = ResolvedOptionInputs(inputs=inputs, time_to_expiry=time_to_expiry, spot=spot, vol=spot,
+                                        projection_rate=projection_rate, discounting_rate=discounting_rate,
+                                        vol_surface=vol_surface, vol_model=request.vol_model,
+                                        vol_overrides=overrides.implied_vol)
+        return resolved._replace(vol=self.vols(resolved, spot))
+
+    def vols(self, resolved: ResolvedOptionInputs, spot: np.ndarray) -> np.ndarray:
+        """
+        Looks up vols at the log-moneyness of each strike against the given spots, which may carry extra
+        leading dimensions, and applies the per-option implied_vol_overrides.
+        """
+        evaluator = self.evaluator_cache.evaluator(resolved.vol_surface, resolved.vol_model)
+        vol = evaluator.implied_vol(np.log(resolved.inputs.strike / spot), resolved.time_to_expiry)
+        return resolved.vol_overrides.apply(vol)
+
+    @staticmethod
+    def price(resolved: ResolvedOptionInputs) -> OptionValuationColumns:
+        """
+        Prices resolved inputs; the market data arrays may carry extra leading dimensions (e.g. scenarios)
+        that broadcast against the per-option arrays.
+        """
+        inputs = resolved.inputs
+        greeks = option_greeks(resolved)
+        vol, spot = np.broadcast_arrays(resolved.vol, resolved.spot)
+        return scale_greeks(greeks, vol, spot, resolved.projection_rate, resolved.discounting_rate,
+                            inputs.qty * inputs.contract_size)
+
+    @staticmethod
+    def time_to_expiry(request: OptionValuationRequest, inputs: OptionValuationInputs,
+                       valuation_time: Optional[datetime] = None) -> np.ndarray:
+        valuation_time = valuation_time or request.as_of_time or datetime.now(timezone.utc)
+        return np.maximum((inputs.expiry - _timestamp(valuation_time)) / SECONDS_PER_YEAR, MIN_TIME_TO_EXPIRY)
+
+    def rates(self, request: OptionValuationRequest, market_data: OptionMarketData, time_to_expiry: np.ndarray,
+              overrides: Optional[RequestOverrides] = None):
+        overrides = overrides or resolve_overrides(request)
+        projection_rate = self._curve_rates(request.projection_curve_override, overrides.projection_rate,
+                                            market_data.projection_curve, time_to_expiry, 'projection')
+        if request.discounting_method == DiscountingMethod.CURVE:
+            discounting_rate = self._curve_rates(request.discounting_curve_override, overrides.discounting_rate,
+                                                 market_data.discounting_curve, time_to_expiry, 'discounting')
+        else:
+            discounting_rate = projection_rate
+        return projection_rate, discounting_rate
+
+    def _curve_rates(self, curve_override: Optional[YieldCurveOverride], rate_override: OverrideArrays,
+                     curve: Optional[InterpolatedYieldCurve], time_to_expiry: np.ndarray, usage: str) -> np.ndarray:
+        if curve_override and curve_override.yield_curve:
+            curve = curve_override.yield_curve
+        if curve is not None:
+            rates = self.forward_engine.zero_rates(curve, time_to_expiry)
+        elif rate_override.replace_mask.all():
+            rates = np.zeros_like(time_to_expiry)
+        else:
+            raise ValueError(f'A {usage} curve or rate replacement is required for local valuation')
+        return rate_override.apply(rates)
@@ -0,0 +1,133 @@
+from typing import NamedTuple, Sequence, Union
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.black_scholes import call_flags
+from serenity_types.pricing.derivatives.options.volsurface import RawVolatilitySurface, StrikeType
+from serenity_types.refdata.options import OptionType
+from serenity_types.utils.stats import norm_cdf, norm_pdf
+
+_MAX_STD_DEV = 20.0
+"""
+Upper bound on total standard deviation (vol * sqrt(time_to_expiry)) searched by the solver.
+"""
+
+
+class ImpliedVolResult(NamedTuple):
+    """
+    Output of a batch implied volatility solve.
+    """
+
+    iv: np.ndarray
+    """
+    Implied volatilities; NaN wherever the solver failed.
+    """
+
+    converged: np.ndarray
+    """
+    Boolean mask of the points where the solver converged within tolerance.
+    """
+
+    iterations: int
+    """
+    Number of iterations run before all points converged or max_iterations was reached.
+    """
+
+    @property
+    def failed(self) -> np.ndarray:
+        """
+        Indices of all points that did not converge, e.g. because the price was outside of no-arbitrage bounds.
+        """
+        return np.flatnonzero(~self.converged)
+
+
+def _otm_price(std_dev: np.ndarray, forward: np.ndarray, strike: np.ndarray, log_moneyness: np.ndarray,
+               sign: np.ndarray):
+    d1 = log_moneyness / std_dev + 0.5 * std_dev
+    d2 = d1 - std_dev
+    price = sign * (forward * norm_cdf(sign * d1) - strike * norm_cdf(sign * d2))
+    return price, forward * norm_pdf(d1), d1, d2
+
+
+def _initial_guess(call: np.ndarray, forward: np.ndarray, strike: np.ndarray) -> np.ndarray:
+    # Corrado-Miller rational approximation of the total standard deviation from the undiscounted call price
+    half_moneyness = 0.5 * (forward - strike)
+    shifted = call - half_moneyness
+    radicand = np.maximum(shifted * shifted - (forward - strike) ** 2 / np.pi, 0.0)
+    guess = np.sqrt(2 * np.pi) / (forward + strike) * (shifted + np.sqrt(radicand))
+    return np.clip(np.nan_to_num(guess, nan=0.5), 1e-4, _MAX_STD_DEV / 2)
+
+
+def implied_vol(price: np.ndarray, forward: np.ndarray, strike: np.ndarray, time_to_expiry: np.ndarray,
+                discounting_rate: np.ndarray, option_type: Union[Sequence[OptionType], np.ndarray],
+                tolerance: float = 1e-10, max_iterations: int = 50) -> ImpliedVolResult:
+    """
+    Solves for Black implied volatilities of European options from discounted premiums, all points at once.
+    Prices are converted to undiscounted out-of-the-money prices via put-call parity to avoid cancellation,
+    then a Corrado-Miller rational initial guess is refined with Halley (third-order Householder) steps on
+    the log of the price as a function of total standard deviation, which typically converges in three steps,
+    safeguarded by bisection on a bracket that tightens every iteration. The tolerance is on the relative
+    price error. Only unconverged points are carried into each iteration, and points whose prices violate
+    no-arbitrage bounds are reported as unconverged with NaN vols.
+    """
+    inputs = (price, forward, strike, time_to_expiry, discounting_rate)
+    arrays = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in inputs), call_flags(option_type))
+    price, forward, strike, time_to_expiry, discounting_rate, is_call = (a.ravel() for a in arrays)
+    shape = arrays[0].shape
+
+    undiscounted = price * np.exp(discounting_rate * time_to_expiry)
+    call = np.where(is_call, undiscounted, undiscounted + forward - strike)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_moneyness = np.log(forward / strike)
+    otm_sign = np.where(log_moneyness > 0, -1.0, 1.0)
+    target = np.where(log_moneyness > 0, call - (forward - strike), call)
+    valid = (time_to_expiry > 0) & (forward > 0) & (strike > 0) & (target > 0) & (call < forward)
+
+    std_dev = np.full(len(price), np.nan)
+    converged = np.zeros(len(price), dtype=bool)
+    active = np.flatnonzero(valid)
+    s = _initial_guess(call[active], forward[active], strike[active])
+    lower = np.zeros(len(active))
+    upper = np.full(len(active), _MAX_STD_DEV)
+
+    iterations = 0
+    while len(active) > 0 and iterations < max_iterations:
+        iterations += 1
+        f, k, x, sign, p = forward[active], strike[active], log_moneyness[active], otm_sign[active], target[active]
+        model, vega, d1, d2 = _otm_price(s, f, k, x, sign)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_diff = np.log(model) - np.log(p)
+            slope = vega / model
+            curvature = vega * d1 * d2 / (s * model) - slope * slope
+            newton = log_diff / slope
+            candidate = s - newton / (1 - 0.5 * newton * curvature / slope)
+        upper = np.where(log_diff > 0, s, upper)
+        lower = np.where(log_diff < 0, s, lower)
+        bisect = ~((candidate > lower) & (candidate < upper))
+        candidate = np.where(bisect, 0.5 * (lower + upper), candidate)
+
+        done = (np.abs(log_diff) <= tolerance) | (upper - lower <= tolerance * s)
+        std_dev[active[done]] = s[done]
+        converged[active[done]] = True
+        keep = ~done
+        active, s, lower, upper = active[keep], candidate[keep], lower[keep], upper[keep]
+
+    with np.errstate(invalid='ignore'):
+        iv = np.where(converged, std_dev / np.sqrt(np.where(valid, time_to_expiry, 1.0)), np.nan)
+    return ImpliedVolResult(iv=iv.reshape(shape), converged=converged.reshape(shape), iterations=iterations)
+
+
+def implied_vol_from_surface_points(raw: RawVolatilitySurface,
+                                    option_types: Union[Sequence[OptionType], np.ndarray],
+                                    **kwargs) -> ImpliedVolResult:
+    """
+    Recomputes the IV of every VolPoint in a raw surface from its mark_price, forward_price and discounting_rate;
+    option_types gives the put/call flag for each point in the same order as raw.vol_points.
+    """
+    points = raw.vol_points
+    columns = np.array([(p.mark_price, p.forward_price, p.strike_value, p.time_to_expiry, p.discounting_rate)
+                        for p in points], dtype=np.float64).reshape(len(points), 5)
+    strike = columns[:, 2]
+    if raw.strike_type == StrikeType.LOG_MONEYNESS:
+        strike = raw.spot_price * np.exp(strike)
+    return implied_vol(columns[:, 0], columns[:, 1], strike, columns[:, 3], columns[:, 4], option_types, **kwargs)
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.engine import (SECONDS_PER_YEAR, VEGA_SCALE, OptionMarketData,
+                                                               OptionValuationColumns, OptionValuationEngine,
+                                                               extract_inputs)
+from serenity_types.pricing.derivatives.options.overrides import resolve_overrides
+from serenity_types.pricing.derivatives.options.valuation import OptionValuationRequest
+
+SKEW_BUMP = 0.0001
+"""
+Relative spot bump used to measure how each option's vol moves with spot along the smile.
+"""
+
+
+class IncrementalOptionRepricer:
+    """
+    Streaming valuation of a book in real-time mode (as_of_time None). Each update either runs a full
+    OptionValuationEngine valuation, cached as the base, or approximates the book from the cached base greeks:
+
+    pv = pv0 + delta0 dS + gamma0 dS^2 / 2 + vega0 dVol + vanna0 dS dVol + theta0 dt,
+    delta = delta0 + gamma0 dS + vanna0 dVol and vega = vega0 + vanna0 dS,
+
+    where dVol adds the move along the smile as the option's moneyness changes to the change in the observed
+    vol shift since the base, matching the engine's re-reading of the surface at the new spot. The base is
+    priced with the vol shift of its update applied, so the moves are always measured from it. The
+    position-scaled delta, gamma and vega are recomputed from the moved greeks; theta and rho, and their
+    position-scaled columns, are those of the base until the next full reprice. The error in pv is third
+    order in the moves, so it is bounded by the spot_threshold (relative to the base spot) and the
+    vol_threshold (absolute vol); a full reprice runs whenever a move crosses either threshold, when the
+    surface or curves change or when the base is older than max_age. Options with replacement overrides for
+    spot or vol do not move.
+    """
+
+    def __init__(self, request: OptionValuationRequest, engine: Optional[OptionValuationEngine] = None,
+                 spot_threshold: float = 0.005, vol_threshold: float = 0.005,
+                 max_age: timedelta = timedelta(seconds=60)):
+        if request.as_of_time is not None:
+            raise ValueError('Incremental repricing is only supported in real-time mode, without as_of_time')
+        self.request = request
+        self.engine = engine or OptionValuationEngine()
+        self.spot_threshold = spot_threshold
+        self.vol_threshold = vol_threshold
+        self.max_age = max_age
+        self.full_reprices = 0
+
+        overrides = resolve_overrides(request)
+        inputs = extract_inputs(request.options)
+        self._spot_moves = ~overrides.spot_price.replace_mask
+        self._vol_moves = ~overrides.implied_vol.replace_mask
+        self._position = inputs.qty * inputs.contract_size
+        self._base: Optional[OptionValuationColumns] = None
+        self._skew: Optional[np.ndarray] = None
+        self._vanna: Optional[np.ndarray] = None
+        self._base_market_data: Optional[OptionMarketData] = None
+        self._base_time: Optional[datetime] = None
+        self._base_vol_shift = 0.0
+
+    def update(self, market_data: OptionMarketData, vol_shift: float = 0.0,
+               now: Optional[datetime] = None) -> OptionValuationColumns:
+        """
+        Values the book at the latest spot in market_data, with vol_shift a parallel move in vols observed
+        since the last surface build, e.g. from ATM vol ticks.
+        """
+        now = now or datetime.now(timezone.utc)
+        if self._needs_full_reprice(market_data, vol_shift, now):
+            return self.reprice(market_data, vol_shift, now)
+        return self._approximate(market_data.spot_price - self._base_market_data.spot_price,
+                                 vol_shift - self._base_vol_shift,
+                                 (now - self._base_time).total_seconds() / SECONDS_PER_YEAR)
+
+    def reprice(self, market_data: OptionMarketData, vol_shift: float = 0.0,
+                now: Optional[datetime] = None) -> OptionValuationColumns:
+        """
+        Runs a full valuation with the vol shift applied and caches it as the new base for incremental
+        updates.
+        """
+        now = now or datetime.now(timezone.utc)
+        resolved = self.engine.resolve(self.request, market_data, now)
+        surface_vol = resolved.vol
+        resolved = resolved._replace(vol=surface_vol + np.where(self._vol_moves, vol_shift, 0.0))
+        self._base = self.engine.price(resolved)
+        bumped_spot = resolved.spot * (1 + SKEW_BUMP)
+        self._skew = (self.engine.vols(resolved, bumped_spot) - surface_vol) / (bumped_spot - resolved.spot)
+        std_dev = resolved.vol * np.sqrt(resolved.time_to_expiry)
+        d2 = np.log(self._base.forward_price / resolved.inputs.strike) / std_dev - 0.5 * std_dev
+        self._vanna = -self._base.vega * d2 / (resolved.spot * std_dev)
+        self._base_market_data = market_data
+        self._base_time = now
+        self._base_vol_shift = vol_shift
+        self.full_reprices += 1
+        return self._base
+
+    def _needs_full_reprice(self, market_data: OptionMarketData, vol_shift: float, now: datetime) -> bool:
+        base_market_data = self._base_market_data
+        if base_market_data is None or now - self._base_time > self.max_age:
+            return True
+        if (market_data.vol_surface is not base_market_data.vol_surface
+                or market_data.projection_curve is not base_market_data.projection_curve
+                or market_data.discounting_curve is not base_market_data.discounting_curve):
+            return True
+        spot_move = abs(market_data.spot_price / base_market_data.spot_price - 1)
+        return spot_move > self.spot_threshold or abs(vol_shift - self._base_vol_shift) > self.vol_threshold
+
+    def _approximate(self, spot_move: float, vol_shift: float, elapsed: float) -> OptionValuationColumns:
+        base = self._base
+        position = self._position
+        d_spot = np.where(self._spot_moves, spot_move, 0.0)
+        d_vol = np.where(self._vol_moves, vol_shift, 0.0) + self._skew * d_spot
+        spot = base.spot_price + d_spot
+        delta = base.delta + base.gamma * d_spot + self._vanna * d_vol
+        vega = base.vega + self._vanna * d_spot
+        pv = base.pv + base.delta * d_spot + 0.5 * base.gamma * d_spot * d_spot + base.vega * d_vol + \
+            self._vanna * d_spot * d_vol + base.theta * elapsed
+        return base._replace(pv=pv, iv=base.iv + d_vol, spot_price=spot, spot_notional=position * spot,
+                             forward_price=base.forward_price * spot / base.spot_price, delta=delta,
+                             delta_qty=delta * position, delta_ccy=delta * position * spot,
+                             gamma_ccy=base.gamma * position * spot * spot, vega=vega,
+                             vega_ccy=vega * VEGA_SCALE * position)
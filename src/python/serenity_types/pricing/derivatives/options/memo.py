@@ -0,0 +1,195 @@
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.engine import (OptionMarketData, OptionValuationColumns,
+                                                               OptionValuationEngine)
+from serenity_types.pricing.derivatives.options.valuation import (MarketDataOverride, OptionValuation,
+                                                                  OptionValuationRequest, OptionValuationResult)
+from serenity_types.pricing.derivatives.options.volsurface import VolatilitySurfaceVersion
+from serenity_types.pricing.derivatives.rates.yield_curve import InterpolatedYieldCurve, YieldCurveVersion
+from serenity_types.utils.serialization import CamelModel
+
+POSITION_COLUMNS = ('spot_notional', 'delta_qty', 'delta_ccy', 'gamma_ccy', 'vega_ccy', 'rho_ccy', 'theta_ccy')
+"""
+Result columns that scale linearly with the position (qty X contract_size); everything else is per unit.
+"""
+
+_POSITION_MASK = np.array([field in POSITION_COLUMNS for field in OptionValuationColumns._fields])
+
+
+class MarketDataVersions(NamedTuple):
+    """
+    Identifies the versions of the stored market data behind an OptionMarketData, so that cached valuations
+    are only re-used against the same surface and curve builds.
+    """
+
+    vol_surface_id: UUID
+    """
+    Unique ID of the VolatilitySurfaceDefinition the surface was loaded from.
+    """
+
+    vol_surface_as_of_time: datetime
+    """
+    The as_of_time of the VolatilitySurfaceVersion loaded.
+    """
+
+    projection_curve_as_of_time: Optional[datetime] = None
+    """
+    The as_of_time of the projection YieldCurveVersion loaded, if any.
+    """
+
+    discounting_curve_as_of_time: Optional[datetime] = None
+    """
+    The as_of_time of the discounting YieldCurveVersion loaded, if any.
+    """
+
+    @classmethod
+    def from_versions(cls, vol_surface: VolatilitySurfaceVersion,
+                      projection_curve: Optional[YieldCurveVersion] = None,
+                      discounting_curve: Optional[YieldCurveVersion] = None) -> 'MarketDataVersions':
+        return cls(vol_surface_id=vol_surface.interpolated.definition.vol_surface_id,
+                   vol_surface_as_of_time=vol_surface.as_of_time,
+                   projection_curve_as_of_time=projection_curve.as_of_time if projection_curve else None,
+                   discounting_curve_as_of_time=discounting_curve.as_of_time if discounting_curve else None)
+
+
+def content_hash(model: Optional[CamelModel]) -> Optional[str]:
+    """
+    Canonical hash of a by-value input (e.g. a client-provided surface or curve override) in a request.
+    """
+    if model is None:
+        return None
+    return hashlib.blake2b(model.json(sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _override_key(override: Optional[MarketDataOverride]) -> Optional[Tuple]:
+    return None if override is None else (override.replacement, override.additive_bump)
+
+
+def option_key(option: OptionValuation) -> Tuple:
+    """
+    Canonical key of the economics of an option: everything that determines its per-unit valuation, but
+    not its correlation ID or qty.
+    """
+    return (option.underlier_asset_id, option.strike, option.expiry, option.option_type, option.option_style,
+            option.contract_size, _override_key(option.spot_price_override),
+            _override_key(option.implied_vol_override))
+
+
+def _curve_id(curve: Optional[InterpolatedYieldCurve]) -> Optional[UUID]:
+    return curve.definition.yield_curve_id if curve else None
+
+
+def request_key(request: OptionValuationRequest, market_data: OptionMarketData, versions: MarketDataVersions,
+                valuation_time: Optional[datetime] = None) -> Optional[Tuple]:
+    """
+    Key of the request-wide inputs shared by every option in the request, or None in real-time mode, where
+    the valuation time moves on every call and results cannot be re-used.
+    """
+    valuation_time = valuation_time or request.as_of_time
+    if valuation_time is None:
+        return None
+    return (versions, market_data.spot_price, _curve_id(market_data.projection_curve),
+            _curve_id(market_data.discounting_curve), valuation_time, request.vol_model, request.discounting_method,
+            request.projection_method, content_hash(request.vol_surface),
+            content_hash(request.projection_curve_override), content_hash(request.discounting_curve_override))
+
+
+class MemoizedOptionValuationEngine:
+    """
+    Memoizing front-end to OptionValuationEngine for workloads such as dashboard refreshes, where the same
+    option economics are revalued many times against the same surface and curve versions. Per-unit
+    valuations are cached under the request key plus the option key, so options differing only in ID or
+    qty share an entry, and are evicted least-recently-used beyond max_size entries. When a newer version
+    of a vol surface is seen, every entry computed against older versions of it is dropped.
+    """
+
+    def __init__(self, engine: Optional[OptionValuationEngine] = None, max_size: int = 100_000):
+        self.engine = engine or OptionValuationEngine()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[Tuple[Hashable, Hashable], np.ndarray]' = OrderedDict()
+        self._latest_versions: Dict[UUID, datetime] = {}
+        self._keys_by_surface: Dict[UUID, Set[Tuple[Hashable, Hashable]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def value(self, request: OptionValuationRequest, market_data: OptionMarketData, versions: MarketDataVersions,
+              valuation_time: Optional[datetime] = None) -> List[OptionValuationResult]:
+        columns = self.value_columns(request, market_data, versions, valuation_time)
+        return columns.to_results([o.option_valuation_id for o in request.options], request.vol_model)
+
+    def value_columns(self, request: OptionValuationRequest, market_data: OptionMarketData,
+                      versions: MarketDataVersions,
+                      valuation_time: Optional[datetime] = None) -> OptionValuationColumns:
+        context = request_key(request, market_data, versions, valuation_time)
+        if context is None:
+            return self.engine.value_columns(request, market_data, valuation_time)
+        cacheable = self._observe_version(versions)
+
+        keys = [(context, option_key(option)) for option in request.options]
+        rows, missed = self._lookup(keys)
+        if missed:
+            unit_rows = self._value_units(request, market_data, valuation_time, missed)
+            for i, row in zip(missed, unit_rows):
+                rows[i] = row
+                if cacheable:
+                    self._put(keys[i], versions.vol_surface_id, row)
+
+        table = np.array(rows, dtype=np.float64).reshape(len(rows), len(OptionValuationColumns._fields))
+        qty = np.array([1 if o.qty is None else o.qty for o in request.options], dtype=np.float64)
+        table[:, _POSITION_MASK] *= qty[:, None]
+        return OptionValuationColumns(*table.T)
+
+    def invalidate(self, vol_surface_id: Optional[UUID] = None):
+        """
+        Drops the entries for one vol surface, or everything.
+        """
+        if vol_surface_id is None:
+            self._cache.clear()
+            self._keys_by_surface.clear()
+            return
+        for key in self._keys_by_surface.pop(vol_surface_id, ()):
+            self._cache.pop(key, None)
+
+    def _value_units(self, request: OptionValuationRequest, market_data: OptionMarketData,
+                     valuation_time: Optional[datetime], indices: List[int]) -> np.ndarray:
+        sub_request = request.copy(update={'options': [request.options[i] for i in indices]})
+        resolved = self.engine.resolve(sub_request, market_data, valuation_time)
+        resolved = resolved._replace(inputs=resolved.inputs._replace(qty=np.ones(len(indices))))
+        return np.column_stack(self.engine.price(resolved))
+
+    def _observe_version(self, versions: MarketDataVersions) -> bool:
+        latest = self._latest_versions.get(versions.vol_surface_id)
+        if latest is not None and versions.vol_surface_as_of_time < latest:
+            return False
+        if latest is not None and versions.vol_surface_as_of_time > latest:
+            self.invalidate(versions.vol_surface_id)
+        self._latest_versions[versions.vol_surface_id] = versions.vol_surface_as_of_time
+        return True
+
+    def _lookup(self, keys: List[Tuple[Hashable, Hashable]]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        rows = [self._cache.get(key) for key in keys]
+        missed = []
+        for i, row in enumerate(rows):
+            if row is None:
+                missed.append(i)
+            else:
+                self._cache.move_to_end(keys[i])
+        self.hits += len(rows) - len(missed)
+        self.misses += len(missed)
+        return rows, missed
+
+    def _put(self, key: Tuple[Hashable, Hashable], vol_surface_id: UUID, row: np.ndarray):
+        self._cache[key] = row
+        self._keys_by_surface.setdefault(vol_surface_id, set()).add(key)
+        while len(self._cache) > self.max_size:
+            evicted, _ = self._cache.popitem(last=False)
+            self._keys_by_surface[evicted[0][0].vol_surface_id].discard(evicted)
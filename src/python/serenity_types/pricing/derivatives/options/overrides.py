@@ -0,0 +1,124 @@
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.valuation import (MarketDataOverride, OptionValuationRequest,
+                                                                  YieldCurveOverride)
+
+
+class OverrideArrays(NamedTuple):
+    """
+    A batch of MarketDataOverrides gathered into mask and value arrays, one element per override.
+    """
+
+    replace_mask: np.ndarray
+    """
+    True where the base value is replaced.
+    """
+
+    replacement: np.ndarray
+    """
+    The replacement values, zero where not replaced.
+    """
+
+    bump: np.ndarray
+    """
+    The additive bumps, zero where not bumped.
+    """
+
+    def apply(self, base: np.ndarray) -> np.ndarray:
+        """
+        Applies the overrides to the base market data in a single step; the base may carry extra leading
+        dimensions (e.g. scenarios) that broadcast against the override arrays.
+        """
+        return np.where(self.replace_mask, self.replacement, base + self.bump)
+
+
+class RequestOverrides(NamedTuple):
+    """
+    All the MarketDataOverrides in an OptionValuationRequest, gathered into arrays. The per-option overrides
+    have one element per option, in request order; the curve rate overrides have a single element that
+    broadcasts across the options.
+    """
+
+    spot_price: OverrideArrays
+    """
+    The OptionValuation.spot_price_override values.
+    """
+
+    implied_vol: OverrideArrays
+    """
+    The OptionValuation.implied_vol_override values.
+    """
+
+    projection_rate: OverrideArrays
+    """
+    The projection_curve_override.rate_override value.
+    """
+
+    discounting_rate: OverrideArrays
+    """
+    The discounting_curve_override.rate_override value.
+    """
+
+
+def _override_values(override: Optional[MarketDataOverride]):
+    if override is None:
+        return np.nan, np.nan
+    return (np.nan if override.replacement is None else override.replacement,
+            np.nan if override.additive_bump is None else override.additive_bump)
+
+
+def _to_override_arrays(replacement: np.ndarray, bump: np.ndarray) -> OverrideArrays:
+    replace_mask = ~np.isnan(replacement)
+    return OverrideArrays(replace_mask=replace_mask, replacement=np.where(replace_mask, replacement, 0.0),
+                          bump=np.nan_to_num(bump, nan=0.0))
+
+
+def _conflicts(replacement: np.ndarray, bump: np.ndarray) -> np.ndarray:
+    # mirrors MarketDataOverride's validator, which only rejects a non-zero replacement with a non-zero bump
+    return np.nan_to_num(replacement, nan=0.0).astype(bool) & np.nan_to_num(bump, nan=0.0).astype(bool)
+
+
+def gather_overrides(overrides: Sequence[Optional[MarketDataOverride]]) -> OverrideArrays:
+    """
+    Gathers a sequence of optional MarketDataOverrides into arrays, raising ValueError if any override
+    specifies both a replacement and an additive_bump.
+    """
+    values = np.array([_override_values(override) for override in overrides], dtype=np.float64)
+    values = values.reshape(len(overrides), 2)
+    conflicts = np.flatnonzero(_conflicts(values[:, 0], values[:, 1]))
+    if len(conflicts) > 0:
+        raise ValueError(f"Overrides at positions {conflicts.tolist()}: please specify only one of "
+                         f"'replacement' or 'additive_bump'")
+    return _to_override_arrays(values[:, 0], values[:, 1])
+
+
+def _curve_rate_overrides(curve_override: Optional[YieldCurveOverride], usage: str) -> OverrideArrays:
+    try:
+        return gather_overrides([curve_override.rate_override if curve_override else None])
+    except ValueError:
+        raise ValueError(f"{usage} rate_override: please specify only one of 'replacement' or 'additive_bump'")
+
+
+def resolve_overrides(request: OptionValuationRequest) -> RequestOverrides:
+    """
+    Gathers every MarketDataOverride in the request in a single pass over the options and checks the
+    replacement XOR additive_bump rule for all of them at once, so that a request with conflicting
+    overrides is rejected with the full list of offending options rather than the first one found.
+    """
+    options = request.options
+    values = np.array([_override_values(option.spot_price_override) + _override_values(option.implied_vol_override)
+                       for option in options], dtype=np.float64).reshape(len(options), 4)
+
+    conflicts = _conflicts(values[:, 0], values[:, 1]) | _conflicts(values[:, 2], values[:, 3])
+    if conflicts.any():
+        conflicting_ids: List[str] = [options[i].option_valuation_id for i in np.flatnonzero(conflicts)]
+        raise ValueError(f"Options {conflicting_ids}: please specify only one of 'replacement' or "
+                         f"'additive_bump' in spot_price_override and implied_vol_override")
+
+    return RequestOverrides(spot_price=_to_override_arrays(values[:, 0], values[:, 1]),
+                            implied_vol=_to_override_arrays(values[:, 2], values[:, 3]),
+                            projection_rate=_curve_rate_overrides(request.projection_curve_override, 'projection'),
+                            discounting_rate=_curve_rate_overrides(request.discounting_curve_override,
+                                                                   'discounting'))
@@ -0,0 +1,97 @@
+from enum import Enum
+from typing import List, Optional
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.volsurface import (InterpolatedVolatilitySurface,
+                                                                   RawVolatilitySurface, StrikeType, VolModel,
+                                                                   VolPoint)
+
+
+class StrikeAnchoring(Enum):
+    """
+    Assumption for how implied vols move when the spot (or forward) the strikes are expressed against moves.
+    """
+
+    STICKY_STRIKE = 'STICKY_STRIKE'
+    """
+    The vol for a given absolute strike is unchanged, so log-moneyness strikes shift by log(old / new).
+    """
+
+    STICKY_MONEYNESS = 'STICKY_MONEYNESS'
+    """
+    The vol for a given moneyness is unchanged, so absolute strikes scale by new / old.
+    """
+
+
+def convert_strikes(strikes: np.ndarray, from_type: StrikeType, to_type: StrikeType, anchor: np.ndarray,
+                    new_anchor: Optional[np.ndarray] = None,
+                    anchoring: StrikeAnchoring = StrikeAnchoring.STICKY_STRIKE) -> np.ndarray:
+    """
+    Re-expresses an array of strikes between StrikeType representations, optionally re-anchoring them from the
+    anchor (the spot or forward the strikes are quoted against) to new_anchor under the given anchoring
+    assumption. Anchors can be scalars or arrays broadcasting against the strikes, e.g. per-point forwards.
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    anchor = np.asarray(anchor, dtype=np.float64)
+    new_anchor = anchor if new_anchor is None else np.asarray(new_anchor, dtype=np.float64)
+
+    absolute = strikes if from_type == StrikeType.ABSOLUTE else anchor * np.exp(strikes)
+    if anchoring == StrikeAnchoring.STICKY_MONEYNESS:
+        absolute = absolute * (new_anchor / anchor)
+    return absolute if to_type == StrikeType.ABSOLUTE else np.log(absolute / new_anchor)
+
+
+def reanchor_surface(surface: InterpolatedVolatilitySurface, anchor: float, new_anchor: float,
+                     anchoring: StrikeAnchoring = StrikeAnchoring.STICKY_STRIKE) -> InterpolatedVolatilitySurface:
+    """
+    Re-centres a fitted LOG_MONEYNESS surface on a new spot or forward; the result is still a LOG_MONEYNESS
+    surface, as this does not convert between strike types. Under sticky-strike the whole mesh shifts by
+    log(anchor / new_anchor) and the SVI m parameter of every slice shifts with it; under sticky-moneyness the
+    surface is unchanged.
+    """
+    if surface.definition.strike_type != StrikeType.LOG_MONEYNESS:
+        raise ValueError(f'Can only re-anchor LOG_MONEYNESS surfaces, not {surface.definition.strike_type.value}')
+    if anchoring == StrikeAnchoring.STICKY_MONEYNESS:
+        return surface.copy(deep=True)
+
+    shift = float(np.log(anchor / new_anchor))
+    strikes = (np.asarray(surface.strikes, dtype=np.float64) + shift).tolist()
+    calibration_params = surface.calibration_params
+    if surface.definition.vol_model == VolModel.SVI:
+        calibration_params = {expiry: {**params, 'm': params['m'] + shift} if 'm' in params else dict(params)
+                              for expiry, params in calibration_params.items()}
+    return surface.copy(update={'strikes': strikes, 'calibration_params': calibration_params}, deep=True)
+
+
+def convert_vol_points(points: List[VolPoint], from_type: StrikeType, to_type: StrikeType, spot_price: float,
+                       new_spot_price: Optional[float] = None,
+                       anchoring: StrikeAnchoring = StrikeAnchoring.STICKY_STRIKE,
+                       anchor_to_forward: bool = False) -> List[VolPoint]:
+    """
+    Converts the strike_value of every VolPoint in one vectorized pass. Log-moneyness is measured against spot
+    by default, or against each point's own forward_price with anchor_to_forward; on a spot move forwards are
+    scaled with the spot. The observed mark_price and iv are carried over as-is, per the anchoring assumption.
+    """
+    new_spot_price = spot_price if new_spot_price is None else new_spot_price
+    strikes = np.fromiter((p.strike_value for p in points), dtype=np.float64, count=len(points))
+    forwards = np.fromiter((p.forward_price for p in points), dtype=np.float64, count=len(points))
+    new_forwards = forwards * (new_spot_price / spot_price)
+
+    if anchor_to_forward:
+        converted = convert_strikes(strikes, from_type, to_type, forwards, new_forwards, anchoring)
+    else:
+        converted = convert_strikes(strikes, from_type, to_type, spot_price, new_spot_price, anchoring)
+    return [point.copy(update={'strike_value': strike, 'forward_price': forward})
+            for point, strike, forward in zip(points, converted.tolist(), new_forwards.tolist())]
+
+
+def convert_raw_surface(raw: RawVolatilitySurface, to_type: StrikeType, new_spot_price: Optional[float] = None,
+                        anchoring: StrikeAnchoring = StrikeAnchoring.STICKY_STRIKE) -> RawVolatilitySurface:
+    """
+    Converts a raw surface to the given StrikeType, optionally re-anchoring it to a new spot price.
+    """
+    new_spot_price = raw.spot_price if new_spot_price is None else new_spot_price
+    vol_points = convert_vol_points(raw.vol_points, raw.strike_type, to_type, raw.spot_price, new_spot_price,
+                                    anchoring)
+    return RawVolatilitySurface(strike_type=to_type, spot_price=new_spot_price, vol_points=vol_points)
@@ -0,0 +1,102 @@
+from typing import Dict, NamedTuple
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.volsurface import InterpolatedVolatilitySurface, VolModel
+
+
+SVI_PARAMETER_NAMES = ('a', 'b', 'rho', 'm', 'sigma')
+"""
+Keys of the raw SVI parameter set stored per slice in InterpolatedVolatilitySurface.calibration_params.
+"""
+
+
+def svi_total_variance(log_moneyness: np.ndarray, a, b, rho, m, sigma) -> np.ndarray:
+    """
+    Raw SVI parameterization of total implied variance, w(k) = a + b * (rho * (k - m) + sqrt((k - m)^2 + sigma^2)).
+    All arguments broadcast, so the parameters can be scalars for a single slice or per-point arrays.
+    """
+    shifted = log_moneyness - m
+    return a + b * (rho * shifted + np.sqrt(shifted * shifted + sigma * sigma))
+
+
+class SVIEvaluation(NamedTuple):
+    """
+    Output of a batch SVI surface evaluation; each array has the broadcast shape of the inputs.
+    """
+
+    vols: np.ndarray
+    """
+    Implied volatilities, i.e. sqrt(total_variance / time_to_expiry).
+    """
+
+    total_variances: np.ndarray
+    """
+    Total implied variance, i.e. vol^2 * time_to_expiry.
+    """
+
+
+class SVISurfaceEvaluator:
+    """
+    Evaluates a calibrated SVI volatility surface at arbitrary (log-moneyness, time to expiry) points. The
+    per-slice parameter dicts are unpacked once into parameter arrays sorted by expiry; each query then costs
+    two SVI evaluations per point, interpolating linearly in total variance between the neighbouring slices.
+    Outside of the calibrated expiry range the nearest slice is extrapolated with flat implied volatility.
+    """
+
+    def __init__(self, calibration_params: Dict[float, Dict[str, float]]):
+        if len(calibration_params) == 0:
+            raise ValueError('Cannot evaluate an SVI surface without any calibrated slices')
+
+        expiries = sorted(calibration_params.keys())
+        try:
+            params = np.array([[calibration_params[expiry][name] for name in SVI_PARAMETER_NAMES]
+                               for expiry in expiries], dtype=np.float64)
+        except KeyError as e:
+            raise ValueError(f'SVI calibration_params missing parameter: {e}')
+
+        self.time_to_expiries = np.array(expiries, dtype=np.float64)
+        self.a, self.b, self.rho, self.m, self.sigma = (np.ascontiguousarray(col) for col in params.T)
+
+    @classmethod
+    def from_surface(cls, surface: InterpolatedVolatilitySurface) -> 'SVISurfaceEvaluator':
+        if surface.definition.vol_model != VolModel.SVI:
+            raise ValueError(f'Surface was calibrated with {surface.definition.vol_model.name}, not SVI')
+        return cls(surface.calibration_params)
+
+    def slice_total_variance(self, log_moneyness: np.ndarray, slice_index: np.ndarray) -> np.ndarray:
+        """
+        Total variance of the given calibrated slice(s) at the given log-moneyness, without time interpolation.
+        """
+        return svi_total_variance(log_moneyness, self.a[slice_index], self.b[slice_index],
+                                  self.rho[slice_index], self.m[slice_index], self.sigma[slice_index])
+
+    def total_variance(self, log_moneyness: np.ndarray, time_to_expiry: np.ndarray) -> np.ndarray:
+        k, t = np.broadcast_arrays(np.asarray(log_moneyness, dtype=np.float64),
+                                   np.asarray(time_to_expiry, dtype=np.float64))
+        expiries = self.time_to_expiries
+        if len(expiries) == 1:
+            return self.slice_total_variance(k, 0) * (t / expiries[0])
+
+        lower = np.clip(np.searchsorted(expiries, t, side='right') - 1, 0, len(expiries) - 2)
+        upper = lower + 1
+        lower_t = expiries[lower]
+        upper_t = expiries[upper]
+        lower_w = self.slice_total_variance(k, lower)
+        upper_w = self.slice_total_variance(k, upper)
+
+        weight = (t - lower_t) / (upper_t - lower_t)
+        w = lower_w + weight * (upper_w - lower_w)
+        w = np.where(t < expiries[0], lower_w * (t / expiries[0]), w)
+        w = np.where(t > expiries[-1], upper_w * (t / expiries[-1]), w)
+        return w
+
+    def evaluate(self, log_moneyness: np.ndarray, time_to_expiry: np.ndarray) -> SVIEvaluation:
+        t = np.asarray(time_to_expiry, dtype=np.float64)
+        w = self.total_variance(log_moneyness, t)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vols = np.sqrt(np.where(t > 0, w / t, np.nan))
+        return SVIEvaluation(vols=vols, total_variances=w)
+
+    def implied_vol(self, log_moneyness: np.ndarray, time_to_expiry: np.ndarray) -> np.ndarray:
+        return self.evaluate(log_moneyness, time_to_expiry).vols
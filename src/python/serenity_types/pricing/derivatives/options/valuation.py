@@ -119,7 +119,8 @@ class OptionValuation(CamelModel):
 
     option_style: Optional[OptionStyle] = OptionStyle.EUROPEAN
     """
-    The variety of option being priced. Our pricer only supports EUROPEAN at this time, so defaults accordingly.
+    The variety of option being priced, defaulting to EUROPEAN. The local OptionValuationEngine also prices
+    AMERICAN options, by the Barone-Adesi-Whaley approximation.
     """
 
     contract_size: Optional[float] = 1
@@ -0,0 +1,109 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.volsurface import InterpolatedVolatilitySurface
+
+
+def _axis_weights(axis: np.ndarray, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    For a sorted axis returns the bracketing (lower, upper) indices for every value in x and the linear
+    weight of the upper node; values outside of the axis are clamped to the nearest edge.
+    """
+    if len(axis) == 1:
+        zeros = np.zeros(x.shape, dtype=np.intp)
+        return zeros, zeros, np.zeros(x.shape)
+
+    clamped = np.clip(x, axis[0], axis[-1])
+    lower = np.clip(np.searchsorted(axis, clamped, side='right') - 1, 0, len(axis) - 2)
+    upper = lower + 1
+    weight = (clamped - axis[lower]) / (axis[upper] - axis[lower])
+    return lower, upper, weight
+
+
+class VolSurfaceGridIndex:
+    """
+    Query index over the flat (strike, time_to_expiry, vol) mesh of an InterpolatedVolatilitySurface, built
+    once per surface. If the mesh is rectilinear it is reshaped into a grid with sorted strike and expiry axes
+    and batch queries are answered by bilinear interpolation in total variance, locating the cell for each
+    point with searchsorted; strikes beyond the grid are held flat and expiries beyond it extrapolated with
+    flat implied vol. Otherwise the index falls back to inverse-distance weighting of implied vol over the
+    nearest mesh points, with strike and expiry scaled to their ranges.
+    """
+
+    def __init__(self, strikes: List[float], time_to_expiries: List[float], vols: List[float],
+                 neighbours: int = 4, chunk_size: int = 4096):
+        strikes = np.asarray(strikes, dtype=np.float64)
+        time_to_expiries = np.asarray(time_to_expiries, dtype=np.float64)
+        vols = np.asarray(vols, dtype=np.float64)
+        if not (len(strikes) == len(time_to_expiries) == len(vols)):
+            raise ValueError('strikes, time_to_expiries and vols must all have the same length')
+        if len(vols) == 0:
+            raise ValueError('Cannot index an empty volatility surface mesh')
+
+        self.strike_axis, strike_idx = np.unique(strikes, return_inverse=True)
+        self.expiry_axis, expiry_idx = np.unique(time_to_expiries, return_inverse=True)
+        num_strikes = len(self.strike_axis)
+        cells = expiry_idx * num_strikes + strike_idx
+        cell_counts = np.bincount(cells, minlength=num_strikes * len(self.expiry_axis))
+        self.is_rectilinear = bool(np.all(cell_counts == 1))
+
+        if self.is_rectilinear:
+            total_variance = np.empty(len(cells))
+            total_variance[cells] = vols * vols * time_to_expiries
+            self.total_variance_grid = total_variance.reshape(len(self.expiry_axis), num_strikes)
+        else:
+            self.points = np.column_stack([strikes, time_to_expiries])
+            self.point_scale = np.ptp(self.points, axis=0)
+            self.point_scale[self.point_scale == 0] = 1.0
+            self.point_vols = vols
+            self.neighbours = min(neighbours, len(vols))
+            self.chunk_size = chunk_size
+
+    @classmethod
+    def from_surface(cls, surface: InterpolatedVolatilitySurface, **kwargs) -> 'VolSurfaceGridIndex':
+        return cls(surface.strikes, surface.time_to_expiries, surface.vols, **kwargs)
+
+    def total_variance(self, strikes: np.ndarray, time_to_expiries: np.ndarray) -> np.ndarray:
+        k, t = np.broadcast_arrays(np.asarray(strikes, dtype=np.float64),
+                                   np.asarray(time_to_expiries, dtype=np.float64))
+        if self.is_rectilinear:
+            return self._grid_total_variance(k, t)
+        vols = self._scattered_vols(k.ravel(), t.ravel()).reshape(k.shape)
+        return vols * vols * t
+
+    def implied_vol(self, strikes: np.ndarray, time_to_expiries: np.ndarray) -> np.ndarray:
+        t = np.asarray(time_to_expiries, dtype=np.float64)
+        w = self.total_variance(strikes, t)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.sqrt(np.where(t > 0, w / t, np.nan))
+
+    def _grid_total_variance(self, k: np.ndarray, t: np.ndarray) -> np.ndarray:
+        k_lo, k_hi, k_weight = _axis_weights(self.strike_axis, k)
+        t_lo, t_hi, t_weight = _axis_weights(self.expiry_axis, t)
+        grid = self.total_variance_grid
+        w_lo = grid[t_lo, k_lo] + k_weight * (grid[t_lo, k_hi] - grid[t_lo, k_lo])
+        w_hi = grid[t_hi, k_lo] + k_weight * (grid[t_hi, k_hi] - grid[t_hi, k_lo])
+        w = w_lo + t_weight * (w_hi - w_lo)
+
+        # flat implied vol beyond the first and last expiry
+        clamped_t = np.clip(t, self.expiry_axis[0], self.expiry_axis[-1])
+        return w * (t / clamped_t)
+
+    def _scattered_vols(self, k: np.ndarray, t: np.ndarray) -> np.ndarray:
+        queries = np.column_stack([k, t]) / self.point_scale
+        points = self.points / self.point_scale
+        vols = np.empty(len(queries))
+        for start in range(0, len(queries), self.chunk_size):
+            chunk = queries[start:start + self.chunk_size]
+            dist2 = ((chunk[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+            nearest = np.argpartition(dist2, self.neighbours - 1, axis=1)[:, :self.neighbours]
+            nearest_dist2 = np.take_along_axis(dist2, nearest, axis=1)
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / nearest_dist2
+
+            # exact hits on a mesh point take that point's vol
+            exact = np.isinf(weights)
+            weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(np.float64), weights)
+            vols[start:start + len(chunk)] = (weights * self.point_vols[nearest]).sum(axis=1) / weights.sum(axis=1)
+        return vols
@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Union
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.marketdata.marks import AssetMarkPrice
+from serenity_types.pricing.derivatives.options.engine import SECONDS_PER_YEAR
+from serenity_types.pricing.derivatives.rates.parity import expiry_datetime
+from serenity_types.pricing.derivatives.rates.yield_curve import CurvePoint, RateSourceType, RawYieldCurve
+from serenity_types.refdata.derivatives import PayoffType
+from serenity_types.refdata.futures import Future, Perpetual
+
+DEFAULT_FUNDING_INTERVAL = timedelta(hours=8)
+"""
+The period each perpetual funding print applies to, e.g. 8 hours on most exchanges.
+"""
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _tenor(interval: timedelta) -> str:
+    hours = interval.total_seconds() / 3600
+    return f'{hours:g}H' if hours < 24 else f'{hours / 24:g}D'
+
+
+def _contract_values(inverse: np.ndarray, marks_in_coin: bool,
+                     contract_values_ccy: Optional[Sequence[float]]) -> np.ndarray:
+    if contract_values_ccy is not None:
+        return np.asarray(contract_values_ccy, dtype=np.float64)
+    if marks_in_coin and inverse.any():
+        raise ValueError('contract_values_ccy is required for INVERSE futures marked in coin')
+    return np.full(len(inverse), np.nan)
+
+
+class FuturesBasisCurveBuilder:
+    """
+    Builds FUTURE_PX and FUNDING_RATE yield curve inputs from futures marks: the implied continuously-compounded
+    rate to each expiry is log(F / S) / T, i.e. DF = S / F. Contract economics are extracted into arrays once
+    when the builder is created, so that rebuilding the RawYieldCurve on each futures tick only costs a few
+    vectorized operations.
+
+    An INVERSE future has a fixed face value in base currency, e.g. 10 USD on Deribit, as for value_futures;
+    the USD value of its payoff, contract_value_ccy X (S_T / F - 1), is linear in S_T just like a LINEAR
+    future's, so both imply the same forward and the payoff type only matters for how the mark is quoted.
+    INVERSE marks are taken to be quoted like LINEAR ones, in base currency per unit of underlying, unless
+    inverse_marks_in_coin is set, in which case they are the coin value of one contract, contract_value_ccy / F.
+    The face values, aligned with the futures and ignored for LINEAR ones, are then required, as
+    Future.contract_size is a qty of underlying.
+    """
+
+    def __init__(self, futures: List[Future], perpetuals: Optional[List[Perpetual]] = None,
+                 funding_interval: timedelta = DEFAULT_FUNDING_INTERVAL, inverse_marks_in_coin: bool = False,
+                 contract_values_ccy: Optional[Sequence[float]] = None):
+        self.futures = futures
+        self.perpetuals = perpetuals or []
+        self.funding_interval = funding_interval
+        self.inverse_marks_in_coin = inverse_marks_in_coin
+        self._asset_ids = [future.asset_id for future in futures]
+        self._positions = {asset_id: i for i, asset_id in enumerate(self._asset_ids)}
+        self._expiries = [expiry_datetime(future.expiry) for future in futures]
+        self._expiry_times = np.array([expiry.timestamp() for expiry in self._expiries], dtype=np.float64)
+        self._inverse = np.array([future.payoff_type == PayoffType.INVERSE for future in futures], dtype=bool)
+        self._contract_values = _contract_values(self._inverse, inverse_marks_in_coin, contract_values_ccy)
+
+    def future_marks(self, marks: List[AssetMarkPrice]) -> np.ndarray:
+        """
+        Aligns marks with the builder's futures, NaN where a future has no mark.
+        """
+        aligned = np.full(len(self.futures), np.nan)
+        for mark in marks:
+            position = self._positions.get(mark.asset_id)
+            if position is not None:
+                aligned[position] = mark.mark_price
+        return aligned
+
+    def build(self, spot_price: float, marks: Union[List[AssetMarkPrice], np.ndarray], as_of_time: datetime,
+              funding_prints: Optional[Dict[UUID, List[AssetMarkPrice]]] = None,
+              funding_window: timedelta = timedelta(days=1)) -> RawYieldCurve:
+        """
+        Builds the raw curve from the futures marks, either AssetMarkPrices or an array aligned with the
+        futures the builder was created with, plus the perpetual funding prints keyed by perpetual asset ID.
+        Futures without a mark or already expired are skipped.
+        """
+        as_of_time = _aware(as_of_time)
+        if not isinstance(marks, np.ndarray):
+            marks = self.future_marks(marks)
+        time_to_expiry = (self._expiry_times - as_of_time.timestamp()) / SECONDS_PER_YEAR
+        with np.errstate(divide='ignore', invalid='ignore'):
+            forward = np.where(self._inverse & self.inverse_marks_in_coin, self._contract_values / marks, marks)
+            rates = np.log(forward / spot_price) / time_to_expiry
+        valid = np.flatnonzero(np.isfinite(rates) & (time_to_expiry > 0))
+
+        points = [CurvePoint(pillar_date=self._expiries[i].date(), duration=float(time_to_expiry[i]),
+                             rate_source_type=RateSourceType.FUTURE_PX, reference_assets=[self._asset_ids[i]],
+                             mark_prices=[float(marks[i])], rate=float(rates[i]),
+                             discount_factor=float(spot_price / forward[i]))
+                  for i in valid.tolist()]
+        points.extend(self.funding_points(funding_prints or {}, as_of_time, funding_window))
+        points.sort(key=lambda point: point.duration)
+        return RawYieldCurve(points=points)
+
+    def funding_points(self, funding_prints: Dict[UUID, List[AssetMarkPrice]], as_of_time: datetime,
+                       window: timedelta = timedelta(days=1)) -> List[CurvePoint]:
+        """
+        Rolls up each perpetual's funding prints over the window ending at as_of_time into one short-end
+        point at the funding interval: the mean rate per interval, annualized with continuous compounding.
+        Positive funding, longs paying shorts, means the perpetual trades over spot and so a positive rate.
+        """
+        as_of_time = _aware(as_of_time)
+        duration = self.funding_interval.total_seconds() / SECONDS_PER_YEAR
+        points = []
+        for perpetual in self.perpetuals:
+            prints = [p for p in funding_prints.get(perpetual.asset_id, [])
+                      if as_of_time - window < _aware(p.mark_time) <= as_of_time]
+            if not prints:
+                continue
+            rates = np.array([p.mark_price for p in prints], dtype=np.float64)
+            rate = float(np.log1p(rates.mean()) / duration)
+            points.append(CurvePoint(tenor=_tenor(self.funding_interval), duration=duration,
+                                     rate_source_type=RateSourceType.FUNDING_RATE,
+                                     rate_sources=[str(perpetual.exchange_id)],
+                                     reference_assets=[perpetual.asset_id], mark_prices=rates.tolist(), rate=rate,
+                                     discount_factor=float(np.exp(-rate * duration))))
+        return points
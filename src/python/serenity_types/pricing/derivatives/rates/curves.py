@@ -0,0 +1,45 @@
+from typing import Tuple
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.rates.yield_curve import InterpolatedYieldCurve
+
+
+def curve_nodes(curve: InterpolatedYieldCurve) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sorted (durations, -log(discount_factor)) nodes of the curve, anchored at (0, 0).
+    """
+    durations = np.asarray(curve.durations, dtype=np.float64)
+    log_dfs = -np.log(np.asarray(curve.discount_factors, dtype=np.float64))
+    order = np.argsort(durations)
+    durations, log_dfs = durations[order], log_dfs[order]
+    if len(durations) == 0 or durations[0] > 0:
+        durations = np.concatenate([[0.0], durations])
+        log_dfs = np.concatenate([[0.0], log_dfs])
+    return durations, log_dfs
+
+
+def discount_factors(curve: InterpolatedYieldCurve, durations: np.ndarray) -> np.ndarray:
+    """
+    Flat-forward interpolation of discount factors at the given durations, i.e. linear in log(DF); beyond the
+    last pillar the curve is extrapolated with the last zero rate.
+    """
+    nodes, log_dfs = curve_nodes(curve)
+    durations = np.asarray(durations, dtype=np.float64)
+    interpolated = np.interp(durations, nodes, log_dfs)
+    if nodes[-1] > 0:
+        interpolated = np.where(durations > nodes[-1], durations * (log_dfs[-1] / nodes[-1]), interpolated)
+    return np.exp(-interpolated)
+
+
+def zero_rates(curve: InterpolatedYieldCurve, durations: np.ndarray) -> np.ndarray:
+    """
+    Continuously-compounded zero rates implied by the flat-forward interpolated discount factors. For zero
+    durations the instantaneous rate at the front of the curve is returned.
+    """
+    nodes, log_dfs = curve_nodes(curve)
+    durations = np.asarray(durations, dtype=np.float64)
+    front_rate = log_dfs[1] / nodes[1] if len(nodes) > 1 else 0.0
+    log_dfs_at = -np.log(discount_factors(curve, durations))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(durations > 0, log_dfs_at / durations, front_rate)
@@ -0,0 +1,105 @@
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.rates.curves import zero_rates
+from serenity_types.pricing.derivatives.rates.yield_curve import InterpolatedYieldCurve
+
+
+class Forwards(NamedTuple):
+    """
+    Forwards for every distinct expiry in a chain, plus the index of each option's expiry in those arrays.
+    """
+
+    time_to_expiry: np.ndarray
+    """
+    The distinct times to expiry, ascending, in years.
+    """
+
+    forward_price: np.ndarray
+    """
+    Forward price per distinct expiry, spot X exp(projection_rate X time_to_expiry).
+    """
+
+    projection_rate: np.ndarray
+    """
+    Zero rate of the projection curve per distinct expiry.
+    """
+
+    discounting_rate: np.ndarray
+    """
+    Zero rate of the discounting curve per distinct expiry; equal to projection_rate when self-discounting.
+    """
+
+    discount_factor: np.ndarray
+    """
+    Discount factor per distinct expiry, exp(-discounting_rate X time_to_expiry).
+    """
+
+    index: np.ndarray
+    """
+    For each option, the position of its expiry in the distinct arrays; e.g. forward_price[index] gives
+    per-option forwards.
+    """
+
+
+def curve_key(curve: InterpolatedYieldCurve) -> Hashable:
+    """
+    Content key of a curve version: its definition plus its pillars, so that a re-built curve under the same
+    definition gets a new key without the caller having to track versions.
+    """
+    return curve.definition.yield_curve_id, tuple(curve.durations), tuple(curve.discount_factors)
+
+
+class ForwardEngine:
+    """
+    Computes projection and discounting rates once per distinct expiry of a chain rather than once per option,
+    caching the rates per (curve version, expiry set) with least-recently-used eviction beyond max_size sets,
+    so that repeated valuations of a chain against the same curves only re-scale the forwards by spot.
+
+    The cache is keyed on the exact year fractions, so rates never depend on what was cached before; in
+    real-time mode, where the valuation time moves on every tick, it serves the valuations made at the same
+    instant, e.g. a scenario grid or several books on one tick.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._cache: 'OrderedDict[Tuple[Hashable, bytes], np.ndarray]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def forwards(self, spot: float, time_to_expiry: np.ndarray, projection_curve: InterpolatedYieldCurve,
+                 discounting_curve: Optional[InterpolatedYieldCurve] = None) -> Forwards:
+        """
+        Forwards for every distinct time to expiry; without a discounting_curve the projection curve is
+        also used for discounting (DiscountingMethod.SELF_DISCOUNTING).
+        """
+        distinct, index = np.unique(np.asarray(time_to_expiry, dtype=np.float64), return_inverse=True)
+        projection_rate = self._zero_rates(projection_curve, distinct)
+        discounting_rate = projection_rate if discounting_curve is None else \
+            self._zero_rates(discounting_curve, distinct)
+        return Forwards(time_to_expiry=distinct, forward_price=spot * np.exp(projection_rate * distinct),
+                        projection_rate=projection_rate, discounting_rate=discounting_rate,
+                        discount_factor=np.exp(-discounting_rate * distinct), index=index.reshape(-1))
+
+    def zero_rates(self, curve: InterpolatedYieldCurve, time_to_expiry: np.ndarray) -> np.ndarray:
+        """
+        Per-option zero rates, looked up once per distinct time to expiry.
+        """
+        distinct, index = np.unique(np.asarray(time_to_expiry, dtype=np.float64), return_inverse=True)
+        return self._zero_rates(curve, distinct)[index.reshape(np.shape(time_to_expiry))]
+
+    def _zero_rates(self, curve: InterpolatedYieldCurve, distinct: np.ndarray) -> np.ndarray:
+        key = (curve_key(curve), distinct.tobytes())
+        rates = self._cache.get(key)
+        if rates is not None:
+            self._cache.move_to_end(key)
+            return rates
+        rates = zero_rates(curve, distinct)
+        rates.setflags(write=False)
+        self._cache[key] = rates
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return rates
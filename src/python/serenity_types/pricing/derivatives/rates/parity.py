@@ -0,0 +1,173 @@
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.marketdata.marks import AssetMarkPrice
+from serenity_types.pricing.derivatives.options.engine import SECONDS_PER_YEAR
+from serenity_types.pricing.derivatives.rates.yield_curve import CurvePoint, CurveUsage, RateSourceType
+from serenity_types.refdata.derivatives import Expiry
+from serenity_types.refdata.options import ListedOption, OptionType
+
+
+def expiry_datetime(expiry: Expiry) -> datetime:
+    """
+    Exact expiration time of a contract; times without a timezone are taken to be UTC.
+    """
+    value = datetime.combine(expiry.expiration_date, expiry.expiration_time)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class ImpliedForwards(NamedTuple):
+    """
+    Forwards and discount factors implied by put-call parity, one element per (underlier, expiry) group
+    with enough put/call pairs, sorted by underlier and expiry.
+    """
+
+    underlier_asset_id: List[UUID]
+    """
+    The underlier of each group.
+    """
+
+    expiry: List[datetime]
+    """
+    The expiry of each group.
+    """
+
+    time_to_expiry: np.ndarray
+    """
+    Time to expiry of each group in years (ACT/365).
+    """
+
+    forward_price: np.ndarray
+    """
+    Implied forward price of each group.
+    """
+
+    discount_factor: np.ndarray
+    """
+    Implied discount factor to the expiry of each group, for the currency the options are marked in.
+    """
+
+    pairs: np.ndarray
+    """
+    Number of put/call pairs regressed in each group.
+    """
+
+    reference_assets: List[List[UUID]]
+    """
+    The options regressed in each group, by strike, call before put.
+    """
+
+    mark_prices: List[List[float]]
+    """
+    The mark prices of reference_assets.
+    """
+
+    def curve_points(self, usage: CurveUsage, spot_prices: Optional[Dict[UUID, float]] = None) -> List[CurvePoint]:
+        """
+        OPTION_PX CurvePoints per group. For DISCOUNTING curves the point carries the regressed discount factor;
+        for PROJECTION curves it carries the rate log(forward / spot) / time_to_expiry implied by the forward,
+        which needs the spot price of each underlier.
+        """
+        if usage == CurveUsage.PROJECTION:
+            if spot_prices is None:
+                raise ValueError('spot_prices are required for PROJECTION curve points')
+            spot = np.array([spot_prices[underlier] for underlier in self.underlier_asset_id], dtype=np.float64)
+            rates = np.log(self.forward_price / spot) / self.time_to_expiry
+            discount_factors = np.exp(-rates * self.time_to_expiry)
+        else:
+            discount_factors = self.discount_factor
+            rates = -np.log(discount_factors) / self.time_to_expiry
+        return [CurvePoint(pillar_date=expiry.date(), duration=duration, rate_source_type=RateSourceType.OPTION_PX,
+                           reference_assets=assets, mark_prices=prices, rate=rate, discount_factor=discount_factor)
+                for expiry, duration, assets, prices, rate, discount_factor
+                in zip(self.expiry, self.time_to_expiry.tolist(), self.reference_assets, self.mark_prices,
+                       rates.tolist(), discount_factors.tolist())]
+
+
+def _chain_rows(chain: List[ListedOption], marks: List[AssetMarkPrice]):
+    prices = {mark.asset_id: mark.mark_price for mark in marks}
+    expiries = {}
+    rows = []
+    for option in chain:
+        price = prices.get(option.asset_id)
+        if price is None:
+            continue
+        key = option.expiry.expiration_date, option.expiry.expiration_time
+        expiry = expiries.get(key)
+        if expiry is None:
+            expiry = expiries[key] = expiry_datetime(option.expiry)
+        rows.append((option.underlier_asset_id, expiry, option.strike_price, option.option_type == OptionType.CALL,
+                     price, option.asset_id))
+    return rows
+
+
+def _pair(group_codes: np.ndarray, strike: np.ndarray, is_call: np.ndarray):
+    # one slot per distinct (group, strike), sorted by group then strike; if an option is repeated the last wins
+    keys, pair_codes = np.unique(np.column_stack([group_codes, strike]), axis=0, return_inverse=True)
+    pair_codes = pair_codes.reshape(-1)
+    call_row = np.full(len(keys), -1)
+    put_row = np.full(len(keys), -1)
+    call_row[pair_codes[is_call]] = np.flatnonzero(is_call)
+    put_row[pair_codes[~is_call]] = np.flatnonzero(~is_call)
+    paired = np.flatnonzero((call_row >= 0) & (put_row >= 0))
+    return keys[paired, 0].astype(np.int64), keys[paired, 1], call_row[paired], put_row[paired]
+
+
+def _regress(group: np.ndarray, strike: np.ndarray, parity: np.ndarray, groups: int):
+    # per-group OLS of C - P = DF X F - DF X K, with all groups' sums accumulated in one bincount each
+    n = np.bincount(group, minlength=groups).astype(np.float64)
+    sum_k = np.bincount(group, strike, groups)
+    sum_y = np.bincount(group, parity, groups)
+    sum_kk = np.bincount(group, strike * strike, groups)
+    sum_ky = np.bincount(group, strike * parity, groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sum_ky - sum_k * sum_y) / (n * sum_kk - sum_k * sum_k)
+        intercept = (sum_y - slope * sum_k) / n
+        discount_factor = -slope
+        return n, discount_factor, intercept / discount_factor
+
+
+def extract_implied_forwards(chain: List[ListedOption], marks: List[AssetMarkPrice], as_of_time: datetime,
+                             min_pairs: int = 2) -> ImpliedForwards:
+    """
+    Backs out forwards and discount factors from an option chain in one pass: options are paired by
+    (underlier, expiry, strike) with sort-based grouping, and call - put = DF X (F - strike) is regressed
+    across the strikes of every (underlier, expiry) at once. Marks must be in base currency per unit of
+    underlying; options without a mark or a counterpart are skipped, as are expiries with fewer than
+    min_pairs pairs, non-positive discount factors or that have already expired.
+    """
+    rows = _chain_rows(chain, marks)
+    if not rows:
+        return ImpliedForwards([], [], np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64), [], [])
+    as_of_time = as_of_time if as_of_time.tzinfo else as_of_time.replace(tzinfo=timezone.utc)
+    underlier_ids, expiry_times, strikes, call_flags, prices, asset_ids = zip(*rows)
+    underliers, underlier_codes = np.unique(np.array(underlier_ids).astype(str), return_inverse=True)
+    expiries, expiry_codes = np.unique(np.array(expiry_times, dtype=object), return_inverse=True)
+    strike = np.array(strikes, dtype=np.float64)
+    is_call = np.array(call_flags, dtype=bool)
+    price = np.array(prices, dtype=np.float64)
+    group_codes = underlier_codes.reshape(-1) * len(expiries) + expiry_codes.reshape(-1)
+
+    pair_group, pair_strike, calls, puts = _pair(group_codes, strike, is_call)
+    parity = price[calls] - price[puts]
+
+    groups = len(underliers) * len(expiries)
+    n, discount_factor, forward = _regress(pair_group, pair_strike, parity, groups)
+    expiry_times = np.array([expiry.timestamp() for expiry in expiries])
+    time_to_expiry = np.tile((expiry_times - as_of_time.timestamp()) / SECONDS_PER_YEAR, len(underliers))
+    valid = np.flatnonzero((n >= min_pairs) & (discount_factor > 0) & (time_to_expiry > 0))
+
+    # pairs are sorted by group and then strike, so each group's options are a contiguous run
+    bounds = np.searchsorted(pair_group, np.r_[valid, valid + 1].reshape(2, -1))
+    legs = [np.column_stack([calls[start:end], puts[start:end]]).reshape(-1) for start, end in bounds.T]
+    asset_ids = np.array(asset_ids, dtype=object)
+    reference_assets = [asset_ids[group_legs].tolist() for group_legs in legs]
+    mark_prices = [price[group_legs].tolist() for group_legs in legs]
+    return ImpliedForwards(underlier_asset_id=[UUID(underliers[g // len(expiries)]) for g in valid],
+                           expiry=[expiries[g % len(expiries)] for g in valid],
+                           time_to_expiry=time_to_expiry[valid], forward_price=forward[valid],
+                           discount_factor=discount_factor[valid], pairs=n[valid].astype(np.int64),
+                           reference_assets=reference_assets, mark_prices=mark_prices)
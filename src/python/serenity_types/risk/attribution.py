@@ -0,0 +1,299 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.refdata.sector import AssetSectorMapping
+from serenity_types.risk.factor import (AssetRisk, FactorExposureValue, Risk, RiskAttributionRequest,
+                                        RiskAttributionResponse, RiskBreakdown, SectorFactorExposure,
+                                        SectorLevelRisk, TotalFactorRisk, TotalRisk)
+from serenity_types.risk.matrices import Element, exposure_matrix, factor_matrix, residual_vector
+
+
+class FactorRiskData(NamedTuple):
+    """
+    A factor risk model and prices resolved by the caller for a local risk attribution, with the asset X asset
+    covariance given by exposures X covariance X exposures' + diag(residual_variance).
+    """
+
+    asset_ids: List[UUID]
+    """
+    The assets of the rows of exposures, residual_variance and prices.
+    """
+
+    factors: List[str]
+    """
+    The factors of the columns of exposures and of covariance.
+    """
+
+    exposures: np.ndarray
+    """
+    Factor loadings, assets X factors.
+    """
+
+    covariance: np.ndarray
+    """
+    Factor covariance, factors X factors.
+    """
+
+    residual_variance: np.ndarray
+    """
+    Specific variance of each asset, i.e. the variance of its returns not explained by the factors.
+    """
+
+    prices: np.ndarray
+    """
+    Price of each asset in base currency; NaN if unknown.
+    """
+
+    @classmethod
+    def from_elements(cls, exposures: Sequence[Element], covariance: Sequence[Element],
+                      residuals: Sequence[Element], prices: Dict[UUID, float]) -> 'FactorRiskData':
+        """
+        Builds the model from its element lists, as models or decoded JSON, for the assets with any exposure.
+        """
+        loadings, assets, factors = exposure_matrix(exposures)
+        factor_covariance, _ = factor_matrix(covariance, factors)
+        residual_variance, _ = residual_vector(residuals, assets)
+        return cls(asset_ids=assets.keys, factors=factors.keys, exposures=loadings,
+                   covariance=factor_covariance.toarray(), residual_variance=residual_variance,
+                   prices=np.array([prices.get(asset_id, np.nan) for asset_id in assets.keys], dtype=np.float64))
+
+
+class FactorRiskContributions(NamedTuple):
+    """
+    Columnar factor risk decomposition of a portfolio; contributions to volatility are Euler allocations, so
+    absolute contributions sum across assets, or factors, to the portfolio volatility.
+    """
+
+    asset_ids: List[UUID]
+    """
+    The assets held, in the order of the per-asset arrays.
+    """
+
+    factors: List[str]
+    """
+    The factors of the model, in the order of the per-factor arrays.
+    """
+
+    value: np.ndarray
+    """
+    Net position value in base currency per asset.
+    """
+
+    scale: float
+    """
+    Value of the portfolio in base currency that weights are relative to: its absolute net value, or its gross
+    value if the net value is zero, e.g. for a dollar-neutral book.
+    """
+
+    weight: np.ndarray
+    """
+    Position value as a fraction of scale.
+    """
+
+    loadings: np.ndarray
+    """
+    Factor loadings of the assets held, assets X factors.
+    """
+
+    exposure: np.ndarray
+    """
+    Portfolio factor exposure, loadings' X weight.
+    """
+
+    variance: np.ndarray
+    """
+    Portfolio factor, specific and total variance.
+    """
+
+    marginal: np.ndarray
+    """
+    Marginal contribution to volatility, assets X (factor, specific, total): the change in portfolio volatility
+    per unit of weight added to each asset.
+    """
+
+    factor_marginal: np.ndarray
+    """
+    Marginal contribution to volatility of each factor: the change in portfolio volatility per unit of exposure
+    added to the factor.
+    """
+
+    @property
+    def volatility(self) -> float:
+        """
+        Total volatility of the portfolio.
+        """
+        return float(np.sqrt(self.variance[2]))
+
+    @property
+    def absolute(self) -> np.ndarray:
+        """
+        Absolute contribution to volatility, assets X (factor, specific, total): weight X marginal.
+        """
+        return self.weight[:, None] * self.marginal
+
+    @property
+    def factor_absolute(self) -> np.ndarray:
+        """
+        Absolute contribution of each factor to volatility: exposure X factor_marginal.
+        """
+        return self.exposure * self.factor_marginal
+
+
+def portfolio_scale(value: np.ndarray) -> float:
+    """
+    The absolute net value of the positions, falling back to their gross value when the longs and shorts net to
+    zero, so that a dollar-neutral book is weighted by gross value rather than reported without risk.
+    """
+    net, gross = abs(float(value.sum())), float(np.abs(value).sum())
+    return gross if net <= np.finfo(np.float64).eps * gross else net
+
+
+def _relative(absolute: np.ndarray, volatility: float) -> np.ndarray:
+    # a contribution to volatility over the volatility is the same contribution to variance over the variance
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(absolute / volatility)
+
+
+def _risk(cls, values: List[float], **kwargs):
+    return cls.construct(factor_risk=values[0], specific_risk=values[1], total_risk=values[2], **kwargs)
+
+
+def _exposure_value(exposure: float, scale: float) -> FactorExposureValue:
+    return FactorExposureValue.construct(factor_exposure=exposure, factor_exposure_base_ccy=exposure * scale)
+
+
+def _sector_groups(asset_ids: List[UUID], sectors: Dict[UUID, List[str]]) -> Tuple[List[List[str]], np.ndarray]:
+    # every level of the sector paths of the assets, and its groups X assets membership matrix
+    leaves: Dict[Tuple[str, ...], int] = {}
+    leaf = np.array([leaves.setdefault(tuple(sectors.get(asset_id, ())), len(leaves)) for asset_id in asset_ids],
+                    dtype=np.int64)
+    groups: Dict[Tuple[str, ...], int] = {}
+    levels = [(groups.setdefault(path[:depth], len(groups)), column)
+              for path, column in leaves.items() for depth in range(1, len(path) + 1)]
+    contains = np.zeros((len(groups), len(leaves)))
+    for group, column in levels:
+        contains[group, column] = 1.0
+    return [list(path) for path in groups], contains[:, leaf]
+
+
+def _net_quantities(request: RiskAttributionRequest) -> Dict[UUID, float]:
+    quantities: Dict[UUID, float] = {}
+    for position in request.portfolio:
+        quantities[position.asset_id] = quantities.get(position.asset_id, 0.0) + position.quantity
+    return quantities
+
+
+def _resolve_positions(request: RiskAttributionRequest, data: FactorRiskData) \
+        -> Tuple[List[UUID], np.ndarray, np.ndarray]:
+    # the assets held and covered by the data, their rows in it and their net position values in base currency
+    rows = {asset_id: i for i, asset_id in enumerate(data.asset_ids)}
+    quantities = _net_quantities(request)
+    row = np.array([rows.get(asset_id, -1) for asset_id in quantities], dtype=np.int64)
+    covered = row >= 0
+    covered[covered] = np.isfinite(data.prices[row[covered]])
+    if request.strict and not covered.all():
+        missing = [asset_id for asset_id, keep in zip(quantities, covered) if not keep]
+        raise ValueError(f'no factor model data or price for assets: {missing}')
+    quantity = np.array(list(quantities.values()), dtype=np.float64)[covered]
+    return [asset_id for asset_id, keep in zip(quantities, covered) if keep], row[covered], \
+        quantity * data.prices[row[covered]]
+
+
+class FactorRiskAttributionEngine:
+    """
+    Local factor risk attribution: positions are weighted by value over portfolio_scale and decomposed under the
+    factor model with a handful of BLAS calls, never forming the asset X asset covariance. contributions() is
+    the fast path: it returns the columnar FactorRiskContributions, in milliseconds for thousands of assets over
+    tens of factors. attribute() builds the full RiskAttributionResponse from them, one model object per asset,
+    sector level and factor, and that object building, even without re-validation, takes far longer than the
+    decomposition itself. Sector levels aggregate the additive contributions and exposures of their assets
+    through one membership matrix product each.
+
+    Positions in assets absent from the model or without a price are ignored, or fail a strict request.
+    """
+
+    def contributions(self, request: RiskAttributionRequest, data: FactorRiskData) -> FactorRiskContributions:
+        """
+        Decomposes the risk of the request's portfolio.
+        """
+        asset_ids, row, value = _resolve_positions(request, data)
+        scale = portfolio_scale(value)
+        weight = value / scale if scale else np.zeros(len(value))
+        loadings = data.exposures[row]
+        residual = data.residual_variance[row]
+
+        exposure = loadings.T @ weight
+        factor_covariance_exposure = data.covariance @ exposure
+        factor_variance = float(exposure @ factor_covariance_exposure)
+        specific_variance = float(weight * weight @ residual)
+        variance = np.array([factor_variance, specific_variance, factor_variance + specific_variance])
+        volatility = np.sqrt(variance[2])
+        marginal = _relative(np.column_stack([loadings @ factor_covariance_exposure, weight * residual]), volatility)
+        return FactorRiskContributions(asset_ids=asset_ids, factors=list(data.factors), value=value, scale=scale,
+                                       weight=weight, loadings=loadings, exposure=exposure, variance=variance,
+                                       marginal=np.column_stack([marginal, marginal.sum(axis=1)]),
+                                       factor_marginal=_relative(factor_covariance_exposure, volatility))
+
+    def attribute(self, request: RiskAttributionRequest, data: FactorRiskData,
+                  sectors: Optional[List[AssetSectorMapping]] = None) -> RiskAttributionResponse:
+        """
+        Computes the full RiskAttributionResponse, with sector breakdowns from the given taxonomy mappings;
+        assets without a mapping have no sector_levels and appear in no sector.
+        """
+        contributions = self.contributions(request, data)
+        sector_of = {mapping.asset_id: mapping.sector_levels for mapping in sectors or []}
+        paths, membership = _sector_groups(contributions.asset_ids, sector_of)
+        volatility = contributions.volatility
+        absolute = contributions.absolute
+        relative = _relative(absolute, volatility)
+        leaves = [sector_of.get(asset_id, []) for asset_id in contributions.asset_ids]
+
+        def breakdown(by_asset: np.ndarray) -> RiskBreakdown:
+            return RiskBreakdown.construct(
+                by_sector=[_risk(SectorLevelRisk, risk, sector_levels=path)
+                           for path, risk in zip(paths, (membership @ by_asset).tolist())],
+                by_asset=_asset_risks(contributions.asset_ids, leaves, by_asset))
+
+        total_risk = TotalRisk.construct(volatility=_risk(Risk, np.sqrt(contributions.variance).tolist()),
+                                         variance=_risk(Risk, contributions.variance.tolist()))
+        return RiskAttributionResponse.construct(
+            total_risk=total_risk, absolute_contribution_risk=breakdown(absolute),
+            relative_contribution_risk=breakdown(relative),
+            asset_marginal_risk=_asset_risks(contributions.asset_ids, leaves, contributions.marginal),
+            factorRisk=_factor_risks(contributions),
+            sectorFactorExposures=_sector_factor_exposures(contributions, paths, membership))
+
+
+def _asset_risks(asset_ids: List[UUID], leaves: List[List[str]], risks: np.ndarray) -> List[AssetRisk]:
+    return [_risk(AssetRisk, risk, asset_id=asset_id, sector_levels=leaf)
+            for asset_id, leaf, risk in zip(asset_ids, leaves, risks.tolist())]
+
+
+def _factor_risks(contributions: FactorRiskContributions) -> List[TotalFactorRisk]:
+    scale = contributions.scale
+    absolute = contributions.factor_absolute
+    relative = _relative(absolute, contributions.volatility)
+    columns = zip(contributions.factors, absolute.tolist(), relative.tolist(), contributions.factor_marginal.tolist(),
+                  contributions.exposure.tolist())
+    return [TotalFactorRisk.construct(factor=factor, absolute_contribution=absolute_risk,
+                                      relative_contribution=relative_risk, marginal_contribution=marginal_risk,
+                                      factor_exposure=_exposure_value(exposure, scale))
+            for factor, absolute_risk, relative_risk, marginal_risk, exposure in columns]
+
+
+def _sector_factor_exposures(contributions: FactorRiskContributions, paths: List[List[str]],
+                             membership: np.ndarray) -> List[SectorFactorExposure]:
+    scale = contributions.scale
+    exposure = membership @ (contributions.weight[:, None] * contributions.loadings)
+    absolute = exposure * contributions.factor_marginal
+    relative = _relative(absolute, contributions.volatility)
+    marginal = contributions.factor_marginal.tolist()
+    return [SectorFactorExposure.construct(factor=factor, sector_levels=path, absolute_risk=absolute_risk,
+                                           relative_risk=relative_risk, marginal_risk=marginal_risk,
+                                           factor_exposure=_exposure_value(factor_exposure, scale))
+            for path, sector_absolute, sector_relative, sector_exposure in zip(
+                paths, absolute.tolist(), relative.tolist(), exposure.tolist())
+            for factor, absolute_risk, relative_risk, marginal_risk, factor_exposure in zip(
+                contributions.factors, sector_absolute, sector_relative, marginal, sector_exposure)]
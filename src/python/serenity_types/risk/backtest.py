@@ -0,0 +1,165 @@
+from datetime import date
+from typing import List, NamedTuple
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.risk.var import VaRBacktestRequest, VaRBacktestResult, VaRBreach
+from serenity_types.risk.var_engine import (DEFAULT_LOOKBACK_PERIOD, DEFAULT_QUANTILES, VaRMethod,
+                                            historical_var, to_result)
+from serenity_types.utils.stats import norm_ppf
+
+
+class BacktestMarketData(NamedTuple):
+    """
+    Daily market data covering the backtest plus its lookback, resolved by the caller.
+    """
+
+    dates: List[date]
+    """
+    The days of the rows of returns and prices, ascending.
+    """
+
+    asset_ids: List[UUID]
+    """
+    The assets of the columns of returns and prices.
+    """
+
+    returns: np.ndarray
+    """
+    Daily simple returns, days X assets, where row i is the return from dates[i - 1] to dates[i]; NaN where
+    an asset has no return for a day.
+    """
+
+    prices: np.ndarray
+    """
+    Close price of each asset in base currency on each of dates, days X assets.
+    """
+
+
+class _RollingMoments:
+    # running sum and sum of outer products of the rows in a sliding window, moved with rank-one updates and
+    # recomputed from scratch every refresh_interval moves so that rounding errors cannot accumulate
+    def __init__(self, returns: np.ndarray, start: int, end: int, refresh_interval: int):
+        self.returns = returns
+        self.refresh_interval = refresh_interval
+        self._reset(start, end)
+
+    def _reset(self, start: int, end: int):
+        window = self.returns[start:end]
+        self.start, self.end, self.moves = start, end, 0
+        self.total = window.sum(axis=0)
+        self.products = window.T @ window
+
+    def slide(self):
+        self.moves += 1
+        if self.moves >= self.refresh_interval:
+            self._reset(self.start + 1, self.end + 1)
+            return
+        added, dropped = self.returns[self.end], self.returns[self.start]
+        self.total += added - dropped
+        self.products += np.outer(added, added) - np.outer(dropped, dropped)
+        self.start += 1
+        self.end += 1
+
+    def covariance(self) -> np.ndarray:
+        n = self.end - self.start
+        return (self.products - np.outer(self.total, self.total) / n) / (n - 1)
+
+
+class VaRBacktestEngine:
+    """
+    Backtests one-day VaR for a VaRBacktestRequest over every day from start_date to end_date, holding the
+    portfolio quantities fixed and marking them at the previous day's close. Instead of recomputing each day's
+    lookback from scratch:
+
+    - parametric VaR slides the covariance of the window with rank-one add and drop updates, O(assets^2) a day;
+    - historical VaR prices every window's scenarios with one matrix product of the returns and the daily
+      exposures, then reads all days' quantiles from one batched partial sort. Because exposures are re-marked
+      daily, every scenario PnL moves each day, so a persistent order-statistic structure would not help.
+
+    Breaches, days whose realized loss exceeds the VaR at some quantile, are detected in one vectorized
+    comparison at the end. Run days without a full lookback of prior returns are skipped.
+    """
+
+    def __init__(self, method: VaRMethod = VaRMethod.HISTORICAL, min_coverage: float = 1.0,
+                 refresh_interval: int = 250):
+        if method == VaRMethod.MONTE_CARLO:
+            raise ValueError('Backtests support HISTORICAL and PARAMETRIC VaR only')
+        self.method = method
+        self.min_coverage = min_coverage
+        self.refresh_interval = refresh_interval
+
+    def backtest(self, request: VaRBacktestRequest, market_data: BacktestMarketData) -> VaRBacktestResult:
+        lookback = request.lookback_period or DEFAULT_LOOKBACK_PERIOD
+        quantiles = np.asarray(request.quantiles or DEFAULT_QUANTILES, dtype=np.float64)
+        dates = np.array(market_data.dates, dtype='datetime64[D]')
+        end_date = np.datetime64(request.end_date) if request.end_date else dates[-1]
+        run = np.flatnonzero((dates >= np.datetime64(request.start_date)) & (dates <= end_date))
+        run = run[run >= max(lookback, 1)]
+
+        returns = np.asarray(market_data.returns, dtype=np.float64)
+        quantity = np.zeros(len(market_data.asset_ids))
+        columns = {asset_id: i for i, asset_id in enumerate(market_data.asset_ids)}
+        for position in request.portfolio:
+            if position.asset_id in columns:
+                quantity[columns[position.asset_id]] += position.quantity
+
+        # finite returns per asset in each run day's window, from one cumulative count
+        counts = np.vstack([np.zeros(len(quantity)), np.cumsum(np.isfinite(returns), axis=0)])
+        coverage = (counts[run] - counts[run - lookback]) / lookback
+        prices = np.asarray(market_data.prices, dtype=np.float64)[run - 1]
+        included = np.isfinite(prices) & (coverage >= self.min_coverage)
+        exposure = np.where(included, quantity * np.nan_to_num(prices), 0.0)
+        returns = np.nan_to_num(returns)
+
+        var = self.daily_var(returns, exposure, run, lookback, quantiles)
+        realized = np.einsum('da,da->d', returns[run], exposure)
+        return _result(request, market_data, run, exposure, included, var, realized, quantiles)
+
+    def daily_var(self, returns: np.ndarray, exposure: np.ndarray, run: np.ndarray, lookback: int,
+                  quantiles: np.ndarray) -> np.ndarray:
+        """
+        One-day VaR per run day and quantile, given gap-free returns and each run day's exposures.
+        """
+        if not len(run):
+            return np.zeros((0, len(quantiles)))
+        if self.method == VaRMethod.PARAMETRIC:
+            return self._parametric(returns, exposure, run, lookback, quantiles)
+        # scenario PnL of day d under window row l is returns[run[d] - lookback + l] . exposure[d]
+        pnl = returns @ exposure.T
+        rows = run[:, None] - lookback + np.arange(lookback)
+        return historical_var(pnl[rows, np.arange(len(run))[:, None]], quantiles)
+
+    def _parametric(self, returns: np.ndarray, exposure: np.ndarray, run: np.ndarray, lookback: int,
+                    quantiles: np.ndarray) -> np.ndarray:
+        moments = _RollingMoments(returns, run[0] - lookback, run[0], self.refresh_interval)
+        variance = np.empty(len(run))
+        for d, day in enumerate(run):
+            while moments.end < day:
+                moments.slide()
+            variance[d] = exposure[d] @ moments.covariance() @ exposure[d]
+        return np.sqrt(np.maximum(variance, 0.0))[:, None] * norm_ppf(quantiles / 100)
+
+
+def _result(request: VaRBacktestRequest, market_data: BacktestMarketData, run: np.ndarray, exposure: np.ndarray,
+            included: np.ndarray, var: np.ndarray, realized: np.ndarray, quantiles: np.ndarray) -> VaRBacktestResult:
+    portfolio_assets = list(dict.fromkeys(position.asset_id for position in request.portfolio))
+    columns = {asset_id: i for i, asset_id in enumerate(market_data.asset_ids)}
+    column = np.array([columns.get(asset_id, -1) for asset_id in portfolio_assets], dtype=np.int64)
+    portfolio_included = np.where(column >= 0, included[:, column], False)
+    baseline = exposure.sum(axis=1)
+    results = [to_result(market_data.dates[day], float(baseline[d]),
+                         [asset_id for asset_id, keep in zip(portfolio_assets, portfolio_included[d]) if not keep],
+                         quantiles, var[d])
+               for d, day in enumerate(run.tolist())]
+
+    loss = -realized
+    breached = loss[:, None] > var
+    with np.errstate(divide='ignore', invalid='ignore'):
+        loss_relative = np.nan_to_num(100 * loss / np.abs(baseline))
+    breaches = [VaRBreach(breach_date=results[d].run_date, portfolio_loss_absolute=float(loss[d]),
+                          portfolio_loss_relative=float(loss_relative[d]),
+                          quantiles=[q for q, hit in zip(results[d].quantiles, breached[d]) if hit])
+                for d in np.flatnonzero(breached.any(axis=1)).tolist()]
+    return VaRBacktestResult(results=results, breaches=breaches)
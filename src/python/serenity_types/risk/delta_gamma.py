@@ -0,0 +1,185 @@
+from datetime import date
+from typing import List, NamedTuple, Optional, Tuple, Union
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.portfolio.core import AssetPosition
+from serenity_types.pricing.derivatives.options.engine import VEGA_SCALE, OptionValuationColumns
+from serenity_types.pricing.derivatives.options.valuation import OptionValuation, OptionValuationResult
+from serenity_types.risk.montecarlo import cholesky_factor, simulate_normals
+from serenity_types.risk.var import VaRAnalysisRequest, VaRAnalysisResult
+from serenity_types.risk.var_engine import (DEFAULT_QUANTILES, PortfolioExposures, VaRMarketData, historical_var,
+                                            horizon_days, resolve_exposures, to_result)
+
+GREEK_COLUMNS = ('pv', 'spot_notional', 'spot_price', 'delta_ccy', 'gamma_ccy', 'vega_ccy', 'theta_ccy')
+"""
+The OptionValuationResult fields needed to map options onto their underliers.
+"""
+
+
+class QuadraticSensitivities(NamedTuple):
+    """
+    Second-order sensitivities of a portfolio to the returns of its risk factors, one element per factor asset.
+    """
+
+    asset_ids: List[UUID]
+    """
+    The factor assets: the linear holdings plus the underliers of the options.
+    """
+
+    delta: np.ndarray
+    """
+    PnL in base currency per unit simple return of each factor: linear exposures plus option delta_ccy.
+    """
+
+    gamma: np.ndarray
+    """
+    Second derivative of PnL in base currency with respect to each factor's return, i.e. option gamma_ccy.
+    """
+
+    vega: np.ndarray
+    """
+    PnL in base currency per unit (not per 1%) change in the implied vol of each factor's options.
+    """
+
+    theta: float
+    """
+    PnL in base currency from one day of time decay.
+    """
+
+    value: float
+    """
+    Value of the portfolio in base currency: linear exposures plus option PVs.
+    """
+
+
+def quadratic_pnl(sensitivities: QuadraticSensitivities, returns: np.ndarray,
+                  vol_changes: Optional[np.ndarray] = None, horizon: int = 1) -> np.ndarray:
+    """
+    PnL over the horizon on every path of one-day factor returns (paths X factors, historical or simulated) in
+    one pass of matrix products: delta . r + 1/2 gamma . r^2 + vega . d(vol) + theta X horizon, where the
+    returns and vol_changes, the absolute changes in implied vol of each factor on the same paths if given, are
+    scaled by sqrt(horizon). The gamma term thus grows with the horizon, like theta, rather than with its
+    square root.
+    """
+    returns = returns * np.sqrt(horizon)
+    pnl = returns @ sensitivities.delta + 0.5 * (returns * returns) @ sensitivities.gamma + \
+        sensitivities.theta * horizon
+    if vol_changes is not None:
+        pnl += np.nan_to_num(vol_changes) @ sensitivities.vega * np.sqrt(horizon)
+    return pnl
+
+
+def _greek_columns(options: List[OptionValuation],
+                   results: Union[List[OptionValuationResult], OptionValuationColumns]) -> np.ndarray:
+    # greeks X options, in the order of options
+    if isinstance(results, OptionValuationColumns):
+        return np.array([getattr(results, greek) for greek in GREEK_COLUMNS], dtype=np.float64).reshape(
+            len(GREEK_COLUMNS), -1)
+    by_id = {result.option_valuation_id: result for result in results}
+    return np.array([[getattr(by_id[option.option_valuation_id], greek) for option in options]
+                     for greek in GREEK_COLUMNS], dtype=np.float64).reshape(len(GREEK_COLUMNS), -1)
+
+
+def _split_portfolio(portfolio: List[AssetPosition], options: List[OptionValuation]) \
+        -> Tuple[List[AssetPosition], List[AssetPosition], List[int]]:
+    # linear positions, option positions and the index of each option position's valuation
+    option_index = {option.option_asset_id: i for i, option in enumerate(options)}
+    linear = [p for p in portfolio if p.asset_id not in option_index]
+    option_positions = [p for p in portfolio if p.asset_id in option_index]
+    return linear, option_positions, [option_index[p.asset_id] for p in option_positions]
+
+
+def _excluded(exposures: PortfolioExposures, linear: List[AssetPosition], option_positions: List[AssetPosition],
+              held: np.ndarray) -> List[UUID]:
+    # excluded linear holdings, then the options whose underlier was excluded in their place
+    linear_ids = {p.asset_id for p in linear}
+    excluded = [asset_id for asset_id in exposures.excluded_asset_ids if asset_id in linear_ids]
+    return excluded + [p.asset_id for p, keep in zip(option_positions, held) if not keep]
+
+
+class DeltaGammaVaREngine:
+    """
+    VaR for portfolios with options without full revaluation: each option's greeks, as valued by
+    OptionValuationEngine for OptionValuation.qty units, are scaled to the position quantity and mapped onto
+    the returns of its underlier, then the quadratic PnL of the whole book is computed on every path with a
+    few matrix products. Delta-gamma captures the convexity that linear VaR misses, and vega the co-movement
+    of implied vols when their daily changes are supplied.
+
+    The paths are the days of the lookback by default. With paths set, they are simulated instead: normal log
+    returns, jointly with the vol changes if supplied, from the Cholesky factor of their sample covariance over
+    the lookback, drawn from a generator seeded with seed.
+
+    Positions whose asset is the option_asset_id of one of the options are treated as options; all others are
+    linear holdings. Options whose underlier lacks history are reported in excluded_asset_ids.
+    """
+
+    def __init__(self, min_coverage: float = 1.0, paths: Optional[int] = None, seed: int = 0):
+        self.min_coverage = min_coverage
+        self.paths = paths
+        self.seed = seed
+
+    def value(self, request: VaRAnalysisRequest, market_data: VaRMarketData, options: List[OptionValuation],
+              results: Union[List[OptionValuationResult], OptionValuationColumns],
+              vol_changes: Optional[np.ndarray] = None) -> VaRAnalysisResult:
+        """
+        Computes VaR at every requested quantile; vol_changes, if given, are daily absolute implied vol changes
+        per asset aligned with market_data.returns.
+        """
+        horizon = horizon_days(request)
+        quantiles = np.asarray(request.quantiles or DEFAULT_QUANTILES, dtype=np.float64)
+        exposures, sensitivities, excluded = self.sensitivities(request, market_data, options, results)
+        var = np.zeros(len(quantiles))
+        if sensitivities.asset_ids:
+            returns, vol_changes = self.scenarios(exposures, market_data, vol_changes)
+            var = historical_var(quadratic_pnl(sensitivities, returns, vol_changes, horizon), quantiles)
+        return to_result(request.as_of_date or date.today(), sensitivities.value, excluded, quantiles, var)
+
+    def scenarios(self, exposures: PortfolioExposures, market_data: VaRMarketData,
+                  vol_changes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        The one-day factor returns and vol changes, paths X factors, that the quadratic PnL is computed on.
+        """
+        if vol_changes is not None:
+            columns = {asset_id: i for i, asset_id in enumerate(market_data.asset_ids)}
+            factor_columns = [columns[asset_id] for asset_id in exposures.asset_ids]
+            vol_changes = np.nan_to_num(np.asarray(vol_changes)[-len(exposures.returns):, factor_columns])
+        if self.paths is None:
+            return exposures.returns, vol_changes
+        history = np.log1p(exposures.returns)
+        if vol_changes is not None:
+            history = np.hstack([history, vol_changes])
+        covariance = np.atleast_2d(np.cov(history, rowvar=False))
+        draws = simulate_normals(cholesky_factor(covariance), self.paths, np.random.SeedSequence(self.seed))
+        factors = len(exposures.asset_ids)
+        return np.expm1(draws[:, :factors]), None if vol_changes is None else draws[:, factors:]
+
+    def sensitivities(self, request: VaRAnalysisRequest, market_data: VaRMarketData, options: List[OptionValuation],
+                      results: Union[List[OptionValuationResult], OptionValuationColumns]) \
+            -> Tuple[PortfolioExposures, QuadraticSensitivities, List[UUID]]:
+        """
+        Resolves the portfolio into factor exposures and QuadraticSensitivities, plus the excluded asset IDs.
+        """
+        linear, option_positions, rows = _split_portfolio(request.portfolio, options)
+        underliers = [options[row].underlier_asset_id for row in rows]
+        # underliers are resolved as zero-quantity positions so that they get a returns column
+        factors = linear + [AssetPosition(asset_id=underlier, quantity=0.0) for underlier in underliers]
+        exposures = resolve_exposures(request.copy(update={'portfolio': factors}), market_data, self.min_coverage)
+
+        factor_index = {asset_id: i for i, asset_id in enumerate(exposures.asset_ids)}
+        factor = np.array([factor_index.get(underlier, -1) for underlier in underliers], dtype=np.int64)
+        held = factor >= 0
+        quantity = np.array([p.quantity / (options[row].qty or 1) for p, row in zip(option_positions, rows)])
+        pv, notional, spot, delta, gamma, vega, theta = _greek_columns(options, results)[:, rows]
+        value, delta, gamma, vega, theta = np.array([pv * notional / spot, delta, gamma, vega, theta]).reshape(
+            5, -1) * np.where(held, quantity, 0.0)
+
+        def by_factor(values: np.ndarray) -> np.ndarray:
+            return np.bincount(factor[held], values[held], len(exposures.asset_ids))
+
+        sensitivities = QuadraticSensitivities(asset_ids=exposures.asset_ids,
+                                               delta=exposures.exposure + by_factor(delta), gamma=by_factor(gamma),
+                                               vega=by_factor(vega / VEGA_SCALE), theta=float(theta.sum()),
+                                               value=exposures.baseline + float(value.sum()))
+        return exposures, sensitivities, _excluded(exposures, linear, option_positions, held)
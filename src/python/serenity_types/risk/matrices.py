@@ -0,0 +1,330 @@
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.risk.factor import (AssetFactorExposureMatrixElement, AssetMatrixElement, AssetResidualValue,
+                                        FactorMatrixElement)
+from serenity_types.utils.serialization import CamelModel
+
+Element = Union[CamelModel, Dict[str, Any]]
+"""
+A matrix element either as a model object or as decoded JSON, keyed by the camel-case field aliases; asset IDs
+are read from either form as UUIDs, so that both index alike.
+"""
+
+
+class MatrixIndex(NamedTuple):
+    """
+    A stable mapping between the keys of a matrix dimension, e.g. asset IDs or factor names, and positions.
+    """
+
+    keys: List[Hashable]
+    """
+    The key at each position.
+    """
+
+    positions: Dict[Hashable, int]
+    """
+    The position of each key.
+    """
+
+    @classmethod
+    def of(cls, keys: Sequence[Hashable]) -> 'MatrixIndex':
+        """
+        An index over the distinct keys, in order of first appearance.
+        """
+        keys = list(dict.fromkeys(keys))
+        return cls(keys=keys, positions={key: i for i, key in enumerate(keys)})
+
+    def codes(self, keys: Sequence[Hashable]) -> np.ndarray:
+        """
+        The positions of the given keys, -1 for keys not in the index.
+        """
+        return np.fromiter((self.positions.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+
+class PackedSymmetricMatrix(NamedTuple):
+    """
+    A dense symmetric matrix storing only its upper triangle, row by row, in size X (size + 1) / 2 elements.
+    """
+
+    packed: np.ndarray
+    """
+    The upper triangle including the diagonal, in np.triu_indices(size) order.
+    """
+
+    size: int
+    """
+    The number of rows and columns.
+    """
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray) -> 'PackedSymmetricMatrix':
+        """
+        Packs the upper triangle of a symmetric matrix.
+        """
+        return cls(packed=matrix[np.triu_indices(len(matrix))], size=len(matrix))
+
+    def toarray(self) -> np.ndarray:
+        """
+        Unpacks into a full dense matrix.
+        """
+        matrix = np.zeros((self.size, self.size))
+        rows, columns = np.triu_indices(self.size)
+        matrix[rows, columns] = self.packed
+        matrix[columns, rows] = self.packed
+        return matrix
+
+
+class CSRMatrix(NamedTuple):
+    """
+    A sparse matrix in compressed sparse row form, laid out like scipy.sparse.csr_matrix((data, indices, indptr),
+    shape) so that it can be handed to SciPy without copying where it is available. Symmetric matrices store only
+    their upper triangle.
+    """
+
+    data: np.ndarray
+    """
+    The stored values, row by row.
+    """
+
+    indices: np.ndarray
+    """
+    The column of each stored value.
+    """
+
+    indptr: np.ndarray
+    """
+    Row i's values are data[indptr[i]:indptr[i + 1]].
+    """
+
+    shape: Tuple[int, int]
+    """
+    Rows and columns.
+    """
+
+    symmetric: bool = False
+    """
+    Whether only the upper triangle of a symmetric matrix is stored.
+    """
+
+    @property
+    def nnz(self) -> int:
+        """
+        The number of stored values.
+        """
+        return len(self.data)
+
+    def rows(self) -> np.ndarray:
+        """
+        The row of each stored value.
+        """
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def toarray(self) -> np.ndarray:
+        """
+        Expands into a full dense matrix.
+        """
+        matrix = np.zeros(self.shape)
+        rows = self.rows()
+        matrix[rows, self.indices] = self.data
+        if self.symmetric:
+            matrix[self.indices, rows] = self.data
+        return matrix
+
+    def dot(self, vector: np.ndarray) -> np.ndarray:
+        """
+        Matrix-vector product, including the implied lower triangle of symmetric matrices.
+        """
+        rows = self.rows()
+        result = np.bincount(rows, self.data * vector[self.indices], self.shape[0])
+        if self.symmetric:
+            off_diagonal = rows != self.indices
+            result += np.bincount(self.indices[off_diagonal], (self.data * vector[rows])[off_diagonal],
+                                  self.shape[1])
+        return result
+
+
+def _field_values(elements: Sequence[Element], model: Type[CamelModel], field: str) -> List[Any]:
+    alias = model.__fields__[field].alias
+    values = [element[alias] if isinstance(element, dict) else getattr(element, field) for element in elements]
+    if model.__fields__[field].type_ is UUID:
+        # decoded JSON carries IDs as strings
+        return [value if isinstance(value, UUID) else UUID(value) for value in values]
+    return values
+
+
+def _output_keys(keys: List[Hashable], model: Type[CamelModel], field: str, as_dicts: bool) -> List[Hashable]:
+    # IDs go back to strings in JSON-ready dicts
+    if as_dicts and model.__fields__[field].type_ is UUID:
+        return [str(key) for key in keys]
+    return keys
+
+
+def _triplets(elements: Sequence[Element], model: Type[CamelModel], row_field: str, column_field: str,
+              row_index: Optional[MatrixIndex], column_index: Optional[MatrixIndex], symmetric: bool):
+    row_keys = _field_values(elements, model, row_field)
+    column_keys = _field_values(elements, model, column_field)
+    values = np.array(_field_values(elements, model, 'value'), dtype=np.float64)
+    if symmetric:
+        row_index = row_index or MatrixIndex.of(row_keys + column_keys)
+        column_index = row_index
+    row_index = row_index or MatrixIndex.of(row_keys)
+    column_index = column_index or MatrixIndex.of(column_keys)
+    rows, columns = row_index.codes(row_keys), column_index.codes(column_keys)
+    known = (rows >= 0) & (columns >= 0)
+    rows, columns, values = rows[known], columns[known], values[known]
+    if symmetric:
+        rows, columns = np.minimum(rows, columns), np.maximum(rows, columns)
+    return rows, columns, values, row_index, column_index
+
+
+def _last(rows: np.ndarray, columns: np.ndarray, values: np.ndarray, shape: Tuple[int, int]):
+    # one cell per (row, column) in row-major order, duplicates keeping the last element
+    cells = rows * shape[1] + columns
+    unique_cells, last = np.unique(cells[::-1], return_index=True)
+    return unique_cells // shape[1], unique_cells % shape[1], values[len(cells) - 1 - last]
+
+
+def _csr(rows: np.ndarray, columns: np.ndarray, values: np.ndarray, shape: Tuple[int, int],
+         symmetric: bool) -> CSRMatrix:
+    rows, columns, values = _last(rows, columns, values, shape)
+    indptr = np.r_[0, np.cumsum(np.bincount(rows, minlength=shape[0]))]
+    return CSRMatrix(data=values, indices=columns, indptr=indptr, shape=shape, symmetric=symmetric)
+
+
+def asset_matrix(elements: Sequence[Element], index: Optional[MatrixIndex] = None, sparse: bool = False) \
+        -> Tuple[Union[PackedSymmetricMatrix, CSRMatrix], MatrixIndex]:
+    """
+    Builds a symmetric asset X asset matrix, e.g. a covariance, from AssetMatrixElements given for either or both
+    halves; elements for assets outside an explicit index are dropped. Dense matrices are packed and sparse ones
+    keep only their upper triangle, so either takes half the storage of the full matrix.
+    """
+    rows, columns, values, index, _ = _triplets(elements, AssetMatrixElement, 'asset_id1', 'asset_id2', index,
+                                                None, True)
+    return _symmetric(rows, columns, values, len(index.keys), sparse), index
+
+
+def factor_matrix(elements: Sequence[Element], index: Optional[MatrixIndex] = None, sparse: bool = False) \
+        -> Tuple[Union[PackedSymmetricMatrix, CSRMatrix], MatrixIndex]:
+    """
+    Builds a symmetric factor X factor matrix, e.g. the factor covariance, from FactorMatrixElements, as for
+    asset_matrix.
+    """
+    rows, columns, values, index, _ = _triplets(elements, FactorMatrixElement, 'factor1', 'factor2', index, None,
+                                                True)
+    return _symmetric(rows, columns, values, len(index.keys), sparse), index
+
+
+def _symmetric(rows: np.ndarray, columns: np.ndarray, values: np.ndarray, size: int,
+               sparse: bool) -> Union[PackedSymmetricMatrix, CSRMatrix]:
+    if sparse:
+        return _csr(rows, columns, values, (size, size), True)
+    # position of (row, column) with row <= column in np.triu_indices(size) order
+    rows, columns, values = _last(rows, columns, values, (size, size))
+    packed = np.zeros(size * (size + 1) // 2)
+    packed[rows * size - rows * (rows - 1) // 2 + columns - rows] = values
+    return PackedSymmetricMatrix(packed=packed, size=size)
+
+
+def exposure_matrix(elements: Sequence[Element], asset_index: Optional[MatrixIndex] = None,
+                    factor_index: Optional[MatrixIndex] = None, sparse: bool = False) \
+        -> Tuple[Union[np.ndarray, CSRMatrix], MatrixIndex, MatrixIndex]:
+    """
+    Builds the asset X factor exposure matrix from AssetFactorExposureMatrixElements, missing pairs being zero.
+    """
+    rows, columns, values, asset_index, factor_index = _triplets(
+        elements, AssetFactorExposureMatrixElement, 'asset_id', 'factor', asset_index, factor_index, False)
+    shape = (len(asset_index.keys), len(factor_index.keys))
+    if sparse:
+        return _csr(rows, columns, values, shape, False), asset_index, factor_index
+    matrix = np.zeros(shape)
+    rows, columns, values = _last(rows, columns, values, shape)
+    matrix[rows, columns] = values
+    return matrix, asset_index, factor_index
+
+
+def residual_vector(residuals: Sequence[Element], index: Optional[MatrixIndex] = None) \
+        -> Tuple[np.ndarray, MatrixIndex]:
+    """
+    Builds the vector of asset residuals from AssetResidualValues, zero for assets of the index without one.
+    """
+    asset_ids = _field_values(residuals, AssetResidualValue, 'asset_id')
+    index = index or MatrixIndex.of(asset_ids)
+    codes = index.codes(asset_ids)
+    known = codes >= 0
+    vector = np.zeros(len(index.keys))
+    vector[codes[known]] = np.array(_field_values(residuals, AssetResidualValue, 'value'), dtype=np.float64)[known]
+    return vector, index
+
+
+def _cells(matrix: Union[np.ndarray, PackedSymmetricMatrix, CSRMatrix], skip_zeros: bool):
+    # rows, columns and values of the stored cells; symmetric matrices yield their upper triangle only
+    if isinstance(matrix, CSRMatrix):
+        rows, columns, values = matrix.rows(), matrix.indices, matrix.data
+    elif isinstance(matrix, PackedSymmetricMatrix):
+        (rows, columns), values = np.triu_indices(matrix.size), matrix.packed
+    else:
+        rows, columns = np.indices(matrix.shape).reshape(2, -1)
+        values = matrix.reshape(-1)
+    if skip_zeros:
+        nonzero = values != 0
+        rows, columns, values = rows[nonzero], columns[nonzero], values[nonzero]
+    return rows, columns, values
+
+
+def to_elements(matrix: Union[np.ndarray, PackedSymmetricMatrix, CSRMatrix], model: Type[CamelModel],
+                row_field: str, column_field: str, row_index: MatrixIndex, column_index: MatrixIndex,
+                skip_zeros: bool = True, as_dicts: bool = False) -> List[Element]:
+    """
+    Converts a matrix back into an element list of the given model, keyed through the indices, e.g.
+    to_elements(covariance, AssetMatrixElement, 'asset_id1', 'asset_id2', index, index). Symmetric matrices
+    produce only their upper triangle. With as_dicts the elements are plain dicts keyed by the camel-case
+    aliases, ready to encode as JSON, with asset IDs as strings; otherwise model objects are constructed
+    without re-running validation.
+    """
+    rows, columns, values = _cells(matrix, skip_zeros)
+    fields = model.__fields__
+    names = [fields[name].alias if as_dicts else name for name in (row_field, column_field, 'value')]
+    row_keys = _output_keys(row_index.keys, model, row_field, as_dicts)
+    column_keys = _output_keys(column_index.keys, model, column_field, as_dicts)
+    items = ({names[0]: row_keys[row], names[1]: column_keys[column], names[2]: value}
+             for row, column, value in zip(rows.tolist(), columns.tolist(), values.tolist()))
+    return list(items) if as_dicts else [model.construct(**item) for item in items]
+
+
+def asset_matrix_elements(matrix: Union[PackedSymmetricMatrix, CSRMatrix, np.ndarray], index: MatrixIndex,
+                          **kwargs) -> List[Element]:
+    """
+    Converts an asset X asset matrix back into AssetMatrixElements.
+    """
+    return to_elements(matrix, AssetMatrixElement, 'asset_id1', 'asset_id2', index, index, **kwargs)
+
+
+def factor_matrix_elements(matrix: Union[PackedSymmetricMatrix, CSRMatrix, np.ndarray], index: MatrixIndex,
+                           **kwargs) -> List[Element]:
+    """
+    Converts a factor X factor matrix back into FactorMatrixElements.
+    """
+    return to_elements(matrix, FactorMatrixElement, 'factor1', 'factor2', index, index, **kwargs)
+
+
+def exposure_matrix_elements(matrix: Union[np.ndarray, CSRMatrix], asset_index: MatrixIndex,
+                             factor_index: MatrixIndex, **kwargs) -> List[Element]:
+    """
+    Converts an asset X factor exposure matrix back into AssetFactorExposureMatrixElements.
+    """
+    return to_elements(matrix, AssetFactorExposureMatrixElement, 'asset_id', 'factor', asset_index, factor_index,
+                       **kwargs)
+
+
+def residual_values(vector: np.ndarray, index: MatrixIndex, as_dicts: bool = False) -> List[Element]:
+    """
+    Converts a vector of asset residuals back into AssetResidualValues.
+    """
+    fields = AssetResidualValue.__fields__
+    names = [fields[name].alias if as_dicts else name for name in ('asset_id', 'value')]
+    keys = _output_keys(index.keys, AssetResidualValue, 'asset_id', as_dicts)
+    items = ({names[0]: asset_id, names[1]: value} for asset_id, value in zip(keys, vector.tolist()))
+    return list(items) if as_dicts else [AssetResidualValue.construct(**item) for item in items]
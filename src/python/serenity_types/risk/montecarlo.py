@@ -0,0 +1,162 @@
+from concurrent.futures import Executor
+from functools import partial
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from serenity_types.risk.var_engine import PortfolioExposures, VaREngine, VaRMethod
+from serenity_types.utils.sketch import QuantileSketch
+
+
+class TailEstimates(NamedTuple):
+    """
+    VaR and expected shortfall at each quantile of a simulated one-day loss distribution.
+    """
+
+    var: np.ndarray
+    """
+    Loss at each quantile in base currency, interpolated between order statistics as in np.quantile.
+    """
+
+    expected_shortfall: np.ndarray
+    """
+    Mean of the worst ceil(paths X (1 - quantile / 100)) losses at each quantile, in base currency.
+    """
+
+    paths: int
+    """
+    Number of simulated paths.
+    """
+
+
+def cholesky_factor(covariance: np.ndarray) -> np.ndarray:
+    """
+    Factor L with L X L' = covariance: the lower-triangular Cholesky factor, or for a positive semi-definite
+    covariance, e.g. from fewer days than assets, V X sqrt(D) from its eigendecomposition V X D X V' with
+    negative eigenvalues clipped; the latter is not triangular, but any such factor simulates the same normals.
+    """
+    try:
+        return np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        values, vectors = np.linalg.eigh(covariance)
+        return vectors * np.sqrt(np.maximum(values, 0.0))
+
+
+def tail_size(paths: int, quantiles: np.ndarray) -> int:
+    """
+    Number of worst losses out of paths that determine VaR and expected shortfall at all the quantiles.
+    """
+    lowest = (paths - 1) * float(np.min(quantiles)) / 100
+    return int(paths - np.floor(lowest))
+
+
+def simulate_normals(factor: np.ndarray, paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simulates paths X variables zero-mean normal draws with covariance factor X factor'.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((paths, len(factor))) @ factor.T
+
+
+def simulate_losses(factor: np.ndarray, exposure: np.ndarray, paths: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simulates one shard of correlated log returns and revalues the linear positions on every path in one product.
+    """
+    return -(np.expm1(simulate_normals(factor, paths, seed)) @ exposure)
+
+
+def simulate_shard(factor: np.ndarray, exposure: np.ndarray, tail: int, paths: int,
+                   seed: np.random.SeedSequence) -> np.ndarray:
+    """
+    Simulates one shard of losses and returns only its worst tail losses, unordered.
+    """
+    losses = simulate_losses(factor, exposure, paths, seed)
+    keep = min(tail, paths)
+    return np.partition(losses, paths - keep)[paths - keep:]
+
+
+def sketch_shard(factor: np.ndarray, exposure: np.ndarray, compression: float, paths: int,
+                 seed: np.random.SeedSequence) -> QuantileSketch:
+    """
+    Simulates one shard of losses and returns their quantile sketch.
+    """
+    return QuantileSketch.of(simulate_losses(factor, exposure, paths, seed), compression)
+
+
+def merge_tails(tail: np.ndarray, shard_tail: np.ndarray, size: int) -> np.ndarray:
+    """
+    The worst size losses out of two partial tails, unordered.
+    """
+    merged = np.concatenate([tail, shard_tail])
+    if len(merged) <= size:
+        return merged
+    return np.partition(merged, len(merged) - size)[len(merged) - size:]
+
+
+def tail_estimates(tail: np.ndarray, paths: int, quantiles: np.ndarray) -> TailEstimates:
+    """
+    VaR and expected shortfall from the worst tail_size(paths, quantiles) losses out of paths.
+    """
+    ordered = np.sort(tail)
+    offset = paths - len(ordered)
+    position = (paths - 1) * quantiles / 100 - offset
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, len(ordered) - 1)
+    var = ordered[below] + (position - below) * (ordered[above] - ordered[below])
+    worst = np.ceil(paths * (1 - quantiles / 100)).astype(np.int64)
+    cumulative = np.cumsum(ordered[::-1])
+    return TailEstimates(var=var, expected_shortfall=cumulative[worst - 1] / worst, paths=paths)
+
+
+class MonteCarloVaREngine(VaREngine):
+    """
+    Monte Carlo VaR: one-day log returns are simulated from the Cholesky factor of their sample covariance over
+    the lookback and the positions revalued exactly, exposure X (exp(r) - 1), so that losses carry the skew of
+    compounded returns. Paths are split into fixed-size shards, each seeded from its own child of the root
+    SeedSequence, so results are bit-for-bit identical whatever the number of workers. Shards are mapped across
+    the given Executor, e.g. a ProcessPoolExecutor, or run in-process if unset; each returns only its worst tail
+    losses, which are merged as they arrive, so no process ever holds all the paths. The exact tail still grows
+    with paths X (1 - quantile); with a compression set, shards return QuantileSketches instead, so that memory
+    stays constant however many paths are simulated, at the cost of the sketch's approximation.
+    """
+
+    def __init__(self, paths: int = 100_000, seed: int = 0, shard_size: int = 10_000,
+                 executor: Optional[Executor] = None, min_coverage: float = 1.0,
+                 compression: Optional[float] = None):
+        super().__init__(VaRMethod.MONTE_CARLO, min_coverage)
+        self.paths = paths
+        self.seed = seed
+        self.shard_size = shard_size
+        self.executor = executor
+        self.compression = compression
+
+    def one_day_var(self, exposures: PortfolioExposures, quantiles: np.ndarray) -> np.ndarray:
+        if not exposures.asset_ids:
+            return np.zeros(len(quantiles))
+        return self.simulate(exposures, quantiles).var
+
+    def simulate(self, exposures: PortfolioExposures, quantiles: np.ndarray) -> TailEstimates:
+        """
+        Simulates the one-day losses of the exposures and estimates their tail at each quantile.
+        """
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        covariance = np.atleast_2d(np.cov(np.log1p(exposures.returns), rowvar=False))
+        factor = cholesky_factor(covariance)
+        shards = -(-self.paths // self.shard_size)
+        sizes = [min(self.shard_size, self.paths - i * self.shard_size) for i in range(shards)]
+        seeds = np.random.SeedSequence(self.seed).spawn(shards)
+
+        mapper = self.executor.map if self.executor is not None else map
+        if self.compression is not None:
+            sketch = QuantileSketch(self.compression)
+            for shard_sketch in mapper(partial(sketch_shard, factor, exposures.exposure, self.compression),
+                                       sizes, seeds):
+                sketch.merge(shard_sketch)
+            return TailEstimates(var=sketch.quantile(quantiles / 100),
+                                 expected_shortfall=sketch.tail_mean(quantiles / 100), paths=self.paths)
+
+        size = tail_size(self.paths, quantiles)
+        tail = np.zeros(0)
+        for shard_tail in mapper(partial(simulate_shard, factor, exposures.exposure, size), sizes, seeds):
+            tail = merge_tails(tail, shard_tail, size)
+        return tail_estimates(tail, self.paths, quantiles)
@@ -0,0 +1,210 @@
+from datetime import date, datetime, time, timedelta
+from enum import Enum
+from typing import Callable, List, NamedTuple, Optional
+from uuid import UUID
+
+import numpy as np
+import pytz
+
+from serenity_types.marketdata.marks import AssetMarkPrice
+from serenity_types.pricing.core import MARK_TIME_TZ, MarkTime
+from serenity_types.risk.var_engine import VaRMarketData
+
+MARK_TIME_CLOSE = {
+    MarkTime.NY_EOD: time(16, 30),
+    MarkTime.LN_EOD: time(16, 30),
+    MarkTime.HK_EOD: time(16, 0),
+    MarkTime.UTC: time(0, 0)
+}
+"""
+Local close time of each MarkTime, in its MARK_TIME_TZ timezone.
+"""
+
+FillPolicy = Callable[[np.ndarray], np.ndarray]
+"""
+Fills gaps in a closes X assets price matrix, with NaN where an asset has no mark at a close.
+"""
+
+ExclusionPolicy = Callable[[np.ndarray, np.ndarray], np.ndarray]
+"""
+Given the filled prices and the returns computed from them, flags the assets to drop from the matrix.
+"""
+
+
+class ReturnType(Enum):
+    """
+    How returns are computed from consecutive closing prices.
+    """
+
+    SIMPLE = 'SIMPLE'
+    """
+    p(t) / p(t - 1) - 1.
+    """
+
+    LOG = 'LOG'
+    """
+    log(p(t) / p(t - 1)).
+    """
+
+
+def mark_calendar(end_date: date, lookback_period: int, mark_time: MarkTime) -> np.ndarray:
+    """
+    The lookback_period + 1 close instants ending with the close of end_date, as UTC datetime64[s], so that
+    consecutive closes give lookback_period daily returns; daylight saving time is applied per day.
+    """
+    zone = MARK_TIME_TZ[mark_time]
+    days = [end_date - timedelta(days=i) for i in range(lookback_period, -1, -1)]
+    closes = [zone.localize(datetime.combine(day, MARK_TIME_CLOSE[mark_time])).astimezone(pytz.utc)
+              for day in days]
+    return np.array([close.replace(tzinfo=None) for close in closes], dtype='datetime64[s]')
+
+
+def no_fill(prices: np.ndarray) -> np.ndarray:
+    """
+    Leaves gaps as they are, so every missing close drops the returns on both sides of it.
+    """
+    return prices
+
+
+def forward_fill(limit: Optional[int] = None) -> FillPolicy:
+    """
+    Carries each asset's last price forward over missing closes, for at most limit closes if given.
+    """
+    def fill(prices: np.ndarray) -> np.ndarray:
+        rows = np.arange(len(prices))[:, None]
+        last = np.maximum.accumulate(np.where(np.isnan(prices), -1, rows), axis=0)
+        filled = prices[np.maximum(last, 0), np.arange(prices.shape[1])]
+        stale = (last < 0) | (rows - last > (limit if limit is not None else len(prices)))
+        return np.where(stale, np.nan, filled)
+    return fill
+
+
+def min_coverage(fraction: float = 1.0) -> ExclusionPolicy:
+    """
+    Drops assets with a return for fewer than the given fraction of days.
+    """
+    def exclude(prices: np.ndarray, returns: np.ndarray) -> np.ndarray:
+        return np.isfinite(returns).mean(axis=0) < fraction if len(returns) else np.ones(returns.shape[1], bool)
+    return exclude
+
+
+class ReturnsMatrix(NamedTuple):
+    """
+    Daily returns over a lookback aligned to a MarkTime calendar, dense float64 with one column per asset.
+    """
+
+    closes: np.ndarray
+    """
+    The close instants of the calendar as UTC datetime64[s], one more than the rows of returns.
+    """
+
+    asset_ids: List[UUID]
+    """
+    The assets of the columns of returns and prices.
+    """
+
+    returns: np.ndarray
+    """
+    Returns, days X assets, where row i is the return from closes[i] to closes[i + 1]; NaN where a gap remains
+    after filling.
+    """
+
+    prices: np.ndarray
+    """
+    Closing prices after filling, closes X assets.
+    """
+
+    return_type: ReturnType
+    """
+    Whether returns are simple or log returns.
+    """
+
+    excluded_asset_ids: List[UUID]
+    """
+    Assets dropped from the matrix by the exclusion policy, including those without any mark.
+    """
+
+    @property
+    def dates(self) -> List[date]:
+        """
+        The UTC dates of the returns rows, i.e. of the closes each return ends at.
+        """
+        return self.closes[1:].astype('datetime64[D]').tolist()
+
+    def simple_returns(self) -> np.ndarray:
+        """
+        The returns as simple returns, converting log returns if needed.
+        """
+        return np.expm1(self.returns) if self.return_type == ReturnType.LOG else self.returns
+
+    def var_market_data(self) -> VaRMarketData:
+        """
+        Simple returns and last closing prices as input to VaREngine; excluded assets are absent, so that a
+        VaRAnalysisResult reports them in its excluded_asset_ids.
+        """
+        return VaRMarketData(asset_ids=self.asset_ids, returns=self.simple_returns(), prices=self.prices[-1])
+
+    def memmap(self, path: str) -> 'ReturnsMatrix':
+        """
+        Writes the returns to an .npy file at path and returns this matrix backed by a read-only memory map of it;
+        other processes can map the same file with np.load(path, mmap_mode='r') instead of receiving a copy.
+        """
+        np.save(path, np.ascontiguousarray(self.returns))
+        return self._replace(returns=np.load(path, mmap_mode='r'))
+
+
+class ReturnsMatrixBuilder:
+    """
+    Builds a ReturnsMatrix from raw marks in one vectorized pass: each mark is snapped to the first close at or
+    after its mark_time, if within tolerance, keeping the latest mark per asset and close. Gaps are then filled
+    and assets excluded by the pluggable policies, by default forward-filling without limit and dropping any
+    asset without a return on every day, e.g. one listed during the lookback.
+    """
+
+    def __init__(self, return_type: ReturnType = ReturnType.LOG, fill_policy: FillPolicy = forward_fill(),
+                 exclusion_policy: ExclusionPolicy = min_coverage(), tolerance: timedelta = timedelta(hours=1)):
+        self.return_type = return_type
+        self.fill_policy = fill_policy
+        self.exclusion_policy = exclusion_policy
+        self.tolerance = tolerance
+
+    def build(self, marks: List[AssetMarkPrice], end_date: date, lookback_period: int = 365,
+              mark_time: MarkTime = MarkTime.NY_EOD, asset_ids: Optional[List[UUID]] = None) -> ReturnsMatrix:
+        """
+        Builds the matrix for the given assets, by default those with any marks in order of first appearance;
+        naive mark times are taken to be UTC.
+        """
+        closes = mark_calendar(end_date, lookback_period, mark_time)
+        mark_ids = [mark.asset_id for mark in marks]
+        asset_ids = list(dict.fromkeys(mark_ids)) if asset_ids is None else list(asset_ids)
+        columns = {asset_id: i for i, asset_id in enumerate(asset_ids)}
+
+        column = np.array([columns.get(asset_id, -1) for asset_id in mark_ids], dtype=np.int64)
+        times = np.array([_utc(mark.mark_time) for mark in marks], dtype='datetime64[s]').reshape(-1)
+        price = np.array([mark.mark_price for mark in marks], dtype=np.float64)
+        row = np.searchsorted(closes, times, side='left')
+        valid = (column >= 0) & (row < len(closes))
+        valid[valid] &= closes[row[valid]] - times[valid] <= np.timedelta64(self.tolerance)
+
+        # stable sort by time, then keep the last, i.e. latest, mark of each (close, asset) cell
+        order = np.flatnonzero(valid)[np.argsort(times[valid], kind='stable')]
+        cells = row[order] * len(asset_ids) + column[order]
+        unique_cells, last = np.unique(cells[::-1], return_index=True)
+        prices = np.full((len(closes), len(asset_ids)), np.nan)
+        prices.reshape(-1)[unique_cells] = price[order][len(cells) - 1 - last]
+        return self._matrix(closes, asset_ids, self.fill_policy(prices))
+
+    def _matrix(self, closes: np.ndarray, asset_ids: List[UUID], prices: np.ndarray) -> ReturnsMatrix:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = prices[1:] / prices[:-1]
+            returns = np.log(ratio) if self.return_type == ReturnType.LOG else ratio - 1
+        excluded = np.asarray(self.exclusion_policy(prices, returns), dtype=bool)
+        kept = np.flatnonzero(~excluded)
+        return ReturnsMatrix(closes=closes, asset_ids=[asset_ids[i] for i in kept],
+                             returns=np.ascontiguousarray(returns[:, kept]), prices=prices[:, kept],
+                             return_type=self.return_type,
+                             excluded_asset_ids=[asset_ids[i] for i in np.flatnonzero(excluded)])
+
+
+def _utc(value: datetime) -> datetime:
+    return value.astimezone(pytz.utc).replace(tzinfo=None) if value.tzinfo else value
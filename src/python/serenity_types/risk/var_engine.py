@@ -0,0 +1,307 @@
+from datetime import date
+from enum import Enum
+from typing import List, NamedTuple
+from uuid import UUID
+
+import numpy as np
+
+from serenity_types.risk.var import VaRAnalysisRequest, VaRAnalysisResult, VaRQuantile
+from serenity_types.utils.stats import norm_ppf
+
+DEFAULT_HORIZON_DAYS = 1
+"""
+Loss forecast horizon used when the request does not specify one.
+"""
+
+DEFAULT_LOOKBACK_PERIOD = 365
+"""
+Days of returns used to calibrate VaR when the request does not specify a lookback_period.
+"""
+
+DEFAULT_QUANTILES = [95.0, 97.5, 99.0]
+"""
+Loss forecast quantiles, in percent, used when the request does not specify any.
+"""
+
+
+class VaRMethod(Enum):
+    """
+    How the loss distribution is estimated from the returns over the lookback.
+    """
+
+    HISTORICAL = 'HISTORICAL'
+    """
+    Full revaluation of today's exposures under each day's returns, with VaR read off the empirical quantiles.
+    """
+
+    PARAMETRIC = 'PARAMETRIC'
+    """
+    Zero-mean normal losses with the variance of the exposures under the sample covariance of returns.
+    """
+
+    MONTE_CARLO = 'MONTE_CARLO'
+    """
+    Revaluation of the exposures under correlated returns simulated from the sample covariance; see
+    MonteCarloVaREngine.
+    """
+
+
+class VaRMarketData(NamedTuple):
+    """
+    Market data resolved by the caller for a local VaR analysis.
+    """
+
+    asset_ids: List[UUID]
+    """
+    The assets of the returns columns and prices.
+    """
+
+    returns: np.ndarray
+    """
+    Daily simple returns, days X assets, oldest first and ending on the day before the run date; NaN where
+    an asset has no return for a day.
+    """
+
+    prices: np.ndarray
+    """
+    Price of each asset in base currency as of the day before the run date.
+    """
+
+
+class PortfolioExposures(NamedTuple):
+    """
+    A portfolio resolved against the returns: one column per asset with enough history over the lookback.
+    """
+
+    asset_ids: List[UUID]
+    """
+    The assets included in the analysis, in the order of the columns of returns.
+    """
+
+    exposure: np.ndarray
+    """
+    Net position value in base currency per included asset, quantity X price.
+    """
+
+    returns: np.ndarray
+    """
+    Returns of the included assets over the lookback, days X assets, with remaining gaps filled with 0.
+    """
+
+    baseline: float
+    """
+    Value of the included positions, the sum of exposure.
+    """
+
+    excluded_asset_ids: List[UUID]
+    """
+    Assets dropped because they have no price or too few returns over the lookback.
+    """
+
+
+class VaRContributions(NamedTuple):
+    """
+    Columnar per-asset VaR decomposition, one column per asset and one row per quantile; components sum across
+    assets to the portfolio VaR at each quantile (Euler allocation).
+    """
+
+    asset_ids: List[UUID]
+    """
+    The assets of the columns, i.e. the included assets of the portfolio.
+    """
+
+    quantiles: np.ndarray
+    """
+    The quantiles of the rows, in percent.
+    """
+
+    exposure: np.ndarray
+    """
+    Net position value in base currency per asset.
+    """
+
+    var: np.ndarray
+    """
+    Portfolio VaR in base currency per quantile, over the horizon.
+    """
+
+    marginal: np.ndarray
+    """
+    Marginal VaR, quantiles X assets: the change in portfolio VaR per unit of base currency added to each
+    asset's exposure, i.e. the incremental VaR of a small change in the position.
+    """
+
+    component: np.ndarray
+    """
+    Component VaR in base currency, quantiles X assets: exposure X marginal.
+    """
+
+    @property
+    def component_pct(self) -> np.ndarray:
+        """
+        Component VaR as a percentage of the portfolio VaR at each quantile.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.nan_to_num(100 * self.component / self.var[:, None])
+
+
+def horizon_days(request: VaRAnalysisRequest) -> int:
+    """
+    The request's loss forecast horizon, defaulted and validated.
+    """
+    horizon = request.horizon_days or DEFAULT_HORIZON_DAYS
+    if horizon <= 0:
+        raise ValueError(f'horizon_days must be positive: {horizon}')
+    return horizon
+
+
+def resolve_exposures(request: VaRAnalysisRequest, market_data: VaRMarketData,
+                      min_coverage: float = 1.0) -> PortfolioExposures:
+    """
+    Nets positions per asset and aligns them with the last lookback_period days of returns. Assets
+    with returns for fewer than min_coverage of those days, or without a finite price, are excluded;
+    the remaining gaps are treated as days without a price move.
+    """
+    lookback = request.lookback_period or DEFAULT_LOOKBACK_PERIOD
+    returns = np.asarray(market_data.returns, dtype=np.float64)[-lookback:]
+    columns = {asset_id: i for i, asset_id in enumerate(market_data.asset_ids)}
+    quantities = {}
+    for position in request.portfolio:
+        quantities[position.asset_id] = quantities.get(position.asset_id, 0.0) + position.quantity
+
+    asset_ids = list(quantities)
+    column = np.array([columns.get(asset_id, -1) for asset_id in asset_ids], dtype=np.int64)
+    known = column >= 0
+    coverage = np.zeros(len(asset_ids))
+    coverage[known] = np.isfinite(returns[:, column[known]]).sum(axis=0) / max(len(returns), 1)
+    price = np.full(len(asset_ids), np.nan)
+    price[known] = np.asarray(market_data.prices, dtype=np.float64)[column[known]]
+    included = known & np.isfinite(price) & (coverage >= min_coverage) & (len(returns) > 1)
+
+    exposure = np.array(list(quantities.values()), dtype=np.float64)[included] * price[included]
+    return PortfolioExposures(asset_ids=[asset_id for asset_id, keep in zip(asset_ids, included) if keep],
+                              exposure=exposure,
+                              returns=np.nan_to_num(returns[:, column[included]], nan=0.0),
+                              baseline=float(exposure.sum()),
+                              excluded_asset_ids=[asset_id for asset_id, keep in zip(asset_ids, included)
+                                                  if not keep])
+
+
+def historical_var(pnl: np.ndarray, quantiles: np.ndarray) -> np.ndarray:
+    """
+    Losses at each quantile (in percent) of the empirical PnL distribution, with scenarios along the last axis
+    and linear interpolation between order statistics as in np.quantile; all quantiles come from a single
+    partial sort of the losses, so a batch of days X scenarios gives days X quantiles in one call.
+    """
+    losses = -np.asarray(pnl, dtype=np.float64)
+    count = losses.shape[-1]
+    position = (count - 1) * np.asarray(quantiles, dtype=np.float64) / 100
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, count - 1)
+    ordered = np.partition(losses, np.unique(np.r_[below, above]), axis=-1)
+    return ordered[..., below] + (position - below) * (ordered[..., above] - ordered[..., below])
+
+
+def parametric_var(exposures: PortfolioExposures, quantiles: np.ndarray) -> np.ndarray:
+    """
+    Zero-mean normal losses at each quantile (in percent): z_q X sqrt(exposure' X covariance X exposure).
+    """
+    covariance = np.atleast_2d(np.cov(exposures.returns, rowvar=False))
+    volatility = np.sqrt(max(float(exposures.exposure @ covariance @ exposures.exposure), 0.0))
+    return norm_ppf(np.asarray(quantiles, dtype=np.float64) / 100) * volatility
+
+
+def historical_contributions(exposures: PortfolioExposures, quantiles: np.ndarray) -> np.ndarray:
+    """
+    Marginal historical VaR, quantiles X assets: the loss per unit exposure of each asset on the day that sets
+    VaR, interpolated between the two order statistics like historical_var so that components add up to it
+    exactly. Being read off single scenarios, the split is noisier than the parametric one.
+    """
+    losses = -(exposures.returns @ exposures.exposure)
+    position = (len(losses) - 1) * np.asarray(quantiles, dtype=np.float64) / 100
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, len(losses) - 1)
+    order = np.argpartition(losses, np.unique(np.r_[below, above]))
+    weight = (position - below)[:, None]
+    return -((1 - weight) * exposures.returns[order[below]] + weight * exposures.returns[order[above]])
+
+
+def parametric_contributions(exposures: PortfolioExposures, quantiles: np.ndarray) -> np.ndarray:
+    """
+    Marginal parametric VaR, quantiles X assets: z_q X (covariance X exposure) / portfolio volatility, from one
+    extra matrix-vector product over parametric_var.
+    """
+    covariance = np.atleast_2d(np.cov(exposures.returns, rowvar=False))
+    beta = covariance @ exposures.exposure
+    volatility = np.sqrt(max(float(exposures.exposure @ beta), 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        marginal = np.nan_to_num(beta / volatility)
+    return norm_ppf(np.asarray(quantiles, dtype=np.float64) / 100)[:, None] * marginal
+
+
+class VaREngine:
+    """
+    Computes VaR for a VaRAnalysisRequest in-process from a returns matrix, for all requested quantiles at
+    once: historical VaR needs one matrix-vector product and one partial sort, parametric VaR one covariance
+    product. One-day VaR is scaled to the horizon by sqrt(horizon_days).
+    """
+
+    def __init__(self, method: VaRMethod = VaRMethod.HISTORICAL, min_coverage: float = 1.0):
+        if method == VaRMethod.MONTE_CARLO and type(self) is VaREngine:
+            raise ValueError('Monte Carlo VaR requires a MonteCarloVaREngine')
+        self.method = method
+        self.min_coverage = min_coverage
+
+    def value(self, request: VaRAnalysisRequest, market_data: VaRMarketData) -> VaRAnalysisResult:
+        """
+        Computes VaR at every requested quantile for the positions with enough history.
+        """
+        horizon = horizon_days(request)
+        quantiles = np.asarray(request.quantiles or DEFAULT_QUANTILES, dtype=np.float64)
+        exposures = resolve_exposures(request, market_data, self.min_coverage)
+        var = self.one_day_var(exposures, quantiles) * np.sqrt(horizon)
+        return to_result(request.as_of_date or date.today(), exposures.baseline, exposures.excluded_asset_ids,
+                         quantiles, var)
+
+    def contributions(self, request: VaRAnalysisRequest, market_data: VaRMarketData) -> VaRContributions:
+        """
+        Decomposes VaR at every requested quantile into per-asset marginal and component VaR.
+        """
+        if self.method not in (VaRMethod.HISTORICAL, VaRMethod.PARAMETRIC):
+            raise ValueError(f'VaR contributions are not supported for {self.method.value} VaR')
+        horizon = horizon_days(request)
+        quantiles = np.asarray(request.quantiles or DEFAULT_QUANTILES, dtype=np.float64)
+        exposures = resolve_exposures(request, market_data, self.min_coverage)
+        if not exposures.asset_ids:
+            marginal = np.zeros((len(quantiles), 0))
+        elif self.method == VaRMethod.PARAMETRIC:
+            marginal = parametric_contributions(exposures, quantiles)
+        else:
+            marginal = historical_contributions(exposures, quantiles)
+        marginal = marginal * np.sqrt(horizon)
+        component = marginal * exposures.exposure
+        return VaRContributions(asset_ids=exposures.asset_ids, quantiles=quantiles, exposure=exposures.exposure,
+                                var=component.sum(axis=1), marginal=marginal, component=component)
+
+    def one_day_var(self, exposures: PortfolioExposures, quantiles: np.ndarray) -> np.ndarray:
+        """
+        One-day VaR in base currency at each quantile, zero if no assets could be included.
+        """
+        if not exposures.asset_ids:
+            return np.zeros(len(quantiles))
+        if self.method == VaRMethod.PARAMETRIC:
+            return parametric_var(exposures, quantiles)
+        return historical_var(exposures.returns @ exposures.exposure, quantiles)
+
+
+def to_result(run_date: date, baseline: float, excluded_asset_ids: List[UUID], quantiles: np.ndarray,
+              var: np.ndarray) -> VaRAnalysisResult:
+    """
+    Wraps VaR per quantile into a VaRAnalysisResult, with relative VaR as a percentage of the baseline.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = np.nan_to_num(100 * var / abs(baseline))
+    return VaRAnalysisResult(run_date=run_date, baseline=baseline,
+                             quantiles=[VaRQuantile(quantile=q, var_absolute=a, var_relative=r)
+                                        for q, a, r in zip(quantiles.tolist(), var.tolist(), relative.tolist())],
+                             excluded_asset_ids=excluded_asset_ids)
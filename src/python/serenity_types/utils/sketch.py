@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch: a t-digest of weighted centroids whose sizes are bounded by the arcsine
+    scale function k(q) = compression / (2 pi) X asin(2q - 1), so centroids are small in the tails, where VaR
+    and expected shortfall are read, and large in the body. Memory is O(compression) however many values are
+    added. The rank error at quantile q is roughly proportional to sqrt(q (1 - q)) / compression, so raising
+    compression tightens the error bound at the cost of more centroids.
+
+    Values are added in NumPy batches and every batch, or merge with another sketch, is absorbed with one sort and
+    one vectorized compression pass; sketches built independently, e.g. one per worker, merge into the sketch of
+    the union of their values.
+    """
+
+    def __init__(self, compression: float = 200.0):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def of(cls, values: np.ndarray, compression: float = 200.0) -> 'QuantileSketch':
+        """
+        Builds a sketch of the given values.
+        """
+        return cls(compression).update(values)
+
+    @property
+    def count(self) -> float:
+        """
+        Total weight, i.e. the number of values added.
+        """
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> 'QuantileSketch':
+        """
+        Adds a batch of values, ignoring NaNs.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._absorb(values, np.ones(len(values)), values.min(), values.max())
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Merges another sketch into this one.
+        """
+        if len(other.means):
+            self._absorb(other.means, other.weights, other.min, other.max)
+        return self
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray, low: float, high: float):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        self.min, self.max = min(self.min, low), max(self.max, high)
+
+        # centroids whose midpoints fall in the same unit interval of the scale function are merged
+        cumulative = np.cumsum(weights)
+        midpoint = (cumulative - weights / 2) / cumulative[-1]
+        bucket = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * midpoint - 1))
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: np.ndarray) -> np.ndarray:
+        """
+        Approximate values at quantiles q in [0, 1], interpolating between centroid midpoints like the
+        linear method of np.quantile; exact while every centroid still holds a single value.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if not len(self.means):
+            return np.full(q.shape, np.nan)
+        count = self.count
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.5, centers, count - 0.5]
+        values = np.r_[self.min, self.means, self.max]
+        return np.interp(q * (count - 1) + 0.5, positions, values)
+
+    def tail_mean(self, q: np.ndarray) -> np.ndarray:
+        """
+        Approximate mean of the top count X (1 - q) values, e.g. the expected shortfall of a loss distribution at
+        quantile q; centroids straddling the quantile contribute pro rata.
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        cumulative = np.cumsum(self.weights)
+        above = np.clip(cumulative - self.count * q[:, None], 0.0, self.weights)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (above @ self.means) / above.sum(axis=1)
@@ -0,0 +1,88 @@
+import numpy as np
+
+_SQRT_2PI = np.sqrt(2 * np.pi)
+
+# Hart (1968) double-precision rational approximation coefficients, per West (2005), highest order first
+_HART_NUMERATOR = np.array([3.52624965998911e-02, 0.700383064443688, 6.37396220353165, 33.912866078383,
+                            112.079291497871, 221.213596169931, 220.206867912376])
+_HART_DENOMINATOR = np.array([8.83883476483184e-02, 1.75566716318264, 16.064177579207, 86.7807322029461,
+                              296.564248779674, 637.333633378831, 793.826512519948, 440.413735824752])
+
+# beyond the cutoff the tail is evaluated with a continued fraction of this many terms instead
+_TAIL_CUTOFF = 3.0
+_TAIL_TERMS = 40
+
+
+def _horner(coefficients: np.ndarray, x: np.ndarray) -> np.ndarray:
+    result = np.full_like(x, coefficients[0])
+    for coefficient in coefficients[1:]:
+        result *= x
+        result += coefficient
+    return result
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    """
+    Standard normal probability density function.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """
+    Standard normal cumulative distribution function, vectorized with NumPy only and accurate to near double
+    precision relative error, using Hart's rational approximation in the body and a continued fraction in the
+    tails, where the rational approximation loses relative accuracy.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(np.atleast_1d(x))
+    exponential = np.exp(-0.5 * z * z)
+    with np.errstate(invalid='ignore'):
+        lower_tail = exponential * _horner(_HART_NUMERATOR, z) / _horner(_HART_DENOMINATOR, z)
+
+    tail = z >= _TAIL_CUTOFF
+    if tail.any():
+        tail_z = z[tail]
+        fraction = tail_z.copy()
+        for n in range(_TAIL_TERMS, 0, -1):
+            fraction = tail_z + n / fraction
+        lower_tail[tail] = exponential[tail] / fraction / _SQRT_2PI
+
+    lower_tail = lower_tail.reshape(x.shape)
+    return np.where(x > 0, 1.0 - lower_tail, lower_tail)
+
+
+# Acklam's rational approximation coefficients for the inverse normal CDF, highest order first
+_ACKLAM_A = np.array([-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+                      1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00])
+_ACKLAM_B = np.array([-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+                      6.680131188771972e+01, -1.328068155288572e+01, 1.0])
+_ACKLAM_C = np.array([-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+                      -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00])
+_ACKLAM_D = np.array([7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+                      3.754408661907416e+00, 1.0])
+_ACKLAM_LOW = 0.02425
+
+
+def norm_ppf(p: np.ndarray) -> np.ndarray:
+    """
+    Standard normal quantile function, the inverse of norm_cdf, vectorized with NumPy only: Acklam's rational
+    approximation refined with one Halley step against norm_cdf, accurate to near double precision.
+    Returns -inf and inf at 0 and 1 and NaN outside [0, 1].
+    """
+    p = np.asarray(p, dtype=np.float64)
+    q = np.minimum(np.atleast_1d(p), 1.0 - np.atleast_1d(p))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tail = np.sqrt(-2 * np.log(q))
+        central = q - 0.5
+        r = central * central
+        x = np.where(q < _ACKLAM_LOW, _horner(_ACKLAM_C, tail) / _horner(_ACKLAM_D, tail),
+                     central * _horner(_ACKLAM_A, r) / _horner(_ACKLAM_B, r))
+        x[q == 0] = -np.inf
+        # x solves for the lower of p and 1 - p, so one Halley step against the lower tail keeps relative accuracy
+        finite = np.isfinite(x)
+        error = (norm_cdf(x[finite]) - q[finite]) * _SQRT_2PI * np.exp(0.5 * x[finite] * x[finite])
+        x[finite] -= error / (1 + 0.5 * x[finite] * error)
+    x = x.reshape(p.shape)
+    return np.where(p > 0.5, -x, x)
@@ -0,0 +1,77 @@
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.american import american_greeks
+from serenity_types.pricing.derivatives.options.black_scholes import black_scholes_greeks
+from serenity_types.pricing.derivatives.options.engine import OptionMarketData, OptionValuationEngine
+from serenity_types.pricing.derivatives.options.grid import value_grid
+from serenity_types.pricing.derivatives.options.valuation import OptionValuationRequest
+from serenity_types.refdata.options import OptionStyle, OptionType
+from serenity_types_tests.pricing.derivatives.options.test_engine import (AS_OF, create_curve, create_option,
+                                                                          create_surface)
+
+
+def binomial_price(spot, strike, time_to_expiry, vol, carry, rate, is_call, steps=2000):
+    dt = time_to_expiry / steps
+    up = np.exp(vol * np.sqrt(dt))
+    p = (np.exp(carry * dt) - 1 / up) / (up - 1 / up)
+    sign = 1 if is_call else -1
+    values = np.maximum(sign * (spot * up ** np.arange(steps, -steps - 1, -2) - strike), 0)
+    for i in range(steps, 0, -1):
+        exercise = sign * (spot * up ** np.arange(i - 1, -i, -2) - strike)
+        values = np.maximum(np.exp(-rate * dt) * (p * values[:-1] + (1 - p) * values[1:]), exercise)
+    return values[0]
+
+
+def test_american_prices_close_to_binomial_lattice():
+    spot = np.array([90.0, 100.0, 110.0, 90.0, 100.0, 110.0, 100.0])
+    is_call = np.array([True, True, True, False, False, False, False])
+    carry = np.array([-0.04] * 6 + [0.05])
+    rate = np.array([0.08] * 6 + [0.05])
+    time_to_expiry = np.array([0.25] * 6 + [0.5])
+    vol = np.array([0.2] * 6 + [0.3])
+    greeks = american_greeks(spot, 100.0, time_to_expiry, vol, carry, rate, is_call)
+    expected = [binomial_price(s, 100.0, t, v, b, r, c)
+                for s, t, v, b, r, c in zip(spot, time_to_expiry, vol, carry, rate, is_call)]
+    np.testing.assert_allclose(greeks.pv, expected, rtol=5e-3, atol=0.02)
+
+    european = black_scholes_greeks(spot, 100.0, time_to_expiry, vol, carry, rate, is_call)
+    assert np.all(greeks.pv >= european.pv - 1e-12)
+
+    # no early exercise for calls without a positive funding advantage: identical to European
+    no_early = american_greeks(spot[:3], 100.0, 0.25, 0.2, 0.08, 0.08, True)
+    np.testing.assert_allclose(no_early.pv, black_scholes_greeks(spot[:3], 100.0, 0.25, 0.2, 0.08, 0.08, True).pv)
+
+
+def test_american_greeks_match_finite_differences():
+    args = dict(strike=100.0, time_to_expiry=0.5, projection_rate=0.02, discounting_rate=0.06,
+                is_call=np.array([True, False]))
+    spot, vol, h = 95.0, 0.35, 1e-4
+    greeks = american_greeks(spot, vol=vol, **args)
+
+    def pv(**bumps):
+        inputs = {**args, 'spot': spot, 'vol': vol, **bumps}
+        return american_greeks(**inputs).pv
+
+    np.testing.assert_allclose(greeks.delta, (pv(spot=spot + h) - pv(spot=spot - h)) / (2 * h), rtol=1e-5)
+    np.testing.assert_allclose(greeks.gamma, (pv(spot=spot + 0.01) - 2 * greeks.pv + pv(spot=spot - 0.01)) / 1e-4,
+                               rtol=1e-3)
+    np.testing.assert_allclose(greeks.vega, (pv(vol=vol + h) - pv(vol=vol - h)) / (2 * h), rtol=1e-5)
+
+    # deep in the money puts are exercised immediately
+    exercised = american_greeks(40.0, vol=vol, **args)
+    assert exercised.pv[1] == 60.0 and exercised.delta[1] == -1.0 and exercised.gamma[1] == 0.0
+
+
+def test_engine_values_american_options():
+    options = [create_option(i, OptionType.PUT, option_style=style) for i in range(4)
+               for style in (OptionStyle.EUROPEAN, OptionStyle.AMERICAN)]
+    request = OptionValuationRequest(as_of_time=AS_OF, options=options)
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=create_surface(),
+                                   projection_curve=create_curve(0.05))
+    columns = OptionValuationEngine().value_columns(request, market_data)
+    european, american = columns.pv[0::2], columns.pv[1::2]
+    assert np.all(american > european)
+    np.testing.assert_allclose(american, european, rtol=0.05)
+
+    grid = value_grid(request, market_data, np.array([-1000.0, 0.0, 1000.0]), np.array([0.0, 0.1]))
+    np.testing.assert_allclose(grid.valuations.pv[1, 0], columns.pv)
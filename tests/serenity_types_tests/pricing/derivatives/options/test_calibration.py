@@ -0,0 +1,68 @@
+from concurrent.futures import ProcessPoolExecutor
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.calibration import SVICalibrator
+from serenity_types.pricing.derivatives.options.svi import svi_total_variance
+from serenity_types.pricing.derivatives.options.volsurface import (RawVolatilitySurface, StrikeType,
+                                                                   VolatilitySurfaceDefinition, VolModel, VolPoint)
+
+SPOT = 20000.0
+TRUE_PARAMS = {
+    0.1: {'a': 0.005, 'b': 0.08, 'rho': -0.25, 'm': 0.02, 'sigma': 0.15},
+    0.5: {'a': 0.030, 'b': 0.12, 'rho': -0.35, 'm': 0.05, 'sigma': 0.25}
+}
+
+
+def create_definition(vol_model: VolModel = VolModel.SVI) -> VolatilitySurfaceDefinition:
+    return VolatilitySurfaceDefinition(vol_surface_id=uuid4(), vol_model=vol_model, strike_type=StrikeType.ABSOLUTE,
+                                       underlier_asset_id=uuid4(), display_name='Deribit BTC (SVI, ABSOLUTE)')
+
+
+def create_raw_surface() -> RawVolatilitySurface:
+    points = []
+    for t, params in TRUE_PARAMS.items():
+        for k in np.linspace(-0.6, 0.6, 15):
+            iv = float(np.sqrt(svi_total_variance(k, **params) / t))
+            points.append(VolPoint(option_asset_id=uuid4(), time_to_expiry=t, strike_value=SPOT * np.exp(k),
+                                   mark_price=0.0, projection_rate=0.0, discounting_rate=0.0,
+                                   forward_price=SPOT, iv=iv))
+    # a single-point expiry that cannot be calibrated
+    points.append(points[0].copy(update={'time_to_expiry': 0.01}))
+    return RawVolatilitySurface(strike_type=StrikeType.ABSOLUTE, spot_price=SPOT, vol_points=points)
+
+
+def assert_recovers_svi_params(surface):
+    assert len(surface.vols) == len(surface.strikes) == len(surface.time_to_expiries) == 2 * 51
+    assert set(surface.calibration_params.keys()) == set(TRUE_PARAMS.keys())
+    for t, params in surface.calibration_params.items():
+        k = np.linspace(-0.6, 0.6, 7)
+        np.testing.assert_allclose(svi_total_variance(k, **params), svi_total_variance(k, **TRUE_PARAMS[t]),
+                                   atol=1e-6)
+
+
+def test_svi_calibration():
+    raw = create_raw_surface()
+    surface = SVICalibrator().calibrate(create_definition(), raw)
+    assert_recovers_svi_params(surface)
+
+    # warm-starting from the previous hour's fit converges to the same parameters
+    warm = SVICalibrator().calibrate(create_definition(), raw, previous=surface)
+    assert_recovers_svi_params(warm)
+
+
+def test_svi_calibration_in_process_pool():
+    raw = create_raw_surface()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        surfaces = SVICalibrator(executor=executor).calibrate_many([(create_definition(), raw, None),
+                                                                    (create_definition(), raw, None)])
+    assert len(surfaces) == 2
+    for surface in surfaces:
+        assert_recovers_svi_params(surface)
+
+
+def test_svi_calibration_requires_svi_model():
+    with pytest.raises(ValueError):
+        SVICalibrator().calibrate(create_definition(VolModel.BLACK_SCHOLES), create_raw_surface())
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.cube import GREEK_MEASURES, MONEYNESS_BUCKETS, GreeksCube
+from serenity_types.pricing.derivatives.options.engine import OptionValuationColumns
+
+
+def create_columns(n: int, seed: int = 7) -> OptionValuationColumns:
+    rng = np.random.default_rng(seed)
+    return OptionValuationColumns(*(rng.normal(size=n) for _ in OptionValuationColumns._fields))
+
+
+def test_aggregate_rollup_and_drill_down():
+    n = 1000
+    rng = np.random.default_rng(11)
+    columns = create_columns(n)
+    underliers = rng.choice(['BTC', 'ETH', 'SOL'], size=n)
+    time_to_expiry = rng.uniform(0.001, 2.0, size=n)
+    log_moneyness = rng.normal(scale=0.3, size=n)
+    cube = GreeksCube.aggregate(columns, underliers, time_to_expiry, log_moneyness)
+    assert cube.counts.sum() == n
+    np.testing.assert_allclose(cube.values.sum(axis=0), [getattr(columns, m).sum() for m in GREEK_MEASURES])
+
+    by_underlier = dict(cube.rollup('underlier').cells())
+    for underlier in ('BTC', 'ETH', 'SOL'):
+        assert by_underlier[(underlier,)]['vega_ccy'] == pytest.approx(columns.vega_ccy[underliers == underlier].sum())
+
+    (key, total), = cube.rollup().cells()
+    assert key == ()
+    assert total['delta_ccy'] == pytest.approx(columns.delta_ccy.sum())
+
+    # drill down from per-underlier totals into the 1M ETH moneyness profile
+    eth_1m = cube.rollup('underlier').drill_down('moneyness_bucket', underlier='ETH', expiry_bucket='1M')
+    assert eth_1m.base is cube
+    assert eth_1m.dimensions == ('underlier', 'moneyness_bucket')
+    selected = (underliers == 'ETH') & (time_to_expiry > 7 / 365) & (time_to_expiry <= 30 / 365)
+    assert eth_1m.counts.sum() == selected.sum()
+    atm = dict(eth_1m.cells())[('ETH', 'ATM')]
+    moneyness = np.expm1(log_moneyness)
+    expected = columns.gamma_ccy[selected & (moneyness > -0.05) & (moneyness <= 0.05)].sum()
+    assert atm['gamma_ccy'] == pytest.approx(expected)
+
+    with pytest.raises(ValueError):
+        cube.rollup('underlier').rollup('expiry_bucket')
+
+
+def test_moneyness_buckets_follow_percentage_labels():
+    strike_over_spot = np.array([0.4, 0.55, 0.79, 0.81, 0.96, 1.0, 1.04, 1.06, 1.19, 1.21, 1.49, 1.51])
+    labels = np.array(MONEYNESS_BUCKETS.labels)[MONEYNESS_BUCKETS.assign(np.log(strike_over_spot))]
+    assert labels.tolist() == ['<-50%', '-50%..-20%', '-50%..-20%', '-20%..-5%', 'ATM', 'ATM', 'ATM', '5%..20%',
+                               '5%..20%', '20%..50%', '20%..50%', '>50%']
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.black_scholes import black_scholes_greeks
+from serenity_types.pricing.derivatives.options.engine import (OptionMarketData, OptionValuationEngine,
+                                                               SurfaceEvaluatorCache)
+from serenity_types.pricing.derivatives.options.svi import SVISurfaceEvaluator
+from serenity_types.pricing.derivatives.options.valuation import (MarketDataOverride, OptionValuation,
+                                                                  OptionValuationRequest, YieldCurveOverride)
+from serenity_types.pricing.derivatives.options.volsurface import (InterpolatedVolatilitySurface, StrikeType,
+                                                                   VolatilitySurfaceDefinition, VolModel)
+from serenity_types.pricing.derivatives.rates.yield_curve import (CurveUsage, InterpolatedYieldCurve,
+                                                                  InterpolationMethod, RateSourceType,
+                                                                  YieldCurveDefinition)
+from serenity_types.refdata.options import OptionType
+
+AS_OF = datetime(2023, 1, 1, 8, 0, 0)
+
+
+def create_surface() -> InterpolatedVolatilitySurface:
+    definition = VolatilitySurfaceDefinition(vol_surface_id=uuid4(), vol_model=VolModel.SVI,
+                                             strike_type=StrikeType.LOG_MONEYNESS, underlier_asset_id=uuid4(),
+                                             display_name='Deribit BTC (SVI, LOG_MONEYNESS)')
+    params = {0.1: {'a': 0.02, 'b': 0.1, 'rho': -0.3, 'm': 0.0, 'sigma': 0.2},
+              1.0: {'a': 0.20, 'b': 0.2, 'rho': -0.2, 'm': 0.0, 'sigma': 0.3}}
+    return InterpolatedVolatilitySurface(definition=definition, strikes=[], time_to_expiries=[], vols=[],
+                                         input_params={}, calibration_params=params)
+
+
+def create_curve(rate: float) -> InterpolatedYieldCurve:
+    definition = YieldCurveDefinition(yield_curve_id=uuid4(), curve_usage=CurveUsage.PROJECTION,
+                                      interpolation_method=InterpolationMethod.FLAT_FWD,
+                                      rate_source_type=RateSourceType.FUTURE_PX, underlier_asset_id=uuid4(),
+                                      display_name='BTC')
+    durations = [0.25, 0.5, 1.0, 2.0]
+    return InterpolatedYieldCurve(definition=definition, durations=durations, rates=[rate] * 4,
+                                  discount_factors=[np.exp(-rate * d) for d in durations])
+
+
+def create_option(i: int, option_type: OptionType = OptionType.CALL, **kwargs) -> OptionValuation:
+    return OptionValuation(option_valuation_id=f'opt-{i}', strike=18000 + 1000 * i, option_type=option_type,
+                           expiry=AS_OF + timedelta(days=30 * (i + 1)), **kwargs)
+
+
+def test_black_scholes_greeks_match_finite_differences():
+    args = dict(strike=np.array([18000.0, 22000.0]), time_to_expiry=0.4, projection_rate=0.05,
+                discounting_rate=0.03, is_call=np.array([True, False]))
+    spot, vol, h = 20000.0, 0.6, 1e-4
+    greeks = black_scholes_greeks(spot, vol=vol, **args)
+
+    def pv(**bumps):
+        inputs = {**args, 'spot': spot, 'vol': vol, **bumps}
+        return black_scholes_greeks(**inputs).pv
+
+    np.testing.assert_allclose(greeks.delta, (pv(spot=spot * (1 + h)) - pv(spot=spot * (1 - h))) / (2 * spot * h),
+                               rtol=1e-6)
+    np.testing.assert_allclose(greeks.gamma, (pv(spot=spot * (1 + h)) - 2 * greeks.pv + pv(spot=spot * (1 - h)))
+                               / (spot * h) ** 2, rtol=1e-4)
+    np.testing.assert_allclose(greeks.vega, (pv(vol=vol + h) - pv(vol=vol - h)) / (2 * h), rtol=1e-6)
+    np.testing.assert_allclose(greeks.rho, (pv(projection_rate=0.05 + h, discounting_rate=0.03 + h)
+                                            - pv(projection_rate=0.05 - h, discounting_rate=0.03 - h)) / (2 * h),
+                               rtol=1e-6)
+    np.testing.assert_allclose(greeks.theta, -(pv(time_to_expiry=0.4 + h) - pv(time_to_expiry=0.4 - h)) / (2 * h),
+                               rtol=1e-5)
+
+
+def test_engine_values_request():
+    options = [create_option(i, qty=10, contract_size=0.5) for i in range(5)]
+    options.append(create_option(5, OptionType.PUT, spot_price_override=MarketDataOverride(additive_bump=100),
+                                 implied_vol_override=MarketDataOverride(replacement=0.9)))
+    request = OptionValuationRequest(as_of_time=AS_OF, options=options)
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=create_surface(),
+                                   projection_curve=create_curve(0.05))
+    results = OptionValuationEngine().value(request, market_data)
+    assert [r.option_valuation_id for r in results] == [o.option_valuation_id for o in options]
+
+    first = results[0]
+    t = 30 / 365
+    expected_vol = SVISurfaceEvaluator.from_surface(create_surface()).implied_vol(np.log(18000 / 20000), t)
+    expected = black_scholes_greeks(20000.0, 18000.0, t, expected_vol, 0.05, 0.05, True)
+    assert first.vol_model == VolModel.SVI
+    np.testing.assert_allclose([first.iv, first.pv, first.delta, first.projection_rate, first.discounting_rate],
+                               [expected_vol, expected.pv, expected.delta, 0.05, 0.05])
+    np.testing.assert_allclose([first.spot_notional, first.delta_qty, first.delta_ccy, first.gamma_ccy,
+                                first.vega_ccy, first.rho_ccy, first.theta_ccy],
+                               [5 * 20000, 5 * expected.delta, 5 * expected.delta * 20000,
+                                5 * expected.gamma * 20000 ** 2, 5 * expected.vega / 100,
+                                5 * expected.rho / 10000, 5 * expected.theta / 365])
+
+    overridden = results[-1]
+    assert overridden.spot_price == 20100.0
+    assert overridden.iv == 0.9
+    assert overridden.delta < 0
+
+
+def test_engine_reuses_surface_evaluators():
+    surface = create_surface()
+    cache = SurfaceEvaluatorCache(max_size=1)
+    evaluator = cache.evaluator(surface, VolModel.SVI)
+    assert isinstance(evaluator, SVISurfaceEvaluator)
+    assert cache.evaluator(surface, VolModel.SVI) is evaluator
+    assert cache.evaluator(surface.copy(), VolModel.SVI) is not evaluator
+    assert len(cache) == 1
+
+    engine = OptionValuationEngine()
+    request = OptionValuationRequest(as_of_time=AS_OF, options=[create_option(i) for i in range(3)])
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=surface, projection_curve=create_curve(0.05))
+    first = engine.value_columns(request, market_data)
+    cached = engine.evaluator_cache.evaluator(surface, VolModel.SVI)
+    second = engine.value_columns(request, market_data)
+    assert engine.evaluator_cache.evaluator(surface, VolModel.SVI) is cached
+    assert len(engine.evaluator_cache) == 1
+    np.testing.assert_array_equal(first.iv, second.iv)
+    np.testing.assert_array_equal(first.iv, OptionValuationEngine().value_columns(request, market_data).iv)
+
+
+def test_engine_rate_overrides_and_validation():
+    request = OptionValuationRequest(as_of_time=AS_OF, options=[create_option(0)],
+                                     projection_curve_override=YieldCurveOverride(
+                                         rate_override=MarketDataOverride(replacement=0.08)))
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=create_surface(), projection_curve=None)
+    result = OptionValuationEngine().value(request, market_data)[0]
+    assert result.projection_rate == result.discounting_rate == 0.08
+
+    request = OptionValuationRequest(as_of_time=AS_OF, options=[create_option(0).copy(update={'strike': None})])
+    with pytest.raises(ValueError):
+        OptionValuationEngine().value(request, market_data._replace(projection_curve=create_curve(0.05)))
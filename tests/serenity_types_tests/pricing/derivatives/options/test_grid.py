@@ -0,0 +1,38 @@
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.engine import OptionMarketData, OptionValuationEngine
+from serenity_types.pricing.derivatives.options.grid import value_grid
+from serenity_types.pricing.derivatives.options.valuation import MarketDataOverride, OptionValuationRequest
+from serenity_types.refdata.options import OptionType
+from serenity_types_tests.pricing.derivatives.options.test_engine import (AS_OF, create_curve, create_option,
+                                                                          create_surface)
+
+
+def test_grid_matches_bumped_requests():
+    options = [create_option(i, OptionType.CALL if i % 2 else OptionType.PUT, qty=i + 1) for i in range(4)]
+    request = OptionValuationRequest(as_of_time=AS_OF, options=options)
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=create_surface(),
+                                   projection_curve=create_curve(0.05))
+    spot_bumps = np.array([-1000.0, 0.0, 1000.0])
+    vol_bumps = np.array([-0.05, 0.0, 0.05, 0.10])
+    grid = value_grid(request, market_data, spot_bumps, vol_bumps)
+    assert grid.valuations.pv.shape == (3, 4, 4)
+    assert grid.valuations.projection_rate.shape == (3, 4, 4)
+    assert grid.pnl.shape == (3, 4)
+    assert grid.pnl[1, 1] == 0.0
+
+    # every grid point matches a separate request with additive_bump overrides
+    engine = OptionValuationEngine()
+    base = engine.value_columns(request, market_data)
+    for i, spot_bump in enumerate(spot_bumps):
+        for j, vol_bump in enumerate(vol_bumps):
+            bumped = [o.copy(update={'spot_price_override': MarketDataOverride(additive_bump=spot_bump),
+                                     'implied_vol_override': MarketDataOverride(additive_bump=vol_bump)})
+                      for o in options]
+            expected = engine.value_columns(request.copy(update={'options': bumped}), market_data)
+            np.testing.assert_allclose(grid.valuations.pv[i, j], expected.pv)
+            np.testing.assert_allclose(grid.valuations.delta_ccy[i, j], expected.delta_ccy)
+            np.testing.assert_allclose(grid.pnl[i, j], np.sum((expected.pv - base.pv) * np.arange(1, 5)))
+
+    relative = value_grid(request, market_data, [0.05], [0.0], relative_spot_bumps=True)
+    np.testing.assert_allclose(relative.valuations.spot_price, 21000.0)
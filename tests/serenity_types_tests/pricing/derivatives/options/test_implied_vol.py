@@ -0,0 +1,52 @@
+from uuid import uuid4
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.black_scholes import black_price
+from serenity_types.pricing.derivatives.options.implied_vol import implied_vol, implied_vol_from_surface_points
+from serenity_types.pricing.derivatives.options.volsurface import RawVolatilitySurface, StrikeType, VolPoint
+from serenity_types.refdata.options import OptionType
+
+
+def test_implied_vol_roundtrip():
+    rng = np.random.default_rng(7)
+    n = 10000
+    forward = np.full(n, 20000.0)
+    time_to_expiry = rng.uniform(1 / 365, 2, n)
+    vol = rng.uniform(0.1, 2.0, n)
+    strike = forward * np.exp(rng.uniform(-3, 3, n) * vol * np.sqrt(time_to_expiry))
+    rate = rng.uniform(0, 0.1, n)
+    is_call = rng.random(n) < 0.5
+    price = black_price(forward, strike, time_to_expiry, vol, np.exp(-rate * time_to_expiry), is_call)
+
+    result = implied_vol(price, forward, strike, time_to_expiry, rate, is_call)
+    assert result.converged.all()
+    assert len(result.failed) == 0
+    assert result.iterations <= 6
+    np.testing.assert_allclose(result.iv, vol, rtol=1e-7)
+
+
+def test_implied_vol_reports_failures():
+    option_types = [OptionType.CALL, OptionType.CALL, OptionType.PUT, OptionType.CALL]
+    price = np.array([1500.0, 25000.0, 1e-3, 100.0])
+    strike = np.array([20000.0, 20000.0, 30000.0, 10000.0])
+    result = implied_vol(price, 20000.0, strike, 0.25, 0.0, option_types)
+
+    # above forward, below intrinsic value of an ITM put and below intrinsic value of an ITM call
+    np.testing.assert_array_equal(result.converged, [True, False, False, False])
+    np.testing.assert_array_equal(result.failed, [1, 2, 3])
+    assert np.isnan(result.iv[1:]).all()
+
+
+def test_implied_vol_from_surface_points():
+    spot = 20000.0
+    strikes = np.array([15000.0, 20000.0, 25000.0])
+    vols = np.array([0.9, 0.7, 0.8])
+    is_call = np.array([False, True, True])
+    price = black_price(spot, strikes, 0.5, vols, np.exp(-0.05 * 0.5), is_call)
+    points = [VolPoint(option_asset_id=uuid4(), time_to_expiry=0.5, strike_value=np.log(k / spot), mark_price=p,
+                       projection_rate=0.05, discounting_rate=0.05, forward_price=spot, iv=0.0)
+              for k, p in zip(strikes, price)]
+    raw = RawVolatilitySurface(strike_type=StrikeType.LOG_MONEYNESS, spot_price=spot, vol_points=points)
+    result = implied_vol_from_surface_points(raw, [OptionType.PUT, OptionType.CALL, OptionType.CALL])
+    np.testing.assert_allclose(result.iv, vols, rtol=1e-8)
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.engine import OptionMarketData, OptionValuationEngine
+from serenity_types.pricing.derivatives.options.incremental import IncrementalOptionRepricer
+from serenity_types.pricing.derivatives.options.valuation import MarketDataOverride, OptionValuationRequest
+from serenity_types.refdata.options import OptionType
+from serenity_types_tests.pricing.derivatives.options.test_engine import (AS_OF, create_curve, create_option,
+                                                                          create_surface)
+
+
+def create_request() -> OptionValuationRequest:
+    options = [create_option(i, OptionType.CALL if i % 2 else OptionType.PUT, qty=i + 1) for i in range(6)]
+    options.append(create_option(2, spot_price_override=MarketDataOverride(replacement=19000)))
+    return OptionValuationRequest(options=options)
+
+
+def test_incremental_repricing_approximates_full_valuation():
+    request = create_request()
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=create_surface(),
+                                   projection_curve=create_curve(0.05))
+    repricer = IncrementalOptionRepricer(request, spot_threshold=0.005, max_age=timedelta(seconds=30))
+    base = repricer.update(market_data, now=AS_OF)
+
+    moved = market_data._replace(spot_price=20080.0)
+    now = AS_OF + timedelta(seconds=10)
+    approx = repricer.update(moved, now=now)
+    assert repricer.full_reprices == 1
+    assert approx.spot_price[-1] == 19000.0
+    assert approx.pv[-1] == pytest.approx(base.pv[-1], rel=1e-6)
+
+    full = OptionValuationEngine().value_columns(request, moved, now)
+    np.testing.assert_allclose(approx.pv, full.pv, rtol=1e-4, atol=0.05)
+    np.testing.assert_allclose(approx.delta_ccy, full.delta_ccy, rtol=2e-3, atol=1.0)
+
+    # crossing the spot threshold, a vol shift over the threshold and the timer all trigger a full reprice
+    repricer.update(market_data._replace(spot_price=20200.0), now=now)
+    assert repricer.full_reprices == 2
+    repricer.update(market_data._replace(spot_price=20200.0), vol_shift=0.01, now=now)
+    assert repricer.full_reprices == 3
+    repricer.update(market_data._replace(spot_price=20200.0), now=now + timedelta(seconds=31))
+    assert repricer.full_reprices == 4
+
+
+def test_incremental_repricing_requires_real_time_mode():
+    with pytest.raises(ValueError):
+        IncrementalOptionRepricer(create_request().copy(update={'as_of_time': AS_OF}))
+
+
+def test_incremental_repricing_measures_vol_moves_from_the_base():
+    request = create_request()
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=create_surface(),
+                                   projection_curve=create_curve(0.05))
+    repricer = IncrementalOptionRepricer(request, vol_threshold=0.005)
+    for vol_shift in (0.10, 0.10, 0.10, 0.102):
+        approx = repricer.update(market_data, vol_shift=vol_shift, now=AS_OF)
+    assert repricer.full_reprices == 1
+
+    bumped = request.copy(update={'options': [
+        option.copy(update={'implied_vol_override': MarketDataOverride(additive_bump=0.102)})
+        for option in request.options]})
+    full = OptionValuationEngine().value_columns(bumped, market_data, AS_OF)
+    np.testing.assert_allclose(approx.pv, full.pv, rtol=1e-4, atol=0.05)
+    np.testing.assert_allclose(approx.vega_ccy, full.vega_ccy, rtol=1e-2)
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.engine import OptionMarketData, OptionValuationEngine
+from serenity_types.pricing.derivatives.options.memo import MarketDataVersions, MemoizedOptionValuationEngine
+from serenity_types.pricing.derivatives.options.valuation import MarketDataOverride, OptionValuationRequest
+from serenity_types.refdata.options import OptionType
+from serenity_types_tests.pricing.derivatives.options.test_engine import (AS_OF, create_curve, create_option,
+                                                                          create_surface)
+
+
+def create_market_data() -> OptionMarketData:
+    return OptionMarketData(spot_price=20000.0, vol_surface=create_surface(), projection_curve=create_curve(0.05))
+
+
+def test_memoized_engine_matches_engine_and_reuses_results():
+    options = [create_option(i, OptionType.CALL if i % 2 else OptionType.PUT, qty=i + 1) for i in range(6)]
+    options.append(create_option(0, OptionType.PUT, spot_price_override=MarketDataOverride(additive_bump=50)))
+    request = OptionValuationRequest(as_of_time=AS_OF, options=options)
+    market_data = create_market_data()
+    versions = MarketDataVersions(vol_surface_id=uuid4(), vol_surface_as_of_time=AS_OF)
+
+    memo = MemoizedOptionValuationEngine()
+    expected = OptionValuationEngine().value_columns(request, market_data)
+    for actual in (memo.value_columns(request, market_data, versions),
+                   memo.value_columns(request, market_data, versions)):
+        for field in expected._fields:
+            np.testing.assert_allclose(getattr(actual, field), getattr(expected, field), err_msg=field)
+    assert (memo.misses, memo.hits) == (7, 7)
+
+    # same economics under a different ID and qty re-use the per-unit valuation
+    rescaled = create_option(1, OptionType.CALL).copy(update={'option_valuation_id': 'other', 'qty': 10})
+    result = memo.value(request.copy(update={'options': [rescaled]}), market_data, versions)[0]
+    assert memo.hits == 8
+    assert result.option_valuation_id == 'other'
+    np.testing.assert_allclose(result.delta_qty, 5 * expected.delta_qty[1])
+
+    # a new spot is a different request context
+    memo.value_columns(request, market_data._replace(spot_price=21000.0), versions)
+    assert memo.misses == 14
+
+
+def test_memoized_engine_eviction_and_invalidation():
+    request = OptionValuationRequest(as_of_time=AS_OF, options=[create_option(i) for i in range(4)])
+    market_data = create_market_data()
+    versions = MarketDataVersions(vol_surface_id=uuid4(), vol_surface_as_of_time=AS_OF)
+
+    memo = MemoizedOptionValuationEngine(max_size=3)
+    memo.value_columns(request, market_data, versions)
+    assert len(memo) == 3
+
+    newer = versions._replace(vol_surface_as_of_time=AS_OF + timedelta(hours=1))
+    memo.value_columns(request.copy(update={'options': request.options[:1]}), market_data, newer)
+    assert len(memo) == 1
+
+    # results against stale versions are computed but not cached
+    memo.value_columns(request, market_data, versions)
+    assert len(memo) == 1
+
+    real_time = request.copy(update={'as_of_time': None})
+    memo.value_columns(real_time, market_data, newer, valuation_time=None)
+    assert len(memo) == 1
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.overrides import gather_overrides, resolve_overrides
+from serenity_types.pricing.derivatives.options.valuation import (MarketDataOverride, OptionValuationRequest,
+                                                                  YieldCurveOverride)
+from serenity_types_tests.pricing.derivatives.options.test_engine import AS_OF, create_option
+
+
+def test_gather_overrides():
+    overrides = gather_overrides([None, MarketDataOverride(replacement=0.5), MarketDataOverride(additive_bump=-0.1),
+                                  MarketDataOverride()])
+    assert overrides.replace_mask.tolist() == [False, True, False, False]
+    np.testing.assert_allclose(overrides.apply(np.array([0.6, 0.6, 0.6, 0.6])), [0.6, 0.5, 0.5, 0.6])
+
+    # scenario dimensions broadcast against the per-override arrays
+    applied = overrides.apply(np.array([[0.6], [0.7]]))
+    np.testing.assert_allclose(applied, [[0.6, 0.5, 0.5, 0.6], [0.7, 0.5, 0.6, 0.7]])
+
+    assert gather_overrides([]).apply(np.zeros(0)).shape == (0,)
+
+
+def test_resolve_overrides_in_bulk():
+    options = [create_option(0), create_option(1, spot_price_override=MarketDataOverride(additive_bump=100)),
+               create_option(2, implied_vol_override=MarketDataOverride(replacement=0.9))]
+    request = OptionValuationRequest(as_of_time=AS_OF, options=options,
+                                     projection_curve_override=YieldCurveOverride(
+                                         rate_override=MarketDataOverride(replacement=0.08)))
+    overrides = resolve_overrides(request)
+    np.testing.assert_allclose(overrides.spot_price.apply(np.full(3, 20000.0)), [20000, 20100, 20000])
+    np.testing.assert_allclose(overrides.implied_vol.apply(np.full(3, 0.6)), [0.6, 0.6, 0.9])
+    np.testing.assert_allclose(overrides.projection_rate.apply(np.full(3, 0.05)), [0.08] * 3)
+    np.testing.assert_allclose(overrides.discounting_rate.apply(np.full(3, 0.05)), [0.05] * 3)
+
+
+def test_resolve_overrides_rejects_bump_and_replace():
+    # construct() bypasses the per-object validator, as when overrides are built up programmatically
+    conflicting = MarketDataOverride.construct(replacement=0.9, additive_bump=0.1)
+    options = [create_option(i, implied_vol_override=conflicting if i % 2 else None) for i in range(4)]
+    with pytest.raises(ValueError, match=r"opt-1.*opt-3"):
+        resolve_overrides(OptionValuationRequest(as_of_time=AS_OF, options=options))
+
+    request = OptionValuationRequest(as_of_time=AS_OF, options=[create_option(0)],
+                                     discounting_curve_override=YieldCurveOverride.construct(
+                                         rate_override=conflicting))
+    with pytest.raises(ValueError, match='discounting'):
+        resolve_overrides(request)
@@ -0,0 +1,69 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.strikes import (StrikeAnchoring, convert_raw_surface,
+                                                                convert_strikes, convert_vol_points,
+                                                                reanchor_surface)
+from serenity_types.pricing.derivatives.options.svi import SVISurfaceEvaluator
+from serenity_types.pricing.derivatives.options.volsurface import (InterpolatedVolatilitySurface,
+                                                                   RawVolatilitySurface, StrikeType,
+                                                                   VolatilitySurfaceDefinition, VolModel, VolPoint)
+
+
+def test_convert_strikes():
+    strikes = np.array([15000.0, 20000.0, 30000.0])
+    k = convert_strikes(strikes, StrikeType.ABSOLUTE, StrikeType.LOG_MONEYNESS, 20000.0)
+    np.testing.assert_allclose(k, np.log(strikes / 20000.0))
+    np.testing.assert_allclose(convert_strikes(k, StrikeType.LOG_MONEYNESS, StrikeType.ABSOLUTE, 20000.0), strikes)
+
+    # sticky-strike keeps absolute strikes, sticky-moneyness keeps log-moneyness
+    np.testing.assert_allclose(convert_strikes(strikes, StrikeType.ABSOLUTE, StrikeType.ABSOLUTE, 20000.0, 22000.0),
+                               strikes)
+    np.testing.assert_allclose(convert_strikes(k, StrikeType.LOG_MONEYNESS, StrikeType.LOG_MONEYNESS, 20000.0,
+                                               22000.0, StrikeAnchoring.STICKY_MONEYNESS), k)
+    np.testing.assert_allclose(convert_strikes(k, StrikeType.LOG_MONEYNESS, StrikeType.LOG_MONEYNESS, 20000.0,
+                                               22000.0), np.log(strikes / 22000.0))
+
+
+def test_reanchor_surface_sticky_strike():
+    definition = VolatilitySurfaceDefinition(vol_surface_id=uuid4(), vol_model=VolModel.SVI,
+                                             strike_type=StrikeType.LOG_MONEYNESS,
+                                             underlier_asset_id=uuid4(), display_name='Test')
+    params = {0.5: {'a': 0.02, 'b': 0.1, 'rho': -0.3, 'm': 0.0, 'sigma': 0.2}}
+    surface = InterpolatedVolatilitySurface(definition=definition, strikes=[-0.1, 0.0, 0.1],
+                                            time_to_expiries=[0.5, 0.5, 0.5], vols=[0.6, 0.5, 0.55],
+                                            input_params={}, calibration_params=params)
+    moved = reanchor_surface(surface, 20000.0, 25000.0)
+    shift = np.log(20000.0 / 25000.0)
+    np.testing.assert_allclose(moved.strikes, np.array(surface.strikes) + shift)
+    assert moved.vols == surface.vols
+
+    # the vol at a fixed absolute strike is unchanged after the move
+    old_vol = SVISurfaceEvaluator.from_surface(surface).implied_vol(np.log(21000.0 / 20000.0), 0.5)
+    new_vol = SVISurfaceEvaluator.from_surface(moved).implied_vol(np.log(21000.0 / 25000.0), 0.5)
+    np.testing.assert_allclose(new_vol, old_vol)
+
+    assert reanchor_surface(surface, 20000.0, 25000.0, StrikeAnchoring.STICKY_MONEYNESS) == surface
+    assert moved.definition.strike_type == StrikeType.LOG_MONEYNESS
+
+    absolute = surface.copy(update={'definition': definition.copy(update={'strike_type': StrikeType.ABSOLUTE})})
+    with pytest.raises(ValueError):
+        reanchor_surface(absolute, 20000.0, 25000.0)
+
+
+def test_convert_vol_points():
+    points = [VolPoint(option_asset_id=uuid4(), time_to_expiry=0.5, strike_value=k, mark_price=100.0,
+                       projection_rate=0.0, discounting_rate=0.0, forward_price=20200.0, iv=0.5)
+              for k in (18000.0, 22000.0)]
+    raw = RawVolatilitySurface(strike_type=StrikeType.ABSOLUTE, spot_price=20000.0, vol_points=points)
+    converted = convert_raw_surface(raw, StrikeType.LOG_MONEYNESS, new_spot_price=21000.0,
+                                    anchoring=StrikeAnchoring.STICKY_MONEYNESS)
+    assert converted.strike_type == StrikeType.LOG_MONEYNESS
+    np.testing.assert_allclose([p.strike_value for p in converted.vol_points], np.log([0.9, 1.1]))
+    np.testing.assert_allclose([p.forward_price for p in converted.vol_points], 20200.0 * 1.05)
+
+    to_forward = convert_vol_points(points, StrikeType.ABSOLUTE, StrikeType.LOG_MONEYNESS, 20000.0,
+                                    anchor_to_forward=True)
+    np.testing.assert_allclose([p.strike_value for p in to_forward], np.log(np.array([18000.0, 22000.0]) / 20200.0))
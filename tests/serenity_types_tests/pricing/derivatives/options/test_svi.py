@@ -0,0 +1,55 @@
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.svi import SVISurfaceEvaluator, svi_total_variance
+from serenity_types.pricing.derivatives.options.volsurface import (InterpolatedVolatilitySurface, StrikeType,
+                                                                   VolatilitySurfaceDefinition, VolModel)
+
+CALIBRATION_PARAMS = {
+    0.25: {'a': 0.01, 'b': 0.10, 'rho': -0.30, 'm': 0.00, 'sigma': 0.20},
+    1.00: {'a': 0.04, 'b': 0.15, 'rho': -0.20, 'm': 0.05, 'sigma': 0.30}
+}
+
+
+def create_surface(vol_model: VolModel) -> InterpolatedVolatilitySurface:
+    definition = VolatilitySurfaceDefinition(vol_surface_id=uuid4(), vol_model=vol_model,
+                                             strike_type=StrikeType.LOG_MONEYNESS,
+                                             underlier_asset_id=uuid4(), display_name='Test')
+    return InterpolatedVolatilitySurface(definition=definition, strikes=[], time_to_expiries=[], vols=[],
+                                         input_params={}, calibration_params=CALIBRATION_PARAMS)
+
+
+def test_svi_evaluation_on_slices():
+    evaluator = SVISurfaceEvaluator.from_surface(create_surface(VolModel.SVI))
+    k = np.linspace(-1, 1, 11)
+    for t, params in CALIBRATION_PARAMS.items():
+        expected = svi_total_variance(k, **params)
+        result = evaluator.evaluate(k, t)
+        np.testing.assert_allclose(result.total_variances, expected)
+        np.testing.assert_allclose(result.vols, np.sqrt(expected / t))
+
+
+def test_svi_interpolation_and_extrapolation():
+    evaluator = SVISurfaceEvaluator(CALIBRATION_PARAMS)
+    k = np.array([-0.5, 0.0, 0.5])
+    w_short = svi_total_variance(k, **CALIBRATION_PARAMS[0.25])
+    w_long = svi_total_variance(k, **CALIBRATION_PARAMS[1.00])
+
+    np.testing.assert_allclose(evaluator.total_variance(k, 0.625), 0.5 * (w_short + w_long))
+    np.testing.assert_allclose(evaluator.implied_vol(k, 0.1), np.sqrt(w_short / 0.25))
+    np.testing.assert_allclose(evaluator.implied_vol(k, 2.0), np.sqrt(w_long / 1.0))
+
+    # broadcasting a strike column against an expiry row gives the full grid
+    grid = evaluator.total_variance(k[:, None], np.array([0.25, 1.0])[None, :])
+    np.testing.assert_allclose(grid, np.column_stack([w_short, w_long]))
+
+
+def test_svi_invalid_inputs():
+    with pytest.raises(ValueError):
+        SVISurfaceEvaluator.from_surface(create_surface(VolModel.BLACK_SCHOLES))
+    with pytest.raises(ValueError):
+        SVISurfaceEvaluator({0.5: {'a': 0.1}})
+    with pytest.raises(ValueError):
+        SVISurfaceEvaluator({})
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from serenity_types.pricing.derivatives.options.volgrid import VolSurfaceGridIndex
+
+
+def create_mesh():
+    strike_axis = np.array([-0.5, 0.0, 0.5])
+    expiry_axis = np.array([0.5, 1.0])
+    expiries, strikes = np.meshgrid(expiry_axis, strike_axis, indexing='ij')
+    vols = 0.5 + 0.1 * strikes ** 2 + 0.05 * expiries
+    return strikes.ravel(), expiries.ravel(), vols.ravel()
+
+
+def test_rectilinear_mesh_bilinear_in_total_variance():
+    strikes, expiries, vols = create_mesh()
+
+    # shuffle the mesh to check the grid is rebuilt with sorted axes
+    order = np.random.default_rng(42).permutation(len(vols))
+    index = VolSurfaceGridIndex(strikes[order], expiries[order], vols[order])
+    assert index.is_rectilinear
+
+    np.testing.assert_allclose(index.implied_vol(strikes, expiries), vols)
+
+    w = vols * vols * expiries
+    mid = index.total_variance(np.array([-0.25]), np.array([0.75]))
+    expected = 0.25 * (w[0] + w[1] + w[3] + w[4])
+    np.testing.assert_allclose(mid, [expected])
+
+    # flat in strike and flat implied vol in expiry beyond the grid
+    np.testing.assert_allclose(index.implied_vol([-2.0, 2.0], [0.5, 0.5]), [vols[0], vols[2]])
+    np.testing.assert_allclose(index.implied_vol([0.0, 0.0], [0.1, 3.0]), [vols[1], vols[4]])
+
+
+def test_scattered_mesh_fallback():
+    strikes, expiries, vols = create_mesh()
+    strikes = np.append(strikes, 0.25)
+    expiries = np.append(expiries, 0.75)
+    vols = np.append(vols, 0.6)
+    index = VolSurfaceGridIndex(strikes, expiries, vols, chunk_size=2)
+    assert not index.is_rectilinear
+
+    np.testing.assert_allclose(index.implied_vol(strikes, expiries), vols)
+    between = index.implied_vol([0.1], [0.6])
+    assert vols.min() <= between[0] <= vols.max()
+
+
+def test_mismatched_mesh():
+    with pytest.raises(ValueError):
+        VolSurfaceGridIndex([0.0, 1.0], [0.5], [0.5])
@@ -0,0 +1,85 @@
+from datetime import datetime, time, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.marketdata.marks import AssetMarkPrice
+from serenity_types.pricing.derivatives.rates.basis import FuturesBasisCurveBuilder
+from serenity_types.pricing.derivatives.rates.yield_curve import RateSourceType
+from serenity_types.refdata.asset import AssetType
+from serenity_types.refdata.derivatives import Expiry, PayoffType, SettlementType
+from serenity_types.refdata.futures import Future, Perpetual
+
+AS_OF = datetime(2023, 1, 1, 8, 0, 0, tzinfo=timezone.utc)
+BTC = uuid4()
+SPOT = 20000.0
+
+
+def create_future(days: int, payoff_type: PayoffType, contract_size: float = 1.0) -> Future:
+    expiry = AS_OF + timedelta(days=days)
+    return Future(asset_id=uuid4(), asset_type=AssetType.FUTURE, symbol=f'BTC-{days}', display_name='BTC future',
+                  underlier_asset_id=BTC, contract_size=contract_size, settlement_asset_id=BTC,
+                  settlement_type=SettlementType.CASH, exchange_id=uuid4(), payoff_type=payoff_type,
+                  expiry=Expiry(expiration_date=expiry.date(), expiration_time=time(8, 0)))
+
+
+def create_perpetual() -> Perpetual:
+    return Perpetual(asset_id=uuid4(), asset_type=AssetType.FUTURE, symbol='BTC-PERP', display_name='BTC perp',
+                     underlier_asset_id=BTC, contract_size=1.0, settlement_asset_id=BTC,
+                     settlement_type=SettlementType.CASH, exchange_id=uuid4(), payoff_type=PayoffType.LINEAR)
+
+
+def test_future_points():
+    # the inverse future is a 10 USD contract whatever its contract_size in BTC
+    futures = [create_future(90, PayoffType.LINEAR), create_future(30, PayoffType.INVERSE, 0.001),
+               create_future(180, PayoffType.LINEAR), create_future(-1, PayoffType.LINEAR)]
+    builder = FuturesBasisCurveBuilder(futures, inverse_marks_in_coin=True,
+                                       contract_values_ccy=[np.nan, 10.0, np.nan, np.nan])
+    rates = np.array([0.05, 0.04])
+    forwards = SPOT * np.exp(rates * np.array([90, 30]) / 365)
+    # the inverse future is marked as coin per contract; the 180d future has no mark, the expired one is skipped
+    marks = [AssetMarkPrice(asset_id=futures[0].asset_id, mark_time=AS_OF, mark_price=forwards[0]),
+             AssetMarkPrice(asset_id=futures[1].asset_id, mark_time=AS_OF, mark_price=10.0 / forwards[1]),
+             AssetMarkPrice(asset_id=futures[3].asset_id, mark_time=AS_OF, mark_price=SPOT)]
+
+    curve = builder.build(SPOT, marks, AS_OF)
+    assert [p.reference_assets for p in curve.points] == [[futures[1].asset_id], [futures[0].asset_id]]
+    assert {p.rate_source_type for p in curve.points} == {RateSourceType.FUTURE_PX}
+    np.testing.assert_allclose([p.rate for p in curve.points], [0.04, 0.05])
+    np.testing.assert_allclose([p.duration for p in curve.points], [30 / 365, 90 / 365])
+    assert curve.points[1].discount_factor == pytest.approx(SPOT / forwards[0])
+    assert curve.points[1].pillar_date == futures[0].expiry.expiration_date
+
+    # aligned arrays take the same path on every tick
+    ticked = builder.build(SPOT, builder.future_marks(marks), AS_OF)
+    assert [p.rate for p in ticked.points] == [p.rate for p in curve.points]
+
+
+def test_inverse_marks_in_base_currency():
+    future = create_future(90, PayoffType.INVERSE, 0.001)
+    forward = SPOT * np.exp(0.05 * 90 / 365)
+    curve = FuturesBasisCurveBuilder([future]).build(SPOT, np.array([forward]), AS_OF)
+    assert curve.points[0].rate == pytest.approx(0.05)
+    with pytest.raises(ValueError):
+        FuturesBasisCurveBuilder([future], inverse_marks_in_coin=True)
+
+
+def test_funding_points():
+    perpetual = create_perpetual()
+    builder = FuturesBasisCurveBuilder([create_future(30, PayoffType.LINEAR)], [perpetual, create_perpetual()])
+    prints = [AssetMarkPrice(asset_id=perpetual.asset_id, mark_time=AS_OF - timedelta(hours=8 * i), mark_price=rate)
+              for i, rate in enumerate([0.0001, 0.0003, 0.0002, 0.05])]
+    curve = builder.build(SPOT, np.array([np.nan]), AS_OF, {perpetual.asset_id: prints})
+
+    # only the prints within the last day are rolled up, and perpetuals without prints are skipped
+    assert len(curve.points) == 1
+    point = curve.points[0]
+    assert point.rate_source_type == RateSourceType.FUNDING_RATE
+    assert point.tenor == '8H'
+    assert point.rate_sources == [str(perpetual.exchange_id)]
+    assert point.mark_prices == [0.0001, 0.0003, 0.0002]
+    duration = 8 / (24 * 365)
+    assert point.duration == pytest.approx(duration)
+    assert point.rate == pytest.approx(np.log1p(0.0002) / duration)
+    assert point.discount_factor == pytest.approx(1 / 1.0002)
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import numpy as np
+
+from serenity_types.pricing.derivatives.options.engine import OptionMarketData, OptionValuationEngine
+from serenity_types.pricing.derivatives.options.valuation import OptionValuationRequest
+from serenity_types.pricing.derivatives.rates.curves import zero_rates
+from serenity_types.pricing.derivatives.rates.forwards import ForwardEngine
+from serenity_types_tests.pricing.derivatives.options.test_engine import (AS_OF, create_curve, create_option,
+                                                                          create_surface)
+
+
+def test_forwards_per_distinct_expiry():
+    projection, discounting = create_curve(0.05), create_curve(0.03)
+    time_to_expiry = np.array([0.5, 0.1, 0.5, 3.0, 0.1])
+    engine = ForwardEngine()
+    forwards = engine.forwards(20000.0, time_to_expiry, projection, discounting)
+    np.testing.assert_array_equal(forwards.time_to_expiry, [0.1, 0.5, 3.0])
+    np.testing.assert_array_equal(forwards.time_to_expiry[forwards.index], time_to_expiry)
+    np.testing.assert_allclose(forwards.forward_price, 20000.0 * np.exp(0.05 * forwards.time_to_expiry))
+    np.testing.assert_allclose(forwards.discount_factor, np.exp(-0.03 * forwards.time_to_expiry))
+    assert len(engine) == 2
+
+    self_discounting = engine.forwards(21000.0, time_to_expiry, projection)
+    np.testing.assert_allclose(self_discounting.discounting_rate, forwards.projection_rate)
+    assert len(engine) == 2
+
+
+def test_zero_rates_cached_per_curve_version():
+    engine = ForwardEngine(max_size=2)
+    curve = create_curve(0.05)
+    time_to_expiry = np.array([[0.25, 1.5], [1.5, 4.0]])
+    rates = engine.zero_rates(curve, time_to_expiry)
+    np.testing.assert_allclose(rates, zero_rates(curve, time_to_expiry))
+    assert rates.shape == (2, 2)
+
+    # a re-built curve under the same definition is a new version
+    rebuilt = curve.copy(update={'discount_factors': [np.exp(-0.06 * d) for d in curve.durations]})
+    np.testing.assert_allclose(engine.zero_rates(rebuilt, time_to_expiry), 0.06)
+    engine.zero_rates(curve, np.array([0.1]))
+    assert len(engine) == 2
+
+
+def test_rates_independent_of_cache_history():
+    curve = create_curve(0.05)
+    curve = curve.copy(update={'rates': [0.01, 0.03, 0.06, 0.10], 'discount_factors': [
+        np.exp(-r * d) for r, d in zip([0.01, 0.03, 0.06, 0.10], curve.durations)]})
+    request = OptionValuationRequest(options=[create_option(i) for i in range(3)])
+    market_data = OptionMarketData(spot_price=20000.0, vol_surface=create_surface(), projection_curve=curve)
+    shared = OptionValuationEngine()
+    later = AS_OF + timedelta(days=150)
+    shared.value_columns(request, market_data, AS_OF)
+    fresh = OptionValuationEngine().value_columns(request, market_data, later)
+    np.testing.assert_array_equal(shared.value_columns(request, market_data, later).projection_rate,
+                                  fresh.projection_rate)
+
+    # valuations at the same instant still share the cached rates
+    cached = len(shared.forward_engine)
+    shared.value_columns(request, market_data._replace(spot_price=21000.0), later)
+    assert len(shared.forward_engine) == cached
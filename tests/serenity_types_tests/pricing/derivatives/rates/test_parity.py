@@ -0,0 +1,69 @@
+from datetime import datetime, time, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.marketdata.marks import AssetMarkPrice
+from serenity_types.pricing.derivatives.options.black_scholes import black_price
+from serenity_types.pricing.derivatives.rates.parity import extract_implied_forwards
+from serenity_types.pricing.derivatives.rates.yield_curve import CurveUsage, RateSourceType
+from serenity_types.refdata.asset import AssetType
+from serenity_types.refdata.derivatives import Expiry, SettlementType
+from serenity_types.refdata.options import ListedOption, OptionStyle, OptionType
+
+AS_OF = datetime(2023, 1, 1, 8, 0, 0, tzinfo=timezone.utc)
+BTC = uuid4()
+
+
+def create_listed_option(strike: float, days: int, option_type: OptionType) -> ListedOption:
+    expiry = AS_OF + timedelta(days=days)
+    return ListedOption(asset_id=uuid4(), asset_type=AssetType.LISTED_OPTION, symbol=f'BTC-{days}-{strike}',
+                        display_name='BTC option', underlier_asset_id=BTC, contract_size=1.0,
+                        settlement_asset_id=BTC, settlement_type=SettlementType.CASH, exchange_id=uuid4(),
+                        option_type=option_type, option_style=OptionStyle.EUROPEAN, strike_price=strike,
+                        expiry=Expiry(expiration_date=expiry.date(), expiration_time=time(8, 0)))
+
+
+def create_chain(forwards, discount_factors):
+    chain, marks = [], []
+    for days, forward, discount_factor in zip((30, 90), forwards, discount_factors):
+        for strike in (16000.0, 18000.0, 20000.0, 22000.0, 24000.0):
+            for option_type in (OptionType.CALL, OptionType.PUT):
+                option = create_listed_option(strike, days, option_type)
+                price = black_price(forward, strike, days / 365, 0.6, discount_factor, option_type == OptionType.CALL)
+                chain.append(option)
+                marks.append(AssetMarkPrice(asset_id=option.asset_id, mark_time=AS_OF, mark_price=float(price)))
+    return chain, marks
+
+
+def test_extract_implied_forwards():
+    chain, marks = create_chain([20100.0, 20400.0], [0.998, 0.99])
+    # an unpaired call, an unmarked put and a single-pair expiry are all ignored
+    chain.append(create_listed_option(30000.0, 30, OptionType.CALL))
+    marks.append(AssetMarkPrice(asset_id=chain[-1].asset_id, mark_time=AS_OF, mark_price=1.0))
+    chain.append(create_listed_option(16000.0, 30, OptionType.PUT))
+    lone = [create_listed_option(20000.0, 180, option_type) for option_type in (OptionType.CALL, OptionType.PUT)]
+    chain.extend(lone)
+    marks.extend(AssetMarkPrice(asset_id=o.asset_id, mark_time=AS_OF, mark_price=1000.0) for o in lone)
+
+    forwards = extract_implied_forwards(chain, marks, AS_OF)
+    np.testing.assert_allclose(forwards.forward_price, [20100.0, 20400.0], rtol=1e-9)
+    np.testing.assert_allclose(forwards.discount_factor, [0.998, 0.99], rtol=1e-9)
+    np.testing.assert_allclose(forwards.time_to_expiry, [30 / 365, 90 / 365])
+    assert forwards.pairs.tolist() == [5, 5]
+    assert forwards.reference_assets[0][:2] == [chain[0].asset_id, chain[1].asset_id]
+
+    points = forwards.curve_points(CurveUsage.DISCOUNTING)
+    assert [p.rate_source_type for p in points] == [RateSourceType.OPTION_PX] * 2
+    assert points[1].discount_factor == pytest.approx(0.99)
+    assert points[1].mark_prices == [m.mark_price for m in marks[10:20]]
+
+    projection = forwards.curve_points(CurveUsage.PROJECTION, {BTC: 20000.0})
+    assert projection[0].rate == pytest.approx(np.log(20100 / 20000) / (30 / 365))
+    with pytest.raises(ValueError):
+        forwards.curve_points(CurveUsage.PROJECTION)
+
+
+def test_extract_implied_forwards_empty_chain():
+    assert extract_implied_forwards([], [], AS_OF).curve_points(CurveUsage.DISCOUNTING) == []
@@ -0,0 +1,58 @@
+import numpy as np
+
+from serenity_types.pricing.derivatives.inverse import coin_margined_options, value_futures
+from serenity_types.pricing.derivatives.options.black_scholes import black_scholes_greeks
+from serenity_types.pricing.derivatives.options.engine import scale_greeks
+from serenity_types.refdata.derivatives import PayoffType
+
+PAYOFF_TYPES = [PayoffType.INVERSE, PayoffType.LINEAR, PayoffType.INVERSE]
+
+
+def value_options(spot: float):
+    strike = np.array([18000.0, 22000.0, 25000.0])
+    is_call = np.array([True, False, False])
+    greeks = black_scholes_greeks(spot, strike, 0.25, 0.6, 0.05, 0.05, is_call)
+    spot = np.full(3, spot)
+    columns = scale_greeks(greeks, np.full(3, 0.6), spot, np.full(3, 0.05), np.full(3, 0.05), np.full(3, 2.0))
+    return columns, coin_margined_options(columns, PAYOFF_TYPES)
+
+
+def test_coin_margined_option_greeks():
+    spot, h = 20000.0, 1.0
+    linear, coin = value_options(spot)
+    _, up = value_options(spot + h)
+    _, down = value_options(spot - h)
+
+    inverse = np.array([True, False, True])
+    np.testing.assert_allclose(coin.pv[inverse], linear.pv[inverse] / spot)
+    np.testing.assert_allclose(coin.pv[~inverse], linear.pv[~inverse])
+    np.testing.assert_allclose(coin.delta[inverse], spot * (up.pv - down.pv)[inverse] / (2 * h), rtol=1e-6)
+    np.testing.assert_allclose(coin.gamma[inverse], (up.delta - down.delta)[inverse] / (2 * h), rtol=1e-5)
+    np.testing.assert_allclose(coin.delta_ccy, coin.delta * 2 * spot)
+    np.testing.assert_allclose(coin.vega_ccy, linear.vega_ccy)
+    np.testing.assert_allclose(coin.delta[1], linear.delta[1])
+
+
+def test_value_futures_mixed_book():
+    spot, h = np.array([20000.0, 20000.0]), 1.0
+    args = dict(entry_price=np.array([19000.0, 19000.0]), time_to_expiry=np.array([0.5, 0.0]), projection_rate=0.04,
+                qty=np.array([3.0, -100.0]), contract_size=np.array([0.1, 0.0]),
+                payoff_types=[PayoffType.LINEAR, PayoffType.INVERSE], contract_value_ccy=np.array([0.0, 10.0]))
+    futures = value_futures(spot, **args)
+    up, down = value_futures(spot + h, **args), value_futures(spot - h, **args)
+
+    np.testing.assert_allclose(futures.pv, [0.1 * (20000 * np.exp(0.02) - 19000), 10 * (1 / 19000 - 1 / 20000)])
+    np.testing.assert_allclose(futures.delta[0], (up.pv[0] - down.pv[0]) / (2 * h))
+    np.testing.assert_allclose(futures.delta[1], 20000 * (up.pv[1] - down.pv[1]) / (2 * h), rtol=1e-8)
+    np.testing.assert_allclose(futures.gamma[1], (up.delta[1] - down.delta[1]) / (2 * h), rtol=1e-6)
+    # a short of 100 inverse 10 USD contracts is about 1000 USD short
+    np.testing.assert_allclose(futures.delta_ccy[1], -1000.0)
+    assert futures.gamma[0] == 0.0
+
+
+def test_inverse_futures_face_value_from_contract_size():
+    futures = value_futures(np.array([20000.0]), np.array([19000.0]), np.array([0.0]), 0.0, np.array([1.0]),
+                            np.array([0.001]), [PayoffType.INVERSE])
+    # 0.001 BTC bought at 19000 is a 19 USD face contract
+    np.testing.assert_allclose(futures.pv, [19 * (1 / 19000 - 1 / 20000)])
+    np.testing.assert_allclose(futures.delta_ccy, [19.0])
@@ -0,0 +1,124 @@
+from datetime import date
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.portfolio.core import AssetPosition
+from serenity_types.refdata.sector import AssetSectorMapping
+from serenity_types.risk.attribution import FactorRiskAttributionEngine, FactorRiskData
+from serenity_types.risk.factor import RiskAttributionRequest, RiskAttributionResponse
+from serenity_types.risk.matrices import MatrixIndex, exposure_matrix_elements, factor_matrix_elements
+
+ASSETS = [uuid4() for _ in range(4)]
+FACTORS = ['Market', 'Size', 'Momentum']
+
+
+def create_data() -> FactorRiskData:
+    rng = np.random.default_rng(3)
+    a = rng.standard_normal((3, 3)) * 0.1
+    return FactorRiskData(asset_ids=ASSETS, factors=FACTORS, exposures=rng.standard_normal((4, 3)),
+                          covariance=a @ a.T, residual_variance=np.array([0.01, 0.02, 0.005, 0.03]),
+                          prices=np.array([100.0, 50.0, 20.0, np.nan]))
+
+
+def create_request(**kwargs) -> RiskAttributionRequest:
+    positions = [AssetPosition(asset_id=ASSETS[0], quantity=2.0), AssetPosition(asset_id=ASSETS[1], quantity=3.0),
+                 AssetPosition(asset_id=ASSETS[1], quantity=-1.0), AssetPosition(asset_id=ASSETS[2], quantity=-5.0),
+                 AssetPosition(asset_id=ASSETS[3], quantity=1.0)]
+    return RiskAttributionRequest(as_of_date=date(2023, 1, 2), portfolio=positions, **kwargs)
+
+
+SECTORS = [AssetSectorMapping(asset_id=ASSETS[0], taxonomy_id=uuid4(), sector_levels=['Currency', 'Layer 1']),
+           AssetSectorMapping(asset_id=ASSETS[1], taxonomy_id=uuid4(), sector_levels=['Currency', 'Layer 2']),
+           AssetSectorMapping(asset_id=ASSETS[2], taxonomy_id=uuid4(), sector_levels=['DeFi'])]
+
+
+def test_contributions():
+    data = create_data()
+    contributions = FactorRiskAttributionEngine().contributions(create_request(), data)
+    assert contributions.asset_ids == ASSETS[:3]
+
+    value = np.array([200.0, 100.0, -100.0])
+    weight = value / 200.0
+    loadings = data.exposures[:3]
+    covariance = loadings @ data.covariance @ loadings.T + np.diag(data.residual_variance[:3])
+    variance = weight @ covariance @ weight
+    np.testing.assert_allclose(contributions.weight, weight)
+    np.testing.assert_allclose(contributions.variance[2], variance)
+    np.testing.assert_allclose(contributions.variance[1], weight ** 2 @ data.residual_variance[:3])
+
+    # Euler allocation: contributions add up to the volatility, by asset and by factor
+    volatility = np.sqrt(variance)
+    np.testing.assert_allclose(contributions.absolute.sum(axis=0), contributions.variance / volatility)
+    np.testing.assert_allclose(contributions.factor_absolute.sum(), contributions.variance[0] / volatility)
+    np.testing.assert_allclose(contributions.marginal[:, 2], covariance @ weight / volatility)
+
+    bump = 1e-6
+    shifted = weight + bump * np.eye(3)[1]
+    np.testing.assert_allclose((np.sqrt(shifted @ covariance @ shifted) - volatility) / bump,
+                               contributions.marginal[1, 2], rtol=1e-4)
+
+
+def test_attribute():
+    data = create_data()
+    response = FactorRiskAttributionEngine().attribute(create_request(), data, SECTORS)
+    assert isinstance(response, RiskAttributionResponse)
+    variance = response.total_risk.variance
+    assert variance.factor_risk + variance.specific_risk == pytest.approx(variance.total_risk)
+    assert response.total_risk.volatility.total_risk == pytest.approx(np.sqrt(variance.total_risk))
+
+    by_asset = response.absolute_contribution_risk.by_asset
+    assert sum(risk.total_risk for risk in by_asset) == pytest.approx(response.total_risk.volatility.total_risk)
+    relative = response.relative_contribution_risk.by_asset
+    assert sum(risk.factor_risk for risk in relative) == pytest.approx(variance.factor_risk / variance.total_risk)
+    assert by_asset[0].sector_levels == ['Currency', 'Layer 1']
+
+    by_sector = {tuple(risk.sector_levels): risk.total_risk for risk in response.absolute_contribution_risk.by_sector}
+    assert set(by_sector) == {('Currency',), ('Currency', 'Layer 1'), ('Currency', 'Layer 2'), ('DeFi',)}
+    assert by_sector[('Currency',)] == pytest.approx(by_asset[0].total_risk + by_asset[1].total_risk)
+
+    assert [risk.factor for risk in response.factorRisk] == FACTORS
+    assert sum(risk.absolute_contribution for risk in response.factorRisk) == pytest.approx(
+        sum(risk.factor_risk for risk in by_asset))
+    assert response.factorRisk[0].factor_exposure.factor_exposure_base_ccy == pytest.approx(
+        data.exposures[:3, 0] @ [200.0, 100.0, -100.0])
+
+    exposures = {(tuple(e.sector_levels), e.factor): e for e in response.sectorFactorExposures}
+    assert len(exposures) == 4 * 3
+    assert exposures[(('Currency',), 'Size')].factor_exposure.factor_exposure == pytest.approx(
+        data.exposures[:2, 1] @ [1.0, 0.5])
+    assert sum(exposures[(('Currency',), factor)].absolute_risk + exposures[(('DeFi',), factor)].absolute_risk
+               for factor in FACTORS) == pytest.approx(response.total_risk.variance.factor_risk
+                                                       / response.total_risk.volatility.total_risk)
+
+    # the response encodes as the service's would
+    assert 'totalRisk' in response.json(by_alias=True)
+
+
+def test_strict():
+    with pytest.raises(ValueError):
+        FactorRiskAttributionEngine().contributions(create_request(strict=True), create_data())
+
+
+def test_from_elements():
+    data = create_data()
+    assets, factors = MatrixIndex.of(ASSETS), MatrixIndex.of(FACTORS)
+    # exposures as models, residuals as decoded JSON
+    exposures = exposure_matrix_elements(data.exposures, assets, factors)
+    covariance = factor_matrix_elements(data.covariance, factors)
+    residuals = [{'assetId': str(asset_id), 'value': value} for asset_id, value in zip(ASSETS, data.residual_variance)]
+    rebuilt = FactorRiskData.from_elements(exposures, covariance, residuals, dict(zip(ASSETS, data.prices)))
+    assert rebuilt.asset_ids == ASSETS
+    np.testing.assert_allclose(rebuilt.exposures, data.exposures)
+    np.testing.assert_allclose(rebuilt.covariance, data.covariance)
+    np.testing.assert_allclose(rebuilt.residual_variance, data.residual_variance)
+
+
+def test_dollar_neutral_weights_by_gross_value():
+    positions = [AssetPosition(asset_id=ASSETS[0], quantity=1.0), AssetPosition(asset_id=ASSETS[1], quantity=-2.0)]
+    request = RiskAttributionRequest(portfolio=positions)
+    contributions = FactorRiskAttributionEngine().contributions(request, create_data())
+    assert contributions.scale == 200.0
+    np.testing.assert_allclose(contributions.weight, [0.5, -0.5])
+    assert contributions.volatility > 0
@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.portfolio.core import AssetPosition
+from serenity_types.risk.backtest import BacktestMarketData, VaRBacktestEngine
+from serenity_types.risk.var import VaRAnalysisRequest, VaRBacktestRequest
+from serenity_types.risk.var_engine import VaREngine, VaRMarketData, VaRMethod
+
+ASSETS = [uuid4() for _ in range(3)]
+START = date(2022, 1, 1)
+
+
+def create_market_data(days: int = 200) -> BacktestMarketData:
+    rng = np.random.default_rng(7)
+    covariance = np.array([[4.0, 1.0, 0.5], [1.0, 2.0, 0.2], [0.5, 0.2, 1.0]]) * 1e-4
+    returns = rng.multivariate_normal(np.zeros(3), covariance, size=days)
+    returns[0] = np.nan
+    returns[100:105, 2] = np.nan
+    prices = np.array([20000.0, 1500.0, 1.0]) * np.cumprod(1 + np.nan_to_num(returns), axis=0)
+    return BacktestMarketData(dates=[START + timedelta(days=i) for i in range(days)], asset_ids=ASSETS,
+                              returns=returns, prices=prices)
+
+
+def create_request() -> VaRBacktestRequest:
+    positions = [AssetPosition(asset_id=ASSETS[0], quantity=1.0), AssetPosition(asset_id=ASSETS[1], quantity=-4.0),
+                 AssetPosition(asset_id=ASSETS[2], quantity=1e4), AssetPosition(asset_id=uuid4(), quantity=1.0)]
+    return VaRBacktestRequest(start_date=START + timedelta(days=20), end_date=START + timedelta(days=180),
+                              lookback_period=30, portfolio=positions, model_config_id=uuid4())
+
+
+@pytest.mark.parametrize('method', [VaRMethod.HISTORICAL, VaRMethod.PARAMETRIC])
+def test_backtest_matches_daily_var(method: VaRMethod):
+    market_data = create_market_data()
+    request = create_request()
+    result = VaRBacktestEngine(method, refresh_interval=50).backtest(request, market_data)
+
+    # days without a full lookback are skipped
+    assert result.results[0].run_date == START + timedelta(days=30)
+    assert result.results[-1].run_date == START + timedelta(days=180)
+    engine = VaREngine(method)
+    for daily in result.results[::7]:
+        i = market_data.dates.index(daily.run_date)
+        expected = engine.value(VaRAnalysisRequest(as_of_date=daily.run_date, lookback_period=30,
+                                                   portfolio=request.portfolio, model_config_id=uuid4()),
+                                VaRMarketData(ASSETS, market_data.returns[:i], market_data.prices[i - 1]))
+        assert daily.baseline == pytest.approx(expected.baseline)
+        assert daily.excluded_asset_ids == expected.excluded_asset_ids
+        np.testing.assert_allclose([q.var_absolute for q in daily.quantiles],
+                                   [q.var_absolute for q in expected.quantiles], rtol=1e-9)
+
+
+def test_breaches():
+    market_data = create_market_data()
+    result = VaRBacktestEngine().backtest(create_request(), market_data)
+
+    losses = {}
+    for daily in result.results:
+        i = market_data.dates.index(daily.run_date)
+        exposure = np.array([1.0, -4.0, 1e4]) * market_data.prices[i - 1]
+        exposure[2] *= ASSETS[2] not in daily.excluded_asset_ids
+        losses[daily.run_date] = -np.nan_to_num(market_data.returns[i]) @ exposure
+    expected = [daily for daily in result.results if losses[daily.run_date] > daily.quantiles[0].var_absolute]
+
+    assert len(expected) > 0
+    assert [breach.breach_date for breach in result.breaches] == [daily.run_date for daily in expected]
+    for breach, daily in zip(result.breaches, expected):
+        assert breach.portfolio_loss_absolute == pytest.approx(losses[daily.run_date])
+        assert breach.portfolio_loss_relative == pytest.approx(100 * losses[daily.run_date] / daily.baseline)
+        assert [q.quantile for q in breach.quantiles] == \
+            [q.quantile for q in daily.quantiles if q.var_absolute < breach.portfolio_loss_absolute]
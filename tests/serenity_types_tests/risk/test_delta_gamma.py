@@ -0,0 +1,96 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.portfolio.core import AssetPosition
+from serenity_types.pricing.derivatives.options.engine import OptionMarketData, OptionValuationEngine
+from serenity_types.pricing.derivatives.options.valuation import MarketDataOverride, OptionValuationRequest
+from serenity_types.refdata.options import OptionType
+from serenity_types.risk.delta_gamma import DeltaGammaVaREngine, QuadraticSensitivities, quadratic_pnl
+from serenity_types.risk.var import VaRAnalysisRequest
+from serenity_types.risk.var_engine import VaRMarketData, historical_var
+from serenity_types_tests.pricing.derivatives.options.test_engine import (AS_OF, create_curve, create_option,
+                                                                          create_surface)
+
+BTC, ETH = uuid4(), uuid4()
+SPOT = 20000.0
+
+
+def create_book():
+    vol = MarketDataOverride(replacement=0.7)
+    options = [create_option(i, option_type, option_asset_id=uuid4(), underlier_asset_id=BTC, qty=2,
+                             implied_vol_override=vol)
+               for i, option_type in [(1, OptionType.CALL), (2, OptionType.PUT)]]
+    # an option on an underlier without returns
+    options.append(create_option(3, option_asset_id=uuid4(), underlier_asset_id=uuid4()))
+    request = OptionValuationRequest(as_of_time=AS_OF, options=options)
+    market_data = OptionMarketData(spot_price=SPOT, vol_surface=create_surface(), projection_curve=create_curve(0.0))
+    return options, request, market_data
+
+
+def test_quadratic_pnl():
+    sensitivities = QuadraticSensitivities(asset_ids=[BTC, ETH], delta=np.array([100.0, -50.0]),
+                                           gamma=np.array([1000.0, 0.0]), vega=np.array([10.0, 20.0]), theta=-3.0,
+                                           value=0.0)
+    returns = np.array([[0.01, 0.02], [-0.05, 0.0]])
+    vol_changes = np.array([[0.01, np.nan], [0.0, -0.02]])
+    np.testing.assert_allclose(quadratic_pnl(sensitivities, returns, vol_changes),
+                               [1.0 - 1.0 + 0.05 + 0.1 - 3.0, -5.0 + 1.25 - 0.4 - 3.0])
+    # over 4 days returns and vol changes double while gamma and theta grow fourfold
+    np.testing.assert_allclose(quadratic_pnl(sensitivities, returns, vol_changes, horizon=4),
+                               [2.0 - 2.0 + 0.2 + 0.2 - 12.0, -10.0 + 5.0 - 0.8 - 12.0])
+
+
+def test_delta_gamma_var_tracks_full_revaluation():
+    options, valuation_request, option_market_data = create_book()
+    engine = OptionValuationEngine()
+    results = engine.value(valuation_request, option_market_data)
+
+    returns = np.random.default_rng(9).normal(0, 0.04, size=(250, 2))
+    market_data = VaRMarketData(asset_ids=[BTC, ETH], returns=returns, prices=np.array([SPOT, 1500.0]))
+    portfolio = [AssetPosition(asset_id=options[0].option_asset_id, quantity=-10.0),
+                 AssetPosition(asset_id=options[1].option_asset_id, quantity=-10.0),
+                 AssetPosition(asset_id=options[2].option_asset_id, quantity=1.0),
+                 AssetPosition(asset_id=ETH, quantity=2.0)]
+    request = VaRAnalysisRequest(lookback_period=250, quantiles=[99.0], portfolio=portfolio, model_config_id=uuid4())
+    result = DeltaGammaVaREngine().value(request, market_data, options, results)
+    assert result.excluded_asset_ids == [options[2].option_asset_id]
+    columns = engine.value_columns(valuation_request, option_market_data)
+    assert DeltaGammaVaREngine().value(request, market_data, options, columns) == result
+
+    # full revaluation of the short straddle a day later under every historical return
+    base = engine.value_columns(valuation_request, option_market_data)
+    scale = -10.0 / 2
+    value = scale * (base.pv * base.spot_notional / base.spot_price)[:2].sum() + 2 * 1500.0
+    assert result.baseline == pytest.approx(value)
+    pnl = []
+    for btc_return, eth_return in returns:
+        shocked = engine.value_columns(valuation_request, option_market_data._replace(
+            spot_price=SPOT * (1 + btc_return)), AS_OF + timedelta(days=1))
+        pnl.append(scale * (shocked.pv * shocked.spot_notional / shocked.spot_price)[:2].sum()
+                   + 2 * 1500.0 * (1 + eth_return) - value)
+    full = historical_var(np.array(pnl), np.array([99.0]))[0]
+    linear = historical_var(returns @ [scale * sum(r.delta_ccy for r in results[:2]), 3000.0], np.array([99.0]))[0]
+    assert result.quantiles[0].var_absolute == pytest.approx(full, rel=0.03)
+    assert abs(linear - full) > 5 * abs(result.quantiles[0].var_absolute - full)
+
+
+def test_delta_gamma_var_on_simulated_paths():
+    options, valuation_request, option_market_data = create_book()
+    results = OptionValuationEngine().value(valuation_request, option_market_data)
+    rng = np.random.default_rng(5)
+    returns = rng.normal(0, 0.04, size=(2000, 2))
+    vol_changes = rng.normal(0, 0.02, size=(2000, 2))
+    market_data = VaRMarketData(asset_ids=[BTC, ETH], returns=returns, prices=np.array([SPOT, 1500.0]))
+    portfolio = [AssetPosition(asset_id=options[0].option_asset_id, quantity=-10.0),
+                 AssetPosition(asset_id=options[1].option_asset_id, quantity=-10.0)]
+    request = VaRAnalysisRequest(lookback_period=2000, quantiles=[99.0], portfolio=portfolio,
+                                 model_config_id=uuid4())
+
+    historical = DeltaGammaVaREngine().value(request, market_data, options, results, vol_changes)
+    simulated = DeltaGammaVaREngine(paths=100_000, seed=1).value(request, market_data, options, results, vol_changes)
+    assert simulated.quantiles[0].var_absolute == pytest.approx(historical.quantiles[0].var_absolute, rel=0.1)
+    assert DeltaGammaVaREngine(paths=100_000, seed=1).value(request, market_data, options, results,
+                                                            vol_changes) == simulated
@@ -0,0 +1,101 @@
+import json
+from uuid import uuid4
+
+import numpy as np
+
+from serenity_types.risk.factor import AssetFactorExposureMatrixElement, AssetMatrixElement, AssetResidualValue
+from serenity_types.risk.matrices import (CSRMatrix, MatrixIndex, PackedSymmetricMatrix, asset_matrix,
+                                          asset_matrix_elements, exposure_matrix, exposure_matrix_elements,
+                                          factor_matrix, factor_matrix_elements, residual_values, residual_vector)
+
+ASSETS = [uuid4() for _ in range(4)]
+FACTORS = ['Market', 'Size', 'Momentum']
+
+
+def create_covariance() -> np.ndarray:
+    rng = np.random.default_rng(7)
+    a = rng.standard_normal((4, 4))
+    return a @ a.T
+
+
+def create_asset_elements(covariance: np.ndarray):
+    return [AssetMatrixElement(asset_id1=ASSETS[i], asset_id2=ASSETS[j], value=covariance[i, j])
+            for i in range(4) for j in range(4)]
+
+
+def test_asset_matrix_dense_and_sparse():
+    covariance = create_covariance()
+    elements = create_asset_elements(covariance)
+    packed, index = asset_matrix(elements)
+    assert isinstance(packed, PackedSymmetricMatrix)
+    assert index.keys == ASSETS
+    assert len(packed.packed) == 10
+    np.testing.assert_allclose(packed.toarray(), covariance)
+
+    sparse, _ = asset_matrix(elements, sparse=True)
+    assert isinstance(sparse, CSRMatrix)
+    assert sparse.nnz == 10
+    np.testing.assert_allclose(sparse.toarray(), covariance)
+    vector = np.arange(1.0, 5.0)
+    np.testing.assert_allclose(sparse.dot(vector), covariance @ vector)
+
+
+def test_asset_matrix_from_json_upper_half():
+    covariance = create_covariance()
+    upper = [element for element in create_asset_elements(covariance)
+             if ASSETS.index(element.asset_id1) <= ASSETS.index(element.asset_id2)]
+    decoded = json.loads(json.dumps([element.dict(by_alias=True) for element in upper], default=str))
+    assert 'assetId1' in decoded[0]
+    packed, index = asset_matrix(decoded)
+    assert index.keys == ASSETS
+    np.testing.assert_allclose(packed.toarray(), covariance)
+
+    # JSON in, JSON out: only the upper half is emitted
+    round_trip = asset_matrix_elements(packed, index, as_dicts=True)
+    assert len(round_trip) == 10
+    assert round_trip[0]['assetId1'] == str(ASSETS[0])
+    json.dumps(round_trip)
+    again, _ = asset_matrix(round_trip, index)
+    np.testing.assert_allclose(again.toarray(), covariance)
+
+
+def test_factor_matrix_round_trip():
+    covariance = create_covariance()[:3, :3]
+    index = MatrixIndex.of(FACTORS)
+    elements = factor_matrix_elements(PackedSymmetricMatrix.from_dense(covariance), index)
+    assert elements[0].factor1 == 'Market' and elements[0].factor2 == 'Market'
+    matrix, factors = factor_matrix(elements)
+    assert factors.keys == FACTORS
+    np.testing.assert_allclose(matrix.toarray(), covariance)
+
+
+def test_exposure_matrix():
+    elements = [AssetFactorExposureMatrixElement(asset_id=ASSETS[0], factor='Market', value=1.1),
+                AssetFactorExposureMatrixElement(asset_id=ASSETS[1], factor='Size', value=-0.5),
+                AssetFactorExposureMatrixElement(asset_id=ASSETS[1], factor='Size', value=0.5),
+                AssetFactorExposureMatrixElement(asset_id=ASSETS[2], factor='Market', value=0.9),
+                AssetFactorExposureMatrixElement(asset_id=uuid4(), factor='Market', value=5.0)]
+    asset_index = MatrixIndex.of(ASSETS)
+    dense, assets, factors = exposure_matrix(elements, asset_index, MatrixIndex.of(FACTORS))
+    expected = np.array([[1.1, 0, 0], [0, 0.5, 0], [0.9, 0, 0], [0, 0, 0]])
+    np.testing.assert_allclose(dense, expected)
+
+    sparse, _, _ = exposure_matrix(elements, asset_index, factors, sparse=True)
+    assert sparse.nnz == 3
+    np.testing.assert_allclose(sparse.toarray(), expected)
+    np.testing.assert_allclose(sparse.dot(np.ones(3)), expected.sum(axis=1))
+
+    round_trip = exposure_matrix_elements(sparse, assets, factors)
+    assert [(e.asset_id, e.factor, e.value) for e in round_trip] == [
+        (ASSETS[0], 'Market', 1.1), (ASSETS[1], 'Size', 0.5), (ASSETS[2], 'Market', 0.9)]
+
+
+def test_residual_vector():
+    residuals = [{'assetId': str(ASSETS[2]), 'value': 0.3}, {'assetId': str(ASSETS[0]), 'value': 0.1}]
+    # JSON residuals index alike with assets taken from model elements
+    vector, index = residual_vector(residuals, MatrixIndex.of(ASSETS))
+    np.testing.assert_allclose(vector, [0.1, 0, 0.3, 0])
+    values = residual_values(vector, index)
+    assert isinstance(values[0], AssetResidualValue)
+    assert values[2].asset_id == ASSETS[2] and values[2].value == 0.3
+    assert residual_values(vector, index, as_dicts=True)[2] == {'assetId': str(ASSETS[2]), 'value': 0.3}
@@ -0,0 +1,68 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from serenity_types.risk.montecarlo import MonteCarloVaREngine, cholesky_factor, simulate_shard
+from serenity_types.risk.var_engine import VaREngine, VaRMethod, resolve_exposures
+from serenity_types_tests.risk.test_var_engine import create_market_data, create_request
+
+QUANTILES = np.array([95.0, 97.5, 99.0])
+
+
+def test_sharded_tails_match_full_simulation():
+    exposures = resolve_exposures(create_request(), create_market_data())
+    engine = MonteCarloVaREngine(paths=25_000, seed=3, shard_size=4_000)
+    estimates = engine.simulate(exposures, QUANTILES)
+
+    # the same shards simulated in full
+    factor = cholesky_factor(np.cov(np.log1p(exposures.returns), rowvar=False))
+    seeds = np.random.SeedSequence(3).spawn(7)
+    losses = np.concatenate([simulate_shard(factor, exposures.exposure, 10 ** 9, min(4_000, 25_000 - i * 4_000), s)
+                             for i, s in enumerate(seeds)])
+    assert estimates.paths == len(losses) == 25_000
+    np.testing.assert_allclose(estimates.var, np.quantile(losses, QUANTILES / 100), rtol=1e-12)
+    ordered = np.sort(losses)[::-1]
+    expected_shortfall = [ordered[:int(np.ceil(25_000 * (1 - q / 100)))].mean() for q in QUANTILES]
+    np.testing.assert_allclose(estimates.expected_shortfall, expected_shortfall, rtol=1e-12)
+
+
+def test_reproducible_across_workers():
+    exposures = resolve_exposures(create_request(), create_market_data())
+    engine = MonteCarloVaREngine(paths=20_000, seed=11, shard_size=3_000)
+    in_process = engine.simulate(exposures, QUANTILES)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        engine.executor = executor
+        pooled = engine.simulate(exposures, QUANTILES)
+    assert in_process.var.tobytes() == pooled.var.tobytes()
+    assert in_process.expected_shortfall.tobytes() == pooled.expected_shortfall.tobytes()
+
+
+def test_close_to_parametric():
+    market_data = create_market_data()
+    request = create_request(quantiles=[99.0], horizon_days=2)
+    simulated = MonteCarloVaREngine(paths=200_000).value(request, market_data)
+    parametric = VaREngine(VaRMethod.PARAMETRIC).value(request, market_data)
+    # compounding shortens the left tail of a long-only book relative to normal simple returns
+    assert simulated.quantiles[0].var_absolute == pytest.approx(parametric.quantiles[0].var_absolute, rel=0.05)
+    assert simulated.quantiles[0].var_absolute < parametric.quantiles[0].var_absolute
+
+    with pytest.raises(ValueError):
+        VaREngine(VaRMethod.MONTE_CARLO)
+
+
+def test_sketched_tails():
+    exposures = resolve_exposures(create_request(), create_market_data())
+    exact = MonteCarloVaREngine(paths=200_000, seed=5).simulate(exposures, QUANTILES)
+    sketched = MonteCarloVaREngine(paths=200_000, seed=5, compression=400).simulate(exposures, QUANTILES)
+    np.testing.assert_allclose(sketched.var, exact.var, rtol=2e-3)
+    np.testing.assert_allclose(sketched.expected_shortfall, exact.expected_shortfall, rtol=2e-3)
+
+
+def test_cholesky_factor_of_singular_covariance():
+    returns = np.random.default_rng(2).normal(0, 0.02, (3, 5))
+    covariance = np.cov(returns, rowvar=False)
+    with pytest.raises(np.linalg.LinAlgError):
+        np.linalg.cholesky(covariance)
+    factor = cholesky_factor(covariance)
+    np.testing.assert_allclose(factor @ factor.T, covariance, atol=1e-15)
@@ -0,0 +1,91 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytz
+
+from serenity_types.marketdata.marks import AssetMarkPrice
+from serenity_types.portfolio.core import AssetPosition
+from serenity_types.pricing.core import MarkTime
+from serenity_types.risk.returns import (ReturnsMatrixBuilder, ReturnType, forward_fill, mark_calendar,
+                                         min_coverage, no_fill)
+from serenity_types.risk.var import VaRAnalysisRequest
+from serenity_types.risk.var_engine import VaREngine
+
+END = date(2023, 3, 31)
+NEW_YORK = pytz.timezone('America/New_York')
+
+
+def close(day: date) -> datetime:
+    return NEW_YORK.localize(datetime(day.year, day.month, day.day, 16, 30))
+
+
+def test_mark_calendar():
+    closes = mark_calendar(END, 30, MarkTime.NY_EOD)
+    assert len(closes) == 31
+    # daylight saving time started on March 12th
+    assert closes[0] == np.datetime64('2023-03-01T21:30:00')
+    assert closes[-1] == np.datetime64('2023-03-31T20:30:00')
+    assert mark_calendar(END, 1, MarkTime.UTC)[-1] == np.datetime64('2023-03-31T00:00:00')
+
+
+def test_build_returns():
+    btc, eth, new, missing = uuid4(), uuid4(), uuid4(), uuid4()
+    days = [END - timedelta(days=i) for i in range(10, -1, -1)]
+    btc_prices = 20000.0 * np.exp(np.linspace(0, 0.1, 11))
+    marks = [AssetMarkPrice(asset_id=btc, mark_time=close(day), mark_price=price)
+             for day, price in zip(days, btc_prices)]
+    # an earlier intraday mark is superseded; a mark just after a close is too stale for the next one and dropped
+    marks.append(AssetMarkPrice(asset_id=btc, mark_time=close(days[3]) - timedelta(minutes=30), mark_price=1.0))
+    marks.append(AssetMarkPrice(asset_id=eth, mark_time=close(days[2]) + timedelta(minutes=1), mark_price=1.0))
+    marks.extend(AssetMarkPrice(asset_id=eth, mark_time=close(day).astimezone(timezone.utc), mark_price=1500.0 + i)
+                 for i, day in enumerate(days) if i not in (2, 4, 5))
+    marks.extend(AssetMarkPrice(asset_id=new, mark_time=close(day), mark_price=1.0) for day in days[5:])
+
+    matrix = ReturnsMatrixBuilder().build(marks, END, 10, asset_ids=[btc, eth, new, missing])
+    assert matrix.asset_ids == [btc, eth]
+    assert matrix.excluded_asset_ids == [new, missing]
+    assert matrix.dates == days[1:]
+    assert matrix.returns.shape == (10, 2) and matrix.returns.dtype == np.float64
+    np.testing.assert_allclose(matrix.returns[:, 0], np.full(10, 0.01))
+    eth_prices = [1500.0, 1501.0, 1501.0, 1503.0, 1503.0, 1503.0] + [1500.0 + i for i in range(6, 11)]
+    np.testing.assert_allclose(matrix.prices[:, 1], eth_prices)
+
+    simple = ReturnsMatrixBuilder(ReturnType.SIMPLE, forward_fill(limit=1), min_coverage(0.5)).build(
+        marks, END, 10, asset_ids=[btc, eth, new, missing])
+    assert simple.asset_ids == [btc, eth, new]
+    assert np.isnan(simple.prices[5, 1]) and simple.prices[4, 1] == 1503.0
+    np.testing.assert_allclose(simple.returns[:, 0], np.expm1(0.01))
+    assert np.isnan(ReturnsMatrixBuilder(fill_policy=no_fill, exclusion_policy=min_coverage(0.0)).build(
+        marks, END, 10).returns[1:3, 1]).all()
+
+
+def test_var_market_data_and_memmap(tmp_path):
+    btc, unknown = uuid4(), uuid4()
+    days = [END - timedelta(days=i) for i in range(100, -1, -1)]
+    prices = 20000.0 * np.exp(np.cumsum(np.random.default_rng(3).normal(0, 0.02, 101)))
+    marks = [AssetMarkPrice(asset_id=btc, mark_time=close(day), mark_price=price) for day, price in zip(days, prices)]
+    matrix = ReturnsMatrixBuilder().build(marks, END, 100, asset_ids=[btc, unknown])
+
+    request = VaRAnalysisRequest(as_of_date=END + timedelta(days=1), lookback_period=100, model_config_id=uuid4(),
+                                 portfolio=[AssetPosition(asset_id=btc, quantity=2.0),
+                                            AssetPosition(asset_id=unknown, quantity=1.0)])
+    result = VaREngine().value(request, matrix.var_market_data())
+    assert result.excluded_asset_ids == [unknown]
+    assert result.baseline == 2 * prices[-1]
+
+    path = os.path.join(tmp_path, 'returns.npy')
+    mapped = matrix.memmap(path)
+    assert isinstance(mapped.returns, np.memmap)
+    np.testing.assert_array_equal(np.load(path, mmap_mode='r'), matrix.returns)
+
+
+def test_build_keeps_latest_of_duplicate_marks():
+    btc = uuid4()
+    days = [END - timedelta(days=i) for i in range(2, -1, -1)]
+    marks = [AssetMarkPrice(asset_id=btc, mark_time=close(day) - timedelta(minutes=minutes), mark_price=price)
+             for day in days for minutes, price in [(0, 100.0), (10, 90.0), (20, 80.0)]][::-1]
+    marks.append(AssetMarkPrice(asset_id=btc, mark_time=close(days[1]) - timedelta(minutes=5), mark_price=50.0))
+    matrix = ReturnsMatrixBuilder(return_type=ReturnType.SIMPLE).build(marks, END, 2)
+    np.testing.assert_allclose(matrix.prices[:, 0], [100.0, 100.0, 100.0])
@@ -0,0 +1,104 @@
+from datetime import date
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from serenity_types.portfolio.core import AssetPosition
+from serenity_types.risk.var import VaRAnalysisRequest
+from serenity_types.risk.var_engine import VaREngine, VaRMarketData, VaRMethod, historical_var
+from serenity_types.utils.stats import norm_ppf
+
+ASSETS = [uuid4() for _ in range(3)]
+
+
+def create_market_data(days: int = 500) -> VaRMarketData:
+    rng = np.random.default_rng(42)
+    covariance = np.array([[4.0, 1.0, 0.5], [1.0, 2.0, 0.2], [0.5, 0.2, 1.0]]) * 1e-4
+    returns = rng.multivariate_normal(np.zeros(3), covariance, size=days)
+    return VaRMarketData(asset_ids=ASSETS, returns=returns, prices=np.array([20000.0, 1500.0, 1.0]))
+
+
+def create_request(**kwargs) -> VaRAnalysisRequest:
+    positions = [AssetPosition(asset_id=ASSETS[0], quantity=1.0), AssetPosition(asset_id=ASSETS[1], quantity=10.0),
+                 AssetPosition(asset_id=ASSETS[1], quantity=-5.0), AssetPosition(asset_id=ASSETS[2], quantity=1e4)]
+    return VaRAnalysisRequest(as_of_date=date(2023, 1, 2), portfolio=positions, model_config_id=uuid4(), **kwargs)
+
+
+def test_historical_var_matches_quantile():
+    pnl = np.random.default_rng(1).normal(size=1001)
+    quantiles = np.array([95.0, 97.5, 99.0])
+    np.testing.assert_allclose(historical_var(pnl, quantiles), np.quantile(-pnl, quantiles / 100))
+
+
+def test_historical_var():
+    market_data = create_market_data()
+    result = VaREngine().value(create_request(lookback_period=250, horizon_days=4), market_data)
+
+    exposure = np.array([20000.0, 7500.0, 1e4])
+    pnl = market_data.returns[-250:] @ exposure
+    assert result.run_date == date(2023, 1, 2)
+    assert result.baseline == pytest.approx(exposure.sum())
+    assert [q.quantile for q in result.quantiles] == [95.0, 97.5, 99.0]
+    expected = np.quantile(-pnl, [0.95, 0.975, 0.99]) * 2
+    np.testing.assert_allclose([q.var_absolute for q in result.quantiles], expected)
+    np.testing.assert_allclose([q.var_relative for q in result.quantiles], 100 * expected / exposure.sum())
+    assert result.excluded_asset_ids == []
+
+
+def test_parametric_var():
+    market_data = create_market_data()
+    result = VaREngine(VaRMethod.PARAMETRIC).value(create_request(quantiles=[99.0]), market_data)
+
+    exposure = np.array([20000.0, 7500.0, 1e4])
+    volatility = np.sqrt(exposure @ np.cov(market_data.returns[-365:], rowvar=False) @ exposure)
+    assert result.quantiles[0].var_absolute == pytest.approx(norm_ppf(np.array(0.99)) * volatility)
+
+
+def test_excluded_assets():
+    market_data = create_market_data()
+    market_data.returns[-10:, 1] = np.nan
+    unknown = uuid4()
+    request = create_request(lookback_period=100)
+    request.portfolio.append(AssetPosition(asset_id=unknown, quantity=1.0))
+
+    result = VaREngine().value(request, market_data)
+    assert result.excluded_asset_ids == [ASSETS[1], unknown]
+    assert result.baseline == pytest.approx(30000.0)
+
+    # with enough coverage the gaps are treated as flat days instead
+    result = VaREngine(min_coverage=0.9).value(request, market_data)
+    assert result.excluded_asset_ids == [unknown]
+
+    with pytest.raises(ValueError):
+        VaREngine().value(create_request(horizon_days=-1), market_data)
+
+
+@pytest.mark.parametrize('method', [VaRMethod.HISTORICAL, VaRMethod.PARAMETRIC])
+def test_contributions(method: VaRMethod):
+    market_data = create_market_data()
+    request = create_request(horizon_days=2)
+    engine = VaREngine(method)
+    contributions = engine.contributions(request, market_data)
+    result = engine.value(request, market_data)
+
+    assert contributions.asset_ids == ASSETS
+    assert contributions.component.shape == contributions.marginal.shape == (3, 3)
+    np.testing.assert_allclose(contributions.var, [q.var_absolute for q in result.quantiles], rtol=1e-9)
+    np.testing.assert_allclose(contributions.component.sum(axis=1), contributions.var)
+    np.testing.assert_allclose(contributions.component_pct.sum(axis=1), 100.0)
+    np.testing.assert_allclose(contributions.component, contributions.marginal * [20000.0, 7500.0, 1e4])
+
+
+def test_parametric_marginal_matches_finite_difference():
+    market_data = create_market_data()
+    engine = VaREngine(VaRMethod.PARAMETRIC)
+    marginal = engine.contributions(create_request(quantiles=[99.0]), market_data).marginal[0]
+
+    def var(bump: float) -> float:
+        request = create_request(quantiles=[99.0])
+        request.portfolio.append(AssetPosition(asset_id=ASSETS[1], quantity=bump))
+        return engine.value(request, market_data).quantiles[0].var_absolute
+
+    # 0.01 units of the second asset is 15 of exposure
+    assert (var(0.01) - var(-0.01)) / 30.0 == pytest.approx(marginal[1], rel=1e-6)
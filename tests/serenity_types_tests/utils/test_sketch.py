@@ -0,0 +1,39 @@
+import pickle
+
+import numpy as np
+
+from serenity_types.utils.sketch import QuantileSketch
+
+
+def test_exact_while_small():
+    values = np.random.default_rng(0).normal(size=40)
+    sketch = QuantileSketch.of(values)
+    q = np.linspace(0, 1, 21)
+    np.testing.assert_allclose(sketch.quantile(q), np.quantile(values, q))
+    assert sketch.count == 40
+
+
+def test_merged_tails():
+    rng = np.random.default_rng(1)
+    chunks = [rng.standard_t(4, size=200_000) for _ in range(5)]
+    values = np.concatenate(chunks)
+    sketch = QuantileSketch(compression=300)
+    for chunk in chunks:
+        # sketches built independently, e.g. in worker processes, merge into one
+        sketch.merge(pickle.loads(pickle.dumps(QuantileSketch.of(chunk, 300))))
+
+    assert sketch.count == len(values)
+    assert len(sketch.means) < 300
+    q = np.array([0.001, 0.01, 0.5, 0.95, 0.99, 0.999])
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(q)) / len(values)
+    np.testing.assert_allclose(ranks, q, atol=1.5e-4)
+    assert sketch.quantile(np.array([0.0, 1.0])).tolist() == [values.min(), values.max()]
+
+    tail = np.sort(values)[-10_000:]
+    np.testing.assert_allclose(sketch.tail_mean(np.array([0.99])), [tail.mean()], rtol=2e-3)
+
+
+def test_empty():
+    sketch = QuantileSketch().update(np.array([np.nan]))
+    assert sketch.count == 0
+    assert np.isnan(sketch.quantile(np.array([0.5]))).all()
@@ -0,0 +1,30 @@
+import math
+
+import numpy as np
+import pytest
+
+from serenity_types.utils.stats import norm_cdf, norm_pdf, norm_ppf
+
+
+def test_norm_cdf_matches_erfc():
+    x = np.linspace(-37, 8, 4501)
+    expected = np.array([0.5 * math.erfc(-v / math.sqrt(2)) for v in x])
+    np.testing.assert_allclose(norm_cdf(x), expected, rtol=1e-12)
+    np.testing.assert_allclose(norm_cdf(np.array([-np.inf, 0.0, np.inf])), [0.0, 0.5, 1.0])
+    assert norm_cdf(np.zeros((2, 3))).shape == (2, 3)
+
+
+def test_norm_pdf():
+    np.testing.assert_allclose(norm_pdf(np.array([0.0, 1.0])), [1 / math.sqrt(2 * math.pi),
+                                                                math.exp(-0.5) / math.sqrt(2 * math.pi)])
+
+
+def test_norm_ppf_inverts_cdf():
+    # above the median norm_cdf itself rounds to 1, so round trips are checked in the lower half and by symmetry
+    x = np.linspace(-37, 0, 3701)
+    np.testing.assert_allclose(norm_ppf(norm_cdf(x)), x, rtol=1e-12, atol=1e-12)
+    p = np.linspace(0.01, 0.99, 99)
+    np.testing.assert_allclose(norm_ppf(p), -norm_ppf(1 - p), rtol=1e-12, atol=1e-12)
+    assert norm_ppf(np.array(0.99)) == pytest.approx(2.3263478740408408, rel=1e-14)
+    np.testing.assert_allclose(norm_ppf(np.array([0.0, 0.5, 1.0])), [-np.inf, 0.0, np.inf])
+    assert np.isnan(norm_ppf(np.array([-0.1, 1.1]))).all()